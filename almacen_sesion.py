@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Carpeta donde se guardan las cookies cifradas (una por sitio/sesión)
+SESIONES_ENV = "BOT_DT_SESIONES_DIR"
+
+# Clave Fernet. Si no viene en el entorno se genera una y se guarda junto a las sesiones.
+CLAVE_ENV = "BOT_DT_SESION_KEY"
+
+# Tiempo máximo para confirmar que la sesión restaurada sigue viva
+TIMEOUT_VERIFICACION = 5
+
+# Tiempo máximo para que otro proceso termine de escribir la clave recién creada
+ESPERA_CLAVE = 2
+
+
+def directorio():
+    # Se lee en cada uso, no al importar: benchmark.py redirige la carpeta después
+    return os.getenv(SESIONES_ENV) or os.path.join(os.getcwd(), ".sesiones")
+
+
+def _archivo_clave():
+    return os.path.join(directorio(), "clave")
+
+
+def _fernet():
+    # Import diferido: cryptography solo se carga si hay que cifrar/descifrar
+    from cryptography.fernet import Fernet
+
+    clave = os.getenv(CLAVE_ENV)
+    if not clave:
+        os.makedirs(directorio(), exist_ok=True)
+        try:
+            fd = os.open(_archivo_clave(), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(Fernet.generate_key())
+        except FileExistsError:
+            pass  # Otro worker (--sesiones) la creó primero
+        clave = _leer_clave()
+    return Fernet(clave)
+
+
+def _leer_clave():
+    """
+    Lee el archivo de la clave esperando a que quien lo creó termine de escribirlo.
+    """
+    ruta = _archivo_clave()
+    limite = time.monotonic() + ESPERA_CLAVE
+    while True:
+        with open(ruta, "rb") as f:
+            clave = f.read().strip()
+        if clave:
+            return clave
+        if time.monotonic() > limite:
+            raise RuntimeError(f"La clave de sesiones {ruta} está vacía.")
+        time.sleep(0.05)
+
+
+def _ruta(nombre):
+    return os.path.join(directorio(), f"{nombre}.sesion")
+
+
+def guardar(driver, nombre):
+    """
+    Guarda cifradas todas las cookies del navegador (de todos los dominios, vía CDP).
+    """
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        datos = _fernet().encrypt(json.dumps(cookies).encode("utf-8"))
+
+        carpeta = directorio()
+        os.makedirs(carpeta, exist_ok=True)
+        fd, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(datos)
+        os.chmod(temporal, 0o600)
+        os.replace(temporal, _ruta(nombre))
+        logger.info(f"💾 Sesión '{nombre}' guardada ({len(cookies)} cookies).")
+    except Exception as e:
+        logger.warning(f"⚠ No se pudo guardar la sesión '{nombre}': {str(e)}")
+
+
+def cargar_cookies(nombre):
+    """
+    Devuelve la lista de cookies guardada o None si no existe o no se puede descifrar.
+    """
+    ruta = _ruta(nombre)
+    if not os.path.exists(ruta):
+        return None
+    from cryptography.fernet import InvalidToken
+
+    try:
+        with open(ruta, "rb") as f:
+            return json.loads(_fernet().decrypt(f.read()))
+    except (InvalidToken, ValueError) as e:
+        logger.warning(f"⚠ Sesión '{nombre}' ilegible, se descarta: {str(e)}")
+        borrar(nombre)
+        return None
+
+
+def borrar(nombre):
+    try:
+        os.remove(_ruta(nombre))
+    except FileNotFoundError:
+        pass
+
+
+def restaurar(driver, nombre, url, localizador, timeout=TIMEOUT_VERIFICACION):
+    """
+    Carga las cookies guardadas, abre 'url' y comprueba que 'localizador'
+    (p.ej. (By.ID, "enlace5")) aparece. Devuelve True si la sesión sigue viva;
+    en caso contrario la descarta y el llamador debe hacer el login completo.
+    """
+    cookies = cargar_cookies(nombre)
+    if not cookies:
+        return False
+
+    try:
+        # Network.setCookies acepta el mismo formato que devuelve getAllCookies
+        campos = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCookies", {
+            "cookies": [{k: c[k] for k in campos if k in c and not (k == "expires" and c[k] < 0)} for c in cookies]
+        })
+        driver.get(url)
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located(localizador))
+        logger.info(f"♻️ Sesión '{nombre}' restaurada sin login.")
+        return True
+    except TimeoutException:
+        logger.info(f"ℹ La sesión '{nombre}' expiró, se hará login completo.")
+    except Exception as e:
+        logger.warning(f"⚠ No se pudo restaurar la sesión '{nombre}': {str(e)}")
+
+    borrar(nombre)
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except Exception:
+        pass
+    return False
@@ -0,0 +1,301 @@
+"""
+Benchmark de los flujos contra la réplica local (sitios_mock). Mide items/min
+y la latencia p50/p95 de cada paso, y compara contra una corrida anterior:
+
+    python benchmark.py --flujo sigo2 --items 30 --json base.json
+    python benchmark.py --flujo sigo2 --items 30 --comparar base.json   # exit 1 si hay regresión
+
+Los pasos se miden envolviendo las funciones de cada script, así que se mide
+el mismo código que corre en producción.
+"""
+import logging
+
+# Configurar logging antes de importar los scripts (cada uno llama a basicConfig)
+logging.basicConfig(
+    filename="benchmark.log",
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+import argparse
+import csv
+import functools
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import sigo_stub
+import sitios_mock
+
+FLUJOS = ("sigo2", "sigo", "rut", "midt")
+
+# Módulos que leen el entorno al importarse (URLs, perfil del navegador, backoff)
+MODULOS_CON_ENTORNO = ("sigo", "sigo2", "rut", "robot", "navegador", "reintentos")
+
+# Una regresión de p95 menor a esto (segundos) se considera ruido
+MINIMO_REGRESION = 0.05
+
+
+class Cronometro:
+    """
+    Reemplaza funciones de un módulo por versiones que registran su duración.
+    """
+
+    def __init__(self):
+        self.tiempos = defaultdict(list)
+
+    def envolver(self, modulo, nombres):
+        for nombre in nombres:
+            original = getattr(modulo, nombre)
+
+            @functools.wraps(original)
+            def cronometrado(*args, _original=original, _nombre=nombre, **kwargs):
+                inicio = time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    self.tiempos[_nombre].append(time.perf_counter() - inicio)
+
+            setattr(modulo, nombre, cronometrado)
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def preparar_entorno(url_sigo, url_midt, directorio, visible=False):
+    """
+    Apunta los scripts a la réplica. Debe correr antes de importarlos: leen
+    el entorno al cargarse.
+    """
+    cargados = [m for m in MODULOS_CON_ENTORNO if m in sys.modules]
+    if cargados:
+        raise RuntimeError(f"preparar_entorno() debe correr antes de importar {', '.join(cargados)}.")
+    os.environ["SIGO_URL"] = url_sigo
+    os.environ["MIDT_URL"] = url_midt
+    os.environ["BOT_DT_SESIONES_DIR"] = os.path.join(directorio, "sesiones")
+    # Vacía: se genera una clave desechable en 'directorio', no se usa la de producción
+    os.environ["BOT_DT_SESION_KEY"] = ""
+    os.environ["BOT_DT_BITACORA"] = os.path.join(directorio, "bitacora.db")
+    os.environ["BOT_DT_TRAZA"] = os.path.join(directorio, "traza.jsonl")
+    os.environ["BOT_DT_PROM_DIR"] = directorio
+    os.environ["BOT_DT_LIGERO"] = "0" if visible else "1"
+    for variable in ("MVS_SIGO_USER", "MVS_SIGO_PASS", "RUT", "CLAVE_UNICA"):
+        os.environ.setdefault(variable, "benchmark")
+
+
+###############################
+# FLUJOS
+###############################
+def flujo_sigo2(estado, items, cronometro, directorio):
+    import sigo2
+    from navegador import crear_driver
+
+    cronometro.envolver(sigo2, [
+        "iniciar_sesion", "filtrar_por_id", "entrar_detalle_finiquito", "presionar_subido_dt_reintentos",
+        "esperar_y_leer_toast", "restablecer_estado", "procesar_finiquito",
+    ])
+    ids = [f["id"] for f in estado.finiquitos.values() if "subido_dt" in f["botones"]][:items]
+
+    driver = crear_driver()
+    try:
+        sigo2.iniciar_sesion(driver, nombre_sesion="benchmark")
+        sigo2.entrar_a_solicitud_finiquitos(driver)
+        inicio = time.perf_counter()
+        for finiquito_id in ids:
+            sigo2.procesar_finiquito(driver, finiquito_id)
+        return len(ids), time.perf_counter() - inicio
+    finally:
+        driver.quit()
+
+
+def flujo_sigo(estado, items, cronometro, directorio):
+    import sigo
+    from bitacora import Bitacora
+    from navegador import crear_driver
+
+    cronometro.envolver(sigo, [
+        "iniciar_sesion", "seleccionar_empresa", "seleccionar_estado", "seleccionar_monto",
+        "seleccionar_en_rafagas", "seleccionar_finiquitos", "descargar_carga_masiva",
+    ])
+    sigo.download_folder = os.path.join(directorio, "finiquitos")
+    os.makedirs(sigo.download_folder, exist_ok=True)
+
+    registro = Bitacora("benchmark_sigo")
+    driver = crear_driver(download_dir=sigo.download_folder)
+    try:
+        sigo.iniciar_sesion(driver)
+        inicio = time.perf_counter()
+        _, ids = sigo.exportar_carga_masiva(driver, registro)
+        return len(ids), time.perf_counter() - inicio
+    finally:
+        registro.cerrar()
+        driver.quit()
+
+
+def flujo_rut(estado, items, cronometro, directorio):
+    import rut
+    from bitacora import Bitacora
+    from navegador import crear_driver
+
+    cronometro.envolver(rut, [
+        "acceder_a_sigo", "buscar_rut_y_filtrar", "seleccionar_tipo_dt", "seleccionar_estado",
+        "escribir_rut", "seleccionar_finiquito_mas_reciente", "limpiar_rut", "cargar_masivo_dt",
+    ])
+    ruts = []
+    for f in estado.finiquitos.values():
+        if f["tipo"] == "DT" and f["estado"] == "Enviado al representante" and f["rut"] not in ruts:
+            ruts.append(f["rut"])
+    ruts = ruts[:items]
+
+    rut.DOWNLOAD_DIR = os.path.join(directorio, "finiquitos")
+    os.makedirs(rut.DOWNLOAD_DIR, exist_ok=True)
+    registro = Bitacora("benchmark_rut")
+    driver = crear_driver()
+    try:
+        rut.acceder_a_sigo(driver)
+        rut.acceder_a_solicitud_finiquitos(driver)
+        inicio = time.perf_counter()
+        rut.procesar_finiquitos_por_rut(driver, registro, ruts)
+        return len(ruts), time.perf_counter() - inicio
+    finally:
+        registro.cerrar()
+        driver.quit()
+
+
+def flujo_midt(estado, items, cronometro, directorio):
+    import robot
+
+    # robot.py agrega un handler de consola al logger raíz: aquí ensucia el reporte
+    logging.getLogger().removeHandler(robot.console_handler)
+    cronometro.envolver(robot, [
+        "iniciar_sesion", "navegar_perfil_empleador", "navegar_a_finiquitos_masivos", "subir_archivo",
+        "esperar_resultado_carga",
+    ])
+
+    archivos = []
+    filas = list(estado.finiquitos.values())
+    for n in range(items):
+        ruta = os.path.join(directorio, f"Informe DT #{n + 1}.csv")
+        with open(ruta, "w", encoding="utf-8", newline="") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["ID", "RUT", "TIPO", "ESTADO", "CLIENTE", "MONTO", "FECHA"])
+            for fila in filas[n * 10:(n + 1) * 10]:
+                escritor.writerow([fila[c] for c in ("id", "rut", "tipo", "estado", "cliente", "monto", "fecha")])
+        archivos.append(ruta)
+
+    driver = robot.setup_driver()
+    try:
+        robot.iniciar_sesion(driver)
+        inicio = time.perf_counter()
+        robot.subir_lotes(driver, [(robot.EMPRESA_DT, archivos)])
+        return len(archivos), time.perf_counter() - inicio
+    finally:
+        driver.quit()
+
+
+###############################
+# REPORTE
+###############################
+def resumir(flujo, items, segundos, cronometro):
+    return {
+        "flujo": flujo,
+        "items": items,
+        "segundos": round(segundos, 3),
+        "items_min": round(items / segundos * 60, 2) if segundos else 0.0,
+        "pasos": {
+            nombre: {
+                "n": len(tiempos),
+                "p50": round(percentil(tiempos, 50), 4),
+                "p95": round(percentil(tiempos, 95), 4),
+                "media": round(sum(tiempos) / len(tiempos), 4),
+            }
+            for nombre, tiempos in cronometro.tiempos.items() if tiempos
+        },
+    }
+
+
+def imprimir(resultado):
+    print(f"\n▶ {resultado['flujo']}: {resultado['items']} items en {resultado['segundos']}s "
+          f"=> {resultado['items_min']} items/min")
+    print(f"  {'Paso':<36}{'n':>6}{'p50':>10}{'p95':>10}{'media':>10}")
+    for nombre, m in sorted(resultado["pasos"].items(), key=lambda p: -p[1]["media"] * p[1]["n"]):
+        print(f"  {nombre:<36}{m['n']:>6}{m['p50']:>10.3f}{m['p95']:>10.3f}{m['media']:>10.3f}")
+
+
+def comparar(resultados, base, tolerancia):
+    """
+    Imprime las regresiones respecto de 'base' y devuelve cuántas hubo.
+    """
+    regresiones = 0
+    anteriores = {r["flujo"]: r for r in base}
+    for actual in resultados:
+        anterior = anteriores.get(actual["flujo"])
+        if not anterior:
+            continue
+        if actual["items_min"] < anterior["items_min"] * (1 - tolerancia):
+            regresiones += 1
+            print(f"❌ {actual['flujo']}: {anterior['items_min']} -> {actual['items_min']} items/min")
+        for nombre, m in actual["pasos"].items():
+            previo = anterior["pasos"].get(nombre)
+            if previo and m["p95"] > previo["p95"] * (1 + tolerancia) and m["p95"] - previo["p95"] > MINIMO_REGRESION:
+                regresiones += 1
+                print(f"❌ {actual['flujo']}.{nombre}: p95 {previo['p95']:.3f}s -> {m['p95']:.3f}s")
+    if not regresiones:
+        print(f"✅ Sin regresiones (tolerancia {tolerancia:.0%}).")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los flujos contra la réplica local de SIGO/MiDT.")
+    parser.add_argument("--flujo", choices=FLUJOS + ("todos",), default="todos")
+    parser.add_argument("--items", type=int, default=20, help="IDs, RUTs o archivos por flujo.")
+    parser.add_argument("--finiquitos", type=int, default=3000, help="Finiquitos en la réplica.")
+    parser.add_argument("--latencia", type=float, default=0.0)
+    parser.add_argument("--tasa-error", type=float, default=0.0)
+    parser.add_argument("--tasa-duplicados", type=float, default=0.05)
+    parser.add_argument("--tasa-rechazo", type=float, default=0.0)
+    parser.add_argument("--latencia-carga", type=float, default=1.0)
+    parser.add_argument("--visible", action="store_true", help="Chrome con ventana en vez de headless.")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo.")
+    parser.add_argument("--comparar", help="Resultados anteriores (--json) contra los que comparar.")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Empeoramiento aceptado (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    estado = sitios_mock.EstadoMock(
+        sigo_stub.generar_finiquitos(args.finiquitos), args.latencia, args.tasa_error,
+        args.tasa_duplicados, args.tasa_rechazo, args.latencia_carga,
+    )
+    servidor, url_sigo, url_midt = sitios_mock.crear_servidor(estado=estado)
+    directorio = tempfile.mkdtemp(prefix="bot_dt_bench-")
+    preparar_entorno(url_sigo, url_midt, directorio, args.visible)
+
+    flujos = FLUJOS if args.flujo == "todos" else (args.flujo,)
+    resultados = []
+    try:
+        for flujo in flujos:
+            cronometro = Cronometro()
+            items, segundos = globals()[f"flujo_{flujo}"](estado, args.items, cronometro, directorio)
+            resultado = resumir(flujo, items, segundos, cronometro)
+            imprimir(resultado)
+            resultados.append(resultado)
+    finally:
+        servidor.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            if comparar(resultados, json.load(f), args.tolerancia):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+BITACORA_ENV = "BOT_DT_BITACORA"
+
+# Resultados que no se repiten al reanudar (--resume)
+FINALIZADOS = {
+    "DATOS_GUARDADOS", "SKIP", "NO_BUTTON", "NO_ENCONTRADO",  # sigo2.py
+    "EXPORTADO",  # rut.py / sigo.py: ya salió en una CARGA MASIVA DT descargada
+    "RUT_INVALIDO", "DV_INCORRECTO",  # validacion.py: no vale la pena reintentarlos
+    "CARGA_SIN_CONFIRMAR",  # pipeline.py: MiDT pudo haberlo cargado, se revisa a mano
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    flujo TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    resultado TEXT NOT NULL,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    detalle TEXT,
+    corrida TEXT NOT NULL,
+    actualizado TEXT NOT NULL,
+    PRIMARY KEY (flujo, clave)
+);
+CREATE TABLE IF NOT EXISTS historial (
+    flujo TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    resultado TEXT NOT NULL,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    detalle TEXT,
+    corrida TEXT NOT NULL,
+    fecha TEXT NOT NULL
+);
+"""
+
+
+class Bitacora:
+    """
+    Registro persistente (SQLite en modo WAL) del resultado de cada ID/RUT.
+    Cada escritura se confirma al momento, así un crash no pierde lo avanzado.
+    Seguro de usar desde varios procesos (cada uno con su propia Bitacora).
+    """
+
+    def __init__(self, flujo, ruta=None, corrida=None):
+        self.flujo = flujo
+        self.corrida = corrida or datetime.now().strftime("%Y%m%d-%H%M%S")
+        # Ruta leída al abrir, no al importar: benchmark.py la redirige después
+        ruta = ruta or os.getenv(BITACORA_ENV) or os.path.join(os.getcwd(), "bitacora.db")
+        self.conexion = sqlite3.connect(ruta, timeout=30, isolation_level=None)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(ESQUEMA)
+
+    def registrar(self, clave, resultado, intentos=0, detalle=None):
+        ahora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        clave = str(clave)
+        with self.conexion:
+            self.conexion.execute("BEGIN IMMEDIATE")
+            self.conexion.execute(
+                """
+                INSERT INTO items (flujo, clave, resultado, intentos, detalle, corrida, actualizado)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (flujo, clave) DO UPDATE SET
+                    resultado = excluded.resultado,
+                    intentos = excluded.intentos,
+                    detalle = excluded.detalle,
+                    corrida = excluded.corrida,
+                    actualizado = excluded.actualizado
+                """,
+                (self.flujo, clave, resultado, intentos, detalle, self.corrida, ahora),
+            )
+            self.conexion.execute(
+                "INSERT INTO historial (flujo, clave, resultado, intentos, detalle, corrida, fecha) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.flujo, clave, resultado, intentos, detalle, self.corrida, ahora),
+            )
+
+    def registrar_varios(self, claves, resultado, detalle=None):
+        for clave in claves:
+            self.registrar(clave, resultado, detalle=detalle)
+
+    def finalizados(self):
+        """
+        Claves de este flujo cuyo último resultado es final.
+        """
+        marcas = ",".join("?" * len(FINALIZADOS))
+        filas = self.conexion.execute(
+            f"SELECT clave FROM items WHERE flujo = ? AND resultado IN ({marcas})",
+            (self.flujo, *sorted(FINALIZADOS)),
+        )
+        return {clave for (clave,) in filas}
+
+    def pendientes(self, claves):
+        """
+        Filtra 'claves' dejando solo las que no están finalizadas (para --resume).
+        """
+        hechos = self.finalizados()
+        restantes = [c for c in claves if str(c) not in hechos]
+        if len(restantes) < len(claves):
+            logger.info(f"⏭ Reanudando {self.flujo}: se omiten {len(claves) - len(restantes)} ya finalizados.")
+        return restantes
+
+    def cerrar(self):
+        self.conexion.close()
@@ -0,0 +1,120 @@
+import codecs
+import csv
+import logging
+import os
+import tempfile
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Codificación del CSV que se sube a MiDT. UTF-8, igual que el antiguo
+# df.to_csv(encoding=None) (pandas escribe UTF-8 si no se indica otra).
+ENCODING_SALIDA = os.getenv("DT_CSV_ENCODING") or "utf-8"
+
+# Columnas obligatorias (separadas por coma, sin distinguir mayúsculas) que debe
+# traer el encabezado: las que leen robot.ids_del_csv y validacion.validar_filas.
+# DT_CSV_COLUMNAS="" desactiva el chequeo y solo se valida la forma.
+COLUMNAS_DT = [c.strip() for c in os.getenv("DT_CSV_COLUMNAS", "ID,RUT").split(",") if c.strip()]
+
+DELIMITADORES = ",;\t|"
+ENCODINGS_ENTRADA = ("utf-8", "cp1252")
+TAMANO_MUESTRA = 64 * 1024
+
+
+class ErrorFormatoCSV(ValueError):
+    pass
+
+
+def detectar_formato(ruta):
+    """
+    Lee solo el comienzo del archivo y devuelve (encoding, delimitador).
+    El BOM UTF-8 se detecta y se descarta con 'utf-8-sig'.
+    """
+    with open(ruta, "rb") as f:
+        muestra = f.read(TAMANO_MUESTRA)
+
+    if muestra.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    else:
+        encoding = None
+        for candidato in ENCODINGS_ENTRADA:
+            try:
+                # Un multibyte cortado al final de la muestra no invalida el archivo
+                codecs.getincrementaldecoder(candidato)().decode(muestra, final=False)
+                encoding = candidato
+                break
+            except UnicodeDecodeError:
+                continue
+        if encoding is None:
+            encoding = "latin-1"
+
+    texto = muestra.decode(encoding, errors="ignore")
+    primera_linea = texto.splitlines()[0] if texto else ""
+    try:
+        delimitador = csv.Sniffer().sniff(texto, delimiters=DELIMITADORES).delimiter
+    except csv.Error:
+        # Con pocas filas el Sniffer falla: se elige el más frecuente del encabezado
+        delimitador = max(DELIMITADORES, key=primera_linea.count) if primera_linea else ","
+    return encoding, delimitador
+
+
+def _validar_encabezado(encabezado, columnas_esperadas):
+    nombres = [c.strip() for c in encabezado]
+    if not any(nombres):
+        raise ErrorFormatoCSV("El archivo no tiene encabezado.")
+    if any(not n for n in nombres):
+        raise ErrorFormatoCSV(f"Hay columnas sin nombre en el encabezado: {nombres}")
+    repetidas = {n for n in nombres if nombres.count(n) > 1}
+    if repetidas:
+        raise ErrorFormatoCSV(f"Columnas repetidas en el encabezado: {sorted(repetidas)}")
+    presentes = {n.upper().lstrip("\ufeff") for n in nombres}
+    faltantes = [c for c in columnas_esperadas if c.upper() not in presentes]
+    if faltantes:
+        raise ErrorFormatoCSV(f"Faltan columnas requeridas por el portal DT: {faltantes}")
+
+
+def normalizar_csv(origen, destino=None, encoding_salida=ENCODING_SALIDA, columnas_esperadas=None):
+    """
+    Transcodifica fila a fila 'origen' a CSV separado por comas en
+    'encoding_salida', validando el esquema mientras lee. Escribe en un
+    temporal y lo renombra sobre 'destino' (por defecto el mismo archivo),
+    así un error deja el original intacto. Devuelve (destino, n_filas).
+    """
+    destino = destino or origen
+    columnas_esperadas = COLUMNAS_DT if columnas_esperadas is None else columnas_esperadas
+    encoding, delimitador = detectar_formato(origen)
+
+    fd, temporal = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(destino)), suffix=".tmp")
+    filas = 0
+    try:
+        with open(origen, "r", encoding=encoding, newline="") as entrada, \
+                os.fdopen(fd, "w", encoding=encoding_salida, newline="") as salida:
+            lector = csv.reader(entrada, delimiter=delimitador)
+            escritor = csv.writer(salida, delimiter=",", lineterminator=os.linesep)
+
+            encabezado = next(lector, None)
+            if encabezado is None:
+                raise ErrorFormatoCSV("El archivo está vacío.")
+            _validar_encabezado(encabezado, columnas_esperadas)
+            escritor.writerow(encabezado)
+
+            for fila in lector:
+                if not any(campo.strip() for campo in fila):
+                    continue  # líneas en blanco
+                if len(fila) != len(encabezado):
+                    raise ErrorFormatoCSV(
+                        f"Línea {lector.line_num}: {len(fila)} campos, se esperaban {len(encabezado)}."
+                    )
+                escritor.writerow(fila)
+                filas += 1
+
+        os.replace(temporal, destino)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+    logger.info(f"✅ CSV normalizado ({encoding}, '{delimitador}' -> {encoding_salida}, ','): {filas} filas.")
+    return destino, filas
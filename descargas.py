@@ -0,0 +1,165 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import shutil
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# Sufijos de archivos que Chrome aún está escribiendo
+SUFIJOS_PARCIALES = (".crdownload", ".tmp", ".part")
+
+TIMEOUT_DESCARGA = 60
+# Segundos que el tamaño debe mantenerse igual para dar la descarga por terminada
+ESTABILIDAD = 0.3
+INTERVALO_SONDEO = 0.1
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+
+class ErrorDescarga(TimeoutError):
+    pass
+
+
+class _Vigilante:
+    """
+    Espera cambios en un directorio con inotify (Linux). Si no está disponible
+    cae a sondeo cada INTERVALO_SONDEO segundos.
+    """
+
+    def __init__(self, directorio):
+        self.fd = None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1")
+            mascara = IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE | IN_MODIFY
+            if libc.inotify_add_watch(fd, os.fsencode(directorio), mascara) < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch")
+            self.fd = fd
+        except (OSError, AttributeError, TypeError) as e:
+            logger.debug(f"inotify no disponible, se usa sondeo: {e}")
+
+    def esperar(self, timeout):
+        if self.fd is None:
+            time.sleep(min(timeout, INTERVALO_SONDEO))
+            return
+        listos, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if listos:
+            # Vaciar los eventos pendientes; solo interesa que hubo cambios
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def cerrar(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def preparar_directorio(base):
+    """
+    Crea un directorio de descargas exclusivo para esta corrida dentro de 'base'.
+    """
+    os.makedirs(base, exist_ok=True)
+    return tempfile.mkdtemp(prefix=".descarga-", dir=base)
+
+
+def dirigir_descargas(driver, directorio):
+    """
+    Cambia en caliente la carpeta de descargas de Chrome (vía CDP).
+    """
+    driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+        "behavior": "allow",
+        "downloadPath": os.path.abspath(directorio),
+    })
+
+
+def _estado(directorio):
+    terminados, parciales = {}, 0
+    for entrada in os.scandir(directorio):
+        if not entrada.is_file() or entrada.name.startswith("."):
+            continue
+        if entrada.name.endswith(SUFIJOS_PARCIALES):
+            parciales += 1
+        else:
+            terminados[entrada.path] = entrada.stat().st_size
+    return terminados, parciales
+
+
+def esperar_descarga(directorio, timeout=TIMEOUT_DESCARGA, estabilidad=ESTABILIDAD):
+    """
+    Espera a que en 'directorio' haya un archivo terminado (sin .crdownload
+    pendientes) cuyo tamaño no cambie durante 'estabilidad' segundos.
+    Devuelve su ruta o lanza ErrorDescarga al vencer 'timeout'.
+    """
+    limite = time.monotonic() + timeout
+    anterior, estable_desde = None, None
+
+    with _Vigilante(directorio) as vigilante:
+        while True:
+            terminados, parciales = _estado(directorio)
+            ahora = time.monotonic()
+
+            if terminados and not parciales:
+                if terminados == anterior:
+                    if ahora - estable_desde >= estabilidad:
+                        ruta = max(terminados, key=os.path.getmtime)
+                        logger.info(f"📥 Descarga completa: {ruta} ({terminados[ruta]} bytes)")
+                        return ruta
+                else:
+                    anterior, estable_desde = terminados, ahora
+            else:
+                anterior, estable_desde = None, None
+
+            if ahora >= limite:
+                raise ErrorDescarga(
+                    f"La descarga no terminó en {timeout}s "
+                    f"({len(terminados)} terminados, {parciales} en curso) en {directorio}"
+                )
+
+            # Con archivo candidato hay que volver a mirar al cumplirse la estabilidad
+            espera = limite - ahora
+            if anterior is not None:
+                espera = min(espera, estabilidad - (ahora - estable_desde))
+            vigilante.esperar(max(espera, 0.01))
+
+
+def mover_a(ruta, destino_dir, nombre=None):
+    """
+    Mueve la descarga terminada a 'destino_dir' (sin pisar archivos), con su
+    nombre original o 'nombre', y borra el directorio temporal si quedó
+    vacío. Devuelve la ruta final.
+    """
+    nombre = nombre or os.path.basename(ruta)
+    destino = os.path.join(destino_dir, nombre)
+    base, extension = os.path.splitext(nombre)
+    n = 1
+    while os.path.exists(destino):
+        destino = os.path.join(destino_dir, f"{base} ({n}){extension}")
+        n += 1
+    shutil.move(ruta, destino)
+    try:
+        os.rmdir(os.path.dirname(ruta))
+    except OSError:
+        pass
+    return destino
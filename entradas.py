@@ -0,0 +1,136 @@
+"""
+Lectura perezosa de listas de RUTs o IDs, sin editar el código:
+
+    python rut.py --entrada ruts.xlsx --columna RUT
+    python sigo2.py --entrada ids.csv
+    cut -d';' -f1 export.csv | python sigo2.py --entrada -
+
+Formatos: .csv (encoding y delimitador detectados), .xlsx (openpyxl en modo
+read_only) y texto con un valor por línea (también stdin con '-'). Todo se
+lee como generador: una lista de decenas de miles de valores no se carga
+entera en memoria.
+"""
+import csv
+import logging
+import os
+import sys
+
+from csv_dt import detectar_formato
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONES_XLSX = (".xlsx", ".xlsm")
+
+
+def _texto(celda):
+    if celda is None:
+        return ""
+    if isinstance(celda, float) and celda.is_integer():
+        # Excel guarda los IDs numéricos como float
+        return str(int(celda))
+    return str(celda).strip()
+
+
+def _valores(filas, columna=None):
+    """
+    Valores de una columna de 'filas' (iterador de listas de celdas).
+    'columna' es el nombre del encabezado o su número (desde 1); sin ella se
+    usa la primera, y la primera fila se toma como encabezado solo si no
+    tiene dígitos (un RUT o un ID siempre los tiene).
+    """
+    primera = next(filas, None)
+    if primera is None:
+        return
+    celdas = [_texto(c) for c in primera]
+
+    if columna is None:
+        indice = 0
+        if celdas and any(ch.isdigit() for ch in celdas[0]):
+            yield celdas[0]
+    elif str(columna).isdigit():
+        indice = int(columna) - 1
+        if indice < len(celdas) and any(ch.isdigit() for ch in celdas[indice]):
+            yield celdas[indice]
+    else:
+        nombres = [c.upper().lstrip("\ufeff") for c in celdas]
+        if str(columna).upper() not in nombres:
+            raise ValueError(f"No existe la columna '{columna}' (encabezado: {', '.join(celdas)})")
+        indice = nombres.index(str(columna).upper())
+
+    for fila in filas:
+        if indice < len(fila):
+            valor = _texto(fila[indice])
+            if valor:
+                yield valor
+
+
+def leer_lineas(archivo):
+    for linea in archivo:
+        valor = linea.strip().lstrip("\ufeff")
+        if valor and not valor.startswith("#"):
+            yield valor
+
+
+def leer_csv(ruta, columna=None):
+    encoding, delimitador = detectar_formato(ruta)
+    with open(ruta, encoding=encoding, newline="") as f:
+        yield from _valores(csv.reader(f, delimiter=delimitador), columna)
+
+
+def leer_xlsx(ruta, columna=None, hoja=None):
+    # Import diferido: openpyxl solo se necesita para planillas
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("Leer .xlsx requiere openpyxl (pip install openpyxl).") from None
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        planilla = libro[hoja] if hoja else libro.worksheets[0]
+        yield from _valores(planilla.iter_rows(values_only=True), columna)
+    finally:
+        libro.close()
+
+
+def leer(fuente, columna=None, hoja=None):
+    """
+    Generador con los valores de 'fuente' (ruta o '-' para stdin), en orden.
+    """
+    if fuente == "-":
+        yield from leer_lineas(sys.stdin)
+        return
+    extension = os.path.splitext(fuente)[1].lower()
+    if extension == ".csv":
+        yield from leer_csv(fuente, columna)
+    elif extension in EXTENSIONES_XLSX:
+        yield from leer_xlsx(fuente, columna, hoja)
+    else:
+        with open(fuente, encoding="utf-8-sig") as f:
+            yield from leer_lineas(f)
+
+
+def sin_repetidos(items, clave=None):
+    """
+    Deja pasar cada item la primera vez que aparece, conservando el orden.
+    """
+    vistos = set()
+    for item in items:
+        k = clave(item) if clave else item
+        if k in vistos:
+            continue
+        vistos.add(k)
+        yield item
+
+
+def omitir_finalizados(items, finalizados, flujo=""):
+    """
+    Versión perezosa de Bitacora.pendientes para --resume.
+    """
+    omitidos = 0
+    for item in items:
+        if str(item) in finalizados:
+            omitidos += 1
+            continue
+        yield item
+    if omitidos:
+        logger.info(f"⏭ Reanudando {flujo}: se omitieron {omitidos} ya finalizados.")
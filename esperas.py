@@ -0,0 +1,174 @@
+import logging
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# Timeouts estándar para las esperas por condición
+SHORT_TIMEOUT = 5
+LONG_TIMEOUT = 15
+
+# Tiempo (segundos) sin mutaciones en la tabla para considerarla estable
+QUIETUD_TABLA = 0.15
+
+# Intervalo de sondeo de las esperas (WebDriverWait usa 0.5s por defecto)
+INTERVALO_SONDEO = 0.05
+
+# Instala (una sola vez por página) un MutationObserver sobre table.highlight y
+# contadores de peticiones XHR/fetch enviadas y pendientes. Devuelve el estado actual.
+JS_ESTADO_PAGINA = """
+if (!window.__botdt) {
+    var estado = {versionTabla: 0, ultimaMutacion: 0, pendientes: 0, enviadas: 0};
+    window.__botdt = estado;
+
+    var tocaTabla = function (nodo) {
+        if (!nodo || nodo.nodeType !== 1) { return false; }
+        if (nodo.matches('table.highlight, table.highlight *')) { return true; }
+        return !!(nodo.querySelector && nodo.querySelector('table.highlight'));
+    };
+    new MutationObserver(function (registros) {
+        for (var i = 0; i < registros.length; i++) {
+            var r = registros[i];
+            var cambio = r.target.nodeType === 1 && r.target.matches('table.highlight, table.highlight *');
+            for (var j = 0; !cambio && j < r.addedNodes.length; j++) {
+                cambio = tocaTabla(r.addedNodes[j]);
+            }
+            if (cambio) {
+                estado.versionTabla += 1;
+                estado.ultimaMutacion = performance.now();
+                return;
+            }
+        }
+    }).observe(document.body, {childList: true, subtree: true, characterData: true});
+
+    var enviar = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        estado.pendientes += 1;
+        estado.enviadas += 1;
+        this.addEventListener('loadend', function () { estado.pendientes -= 1; });
+        return enviar.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetchOriginal = window.fetch;
+        window.fetch = function () {
+            estado.pendientes += 1;
+            estado.enviadas += 1;
+            return fetchOriginal.apply(this, arguments).finally(function () { estado.pendientes -= 1; });
+        };
+    }
+}
+var s = window.__botdt;
+return {
+    version: s.versionTabla,
+    quieto: performance.now() - s.ultimaMutacion,
+    pendientes: s.pendientes + ((window.jQuery && window.jQuery.active) || 0),
+    enviadas: s.enviadas
+};
+"""
+
+
+def estado_pagina(driver):
+    """
+    Devuelve {'version', 'quieto', 'pendientes', 'enviadas'} instalando los observadores si hace falta.
+    """
+    return driver.execute_script(JS_ESTADO_PAGINA)
+
+
+def version_tabla(driver):
+    """
+    Versión actual de table.highlight. Llamar ANTES de la acción que la re-renderiza.
+    """
+    return estado_pagina(driver)["version"]
+
+
+def esperar_ajax(driver, timeout=LONG_TIMEOUT):
+    """
+    Espera a que no queden peticiones jQuery/XHR/fetch pendientes.
+    Devuelve True si la página quedó ociosa, False si se agotó el tiempo.
+    """
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=INTERVALO_SONDEO).until(
+            lambda d: estado_pagina(d)["pendientes"] <= 0
+        )
+        return True
+    except TimeoutException:
+        logger.warning(f"⚠ Quedaron peticiones pendientes tras {timeout}s.")
+        return False
+
+
+def esperar_tabla_actualizada(driver, version_previa, timeout=LONG_TIMEOUT, quietud=QUIETUD_TABLA):
+    """
+    Espera a que table.highlight cambie respecto a 'version_previa', que no haya
+    peticiones en curso y que la tabla lleve 'quietud' segundos sin mutar.
+
+    Si el filtro no altera el contenido la tabla puede no re-renderizarse: en ese
+    caso basta con que la red quede ociosa y se devuelve False al agotar el tiempo.
+    """
+    def _lista(d):
+        estado = estado_pagina(d)
+        return (
+            estado["version"] > version_previa
+            and estado["pendientes"] <= 0
+            and estado["quieto"] >= quietud * 1000
+        )
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=INTERVALO_SONDEO).until(_lista)
+        return True
+    except TimeoutException:
+        logger.info(f"ℹ La tabla no se re-renderizó en {timeout}s.")
+        return False
+
+
+def esperar_respuesta(driver, previo, timeout=LONG_TIMEOUT):
+    """
+    Espera a que, desde 'previo' (estado_pagina tomado ANTES de la acción), la
+    página haya enviado una petición o re-renderizado la tabla, y a que la red
+    quede ociosa. Para filtros que pueden dejar la tabla vacía como estaba: ahí
+    no hay re-render, y la red ociosa antes del keyup (con debounce) no prueba
+    nada. Devuelve False si en 'timeout' no pasó nada.
+    """
+    def _lista(d):
+        estado = estado_pagina(d)
+        respondio = estado["enviadas"] > previo["enviadas"] or estado["version"] > previo["version"]
+        return respondio and estado["pendientes"] <= 0
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=INTERVALO_SONDEO).until(_lista)
+        return True
+    except TimeoutException:
+        logger.warning(f"⚠ La página no respondió a la acción en {timeout}s.")
+        return False
+
+
+def tras_accion(driver, accion, timeout=LONG_TIMEOUT):
+    """
+    Ejecuta 'accion()' y espera el re-render de la tabla que provoca.
+    Devuelve el resultado de 'accion'.
+    """
+    version = version_tabla(driver)
+    resultado = accion()
+    if not esperar_tabla_actualizada(driver, version, timeout=min(timeout, SHORT_TIMEOUT)):
+        esperar_ajax(driver, timeout)
+    return resultado
+
+
+def esperar_input_estable(driver, elemento, valor, timeout=SHORT_TIMEOUT):
+    """
+    Espera a que el input tenga exactamente 'valor' (los keyup del filtro ya
+    se dispararon) y a que la red quede ociosa.
+    """
+    inicio = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=INTERVALO_SONDEO).until(
+            lambda d: (elemento.get_attribute("value") or "") == str(valor)
+        )
+    except TimeoutException:
+        logger.warning(f"⚠ El input no llegó al valor '{valor}' en {timeout}s.")
+        return False
+    except WebDriverException as e:
+        logger.warning(f"⚠ Error leyendo el input: {str(e)}")
+        return False
+    restante = max(timeout - (time.monotonic() - inicio), 0.5)
+    return esperar_ajax(driver, restante)
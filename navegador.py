@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Perfil "ligero": headless, viewport fijo y sin recursos no esenciales.
+# Se activa con BOT_DT_LIGERO=1 o pasando ligero=True a crear_driver().
+PERFIL_LIGERO = os.getenv("BOT_DT_LIGERO", "0") == "1"
+
+# chromedriver: variable CHROMEDRIVER, luego la ruta fija de robot.py y por
+# último la caché local por versión de Chrome (solo ahí se consulta la red).
+CHROMEDRIVER_ENV = os.getenv("CHROMEDRIVER")
+CHROMEDRIVER_DEFECTO = "/usr/local/bin/chromedriver"
+CACHE_CHROMEDRIVER = os.path.join(os.path.expanduser("~"), ".cache", "bot_dt", "chromedriver.json")
+BINARIOS_CHROME = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+# Viewport fijo del perfil ligero. Materialize pasa a layout móvil bajo 993px
+# y los ids de filtros/paginación cambian de posición, así que no bajamos de ahí.
+VIEWPORT = (1280, 800)
+
+# Recursos bloqueados vía CDP. Las hojas de estilo NO se bloquean: las esperas
+# de visibilidad (dropdowns, modal, toasts) dependen del CSS de Materialize.
+RECURSOS_BLOQUEADOS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*google-analytics.com*", "*googletagmanager.com*",
+]
+
+
+def version_chrome():
+    """
+    Versión mayor del Chrome instalado ("132"), o None si no se encuentra.
+    """
+    for binario in BINARIOS_CHROME:
+        ruta = shutil.which(binario)
+        if not ruta:
+            continue
+        try:
+            salida = subprocess.run([ruta, "--version"], capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        coincidencia = re.search(r"(\d+)\.\d+\.\d+", salida)
+        if coincidencia:
+            return coincidencia.group(1)
+    return None
+
+
+def _leer_cache():
+    try:
+        with open(CACHE_CHROMEDRIVER, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_CHROMEDRIVER), exist_ok=True)
+    temporal = CACHE_CHROMEDRIVER + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(temporal, CACHE_CHROMEDRIVER)
+
+
+def resolver_chromedriver():
+    """
+    Devuelve la ruta de chromedriver sin tocar la red salvo que la caché no
+    tenga un binario para la versión de Chrome instalada.
+    """
+    for ruta in (CHROMEDRIVER_ENV, CHROMEDRIVER_DEFECTO):
+        if ruta and os.access(ruta, os.X_OK):
+            return ruta
+
+    version = version_chrome() or "desconocida"
+    cache = _leer_cache()
+    ruta = cache.get(version)
+    if ruta and os.access(ruta, os.X_OK):
+        return ruta
+
+    # Solo aquí se importa webdriver_manager (consulta versiones por la red)
+    from webdriver_manager.chrome import ChromeDriverManager
+    ruta = ChromeDriverManager().install()
+    cache[version] = ruta
+    _guardar_cache(cache)
+    logger.info(f"chromedriver para Chrome {version} guardado en caché: {ruta}")
+    return ruta
+
+
+def opciones_chrome(ligero=PERFIL_LIGERO, download_dir=None):
+    options = webdriver.ChromeOptions()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    if ligero:
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={VIEWPORT[0]},{VIEWPORT[1]}")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-sync")
+        options.add_argument("--mute-audio")
+        options.add_argument("--no-first-run")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    else:
+        options.add_argument("--start-maximized")
+
+    if download_dir:
+        # Para descargas automáticas
+        options.add_experimental_option("prefs", {
+            "download.default_directory": download_dir,
+            "download.prompt_for_download": False,
+            "safebrowsing.enabled": True,
+            "profile.default_content_settings.popups": 0,
+            "filebrowser.download.dir": download_dir,
+        })
+    return options
+
+
+def bloquear_recursos(driver, patrones=RECURSOS_BLOQUEADOS):
+    """
+    Bloquea por CDP las peticiones de imágenes, fuentes, media y analítica.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patrones)})
+    except Exception as e:
+        logger.warning(f"⚠ No se pudo activar el bloqueo de recursos: {str(e)}")
+
+
+def crear_driver(ligero=None, download_dir=None, chromedriver=None):
+    """
+    Crea el Chrome de los scripts. 'chromedriver' es la ruta del binario;
+    si no se indica se resuelve con resolver_chromedriver().
+    """
+    if ligero is None:
+        ligero = PERFIL_LIGERO
+
+    if chromedriver is None:
+        chromedriver = resolver_chromedriver()
+
+    driver = webdriver.Chrome(
+        service=Service(chromedriver),
+        options=opciones_chrome(ligero=ligero, download_dir=download_dir),
+    )
+
+    if ligero:
+        bloquear_recursos(driver)
+        if download_dir:
+            # En headless las prefs de descarga no siempre se respetan
+            driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+                "behavior": "allow",
+                "downloadPath": download_dir,
+            })
+        logger.info("🪶 Chrome iniciado con perfil ligero (headless).")
+    return driver
@@ -0,0 +1,223 @@
+"""
+Paginación de table.highlight sin recorrer los números de a uno:
+
+- La función que usan los propios enlaces de la paginación (onclick="X.Listar(3)")
+  se llama directo para saltar a cualquier página, visible o no.
+- El total de páginas y el tamaño de página se leen una vez del objeto dueño
+  de esa función; si el cliente lo permite se piden páginas más grandes.
+- Cada salto se confirma por los IDs de las filas, no por la etiqueta activa.
+
+Si la página no expone esa función se hace clic en los enlaces visibles. Si
+la paginación tiene números pero el selector no los encuentra, o una página
+llena no trae paginación alguna, es un error (ErrorPaginacion): se leería
+solo la primera página.
+"""
+import logging
+import os
+
+import esperas
+import tabla
+
+logger = logging.getLogger(__name__)
+
+# Filas por página a pedir si el cliente expone el tamaño (0 = no tocarlo)
+FILAS_POR_PAGINA = int(os.getenv("BOT_DT_FILAS_POR_PAGINA", "100"))
+
+# Filas que muestra SIGO por página si no se conoce el tamaño
+FILAS_PAGINA_SIGO = 10
+
+# Enlaces de la paginación de SIGO (el activo además tiene 'active')
+SELECTOR_ENLACES = "li.indigo.darken-1 > a"
+
+# Contenedor de la paginación: con una sola página SIGO lo deja sin números
+SELECTOR_CONTENEDOR = "ul.pagination"
+
+# Nombres que suelen tener el total de páginas y el tamaño en el objeto de la tabla
+PROPIEDADES_TOTAL = ("paginas", "totalPaginas", "total_paginas")
+PROPIEDADES_TAMANO = ("porPagina", "por_pagina", "pageSize", "limite")
+
+JS_PAGINACION = """
+var enlaces = document.querySelectorAll(arguments[2]);
+var info = {actual: null, visibles: [], llamada: null, total: null, propiedad: null, tamano: null,
+            contenedor: false, numeros: 0};
+var caja = document.querySelector(arguments[3]);
+if (caja) {
+    info.contenedor = true;
+    caja.querySelectorAll('li').forEach(function (li) {
+        if (/^\\d+$/.test(li.textContent.trim())) { info.numeros++; }
+    });
+}
+for (var i = 0; i < enlaces.length; i++) {
+    var a = enlaces[i], n = parseInt(a.textContent.trim(), 10);
+    if (isNaN(n)) { continue; }
+    info.visibles.push(n);
+    if (a.parentNode.classList.contains('active')) { info.actual = n; }
+    var m = (a.getAttribute('onclick') || '').match(/([\\w$.]+)\\(\\s*(\\d+)\\s*\\)/);
+    if (m && parseInt(m[2], 10) === n && !info.llamada) { info.llamada = m[1]; }
+}
+if (info.llamada) {
+    var partes = info.llamada.split('.'), duenio = window;
+    partes.pop();
+    for (var j = 0; j < partes.length && duenio; j++) { duenio = duenio[partes[j]]; }
+    if (duenio && partes.length) {
+        arguments[0].forEach(function (k) {
+            if (info.total === null && typeof duenio[k] === 'number') { info.total = duenio[k]; }
+        });
+        arguments[1].forEach(function (k) {
+            if (info.propiedad === null && typeof duenio[k] === 'number') { info.propiedad = k; info.tamano = duenio[k]; }
+        });
+    }
+}
+return info;
+"""
+
+# arguments: llamada ('obj.Funcion'), página y opcionalmente [propiedad, valor] a fijar antes
+JS_SALTAR = """
+var partes = arguments[0].split('.'), nombre = partes.pop(), duenio = window;
+for (var i = 0; i < partes.length; i++) { duenio = duenio[partes[i]]; }
+if (arguments[2]) { duenio[arguments[2][0]] = arguments[2][1]; }
+duenio[nombre](arguments[1]);
+"""
+
+JS_CLIC = """
+var enlaces = document.querySelectorAll(arguments[1]);
+for (var i = 0; i < enlaces.length; i++) {
+    if (enlaces[i].textContent.trim() === String(arguments[0])) { enlaces[i].click(); return true; }
+}
+return false;
+"""
+
+
+class ErrorPaginacion(Exception):
+    pass
+
+
+class Paginador:
+    """
+    Cursor sobre las páginas de table.highlight. Crear después de aplicar
+    los filtros (la tabla ya en la página 1 o donde haya quedado).
+    """
+
+    def __init__(self, driver, filas_por_pagina=FILAS_POR_PAGINA, intentos=3):
+        self.driver = driver
+        self.intentos = intentos
+        info = self._info()
+        self.llamada = info["llamada"]
+        self.actual = info["actual"] or 1
+        self.total = info["total"]
+        self.tamano = info["tamano"]
+        self._verificar(info)
+        if self.llamada and info["propiedad"] and self.actual == 1 and filas_por_pagina > (self.tamano or 0):
+            self._ampliar(info["propiedad"], filas_por_pagina)
+        logger.info(f"📑 Paginación: {self.total or '?'} páginas de {self.tamano or '?'} filas "
+                    f"({'salto por ' + self.llamada if self.llamada else 'clic en enlaces'}).")
+
+    def _info(self):
+        return self.driver.execute_script(
+            JS_PAGINACION, list(PROPIEDADES_TOTAL), list(PROPIEDADES_TAMANO), SELECTOR_ENLACES,
+            SELECTOR_CONTENEDOR,
+        )
+
+    def _verificar(self, info):
+        """
+        Sin enlaces de paginación solo puede haber una página: la paginación
+        existe sin números (o con solo el 1) o, si no está, la página no está llena.
+        """
+        if info["visibles"]:
+            return
+        if info["contenedor"]:
+            if info["numeros"] <= 1:
+                return
+            raise ErrorPaginacion(
+                f"La paginación ({SELECTOR_CONTENEDOR}) muestra {info['numeros']} páginas "
+                f"pero el selector {SELECTOR_ENLACES} no las encuentra."
+            )
+        filas = len(self.ids_pagina())
+        if filas >= (self.tamano or FILAS_PAGINA_SIGO):
+            raise ErrorPaginacion(
+                f"La tabla muestra {filas} filas pero no se encontró la paginación ({SELECTOR_ENLACES})."
+            )
+
+    def ids_pagina(self):
+        return [fila["id"] for fila in tabla.snapshot(self.driver) if fila["id"]]
+
+    def _ampliar(self, propiedad, filas):
+        """
+        Pide páginas de 'filas' filas; si el servidor no hace caso se vuelve al tamaño original.
+        """
+        antes = len(self.ids_pagina())
+        original = self.tamano
+        self._saltar(1, (propiedad, filas))
+        despues = len(self.ids_pagina())
+        info = self._info()
+        if despues > antes or (info["total"] or 0) == 1:
+            self.tamano, self.total = filas, info["total"]
+            logger.info(f"📑 Tamaño de página ampliado de {original} a {filas} filas.")
+        else:
+            self._saltar(1, (propiedad, original))
+            logger.info(f"ℹ El servidor no aceptó páginas de {filas} filas; se mantienen {original}.")
+
+    def _saltar(self, numero, fijar=None):
+        version = esperas.version_tabla(self.driver)
+        self.driver.execute_script(JS_SALTAR, self.llamada, numero, list(fijar) if fijar else None)
+        if not esperas.esperar_tabla_actualizada(self.driver, version, timeout=esperas.LONG_TIMEOUT):
+            esperas.esperar_ajax(self.driver)
+
+    def _clic(self, numero):
+        """
+        Sin función de salto: clic en el enlace visible más cercano a 'numero'.
+        """
+        visibles = self._info()["visibles"]
+        if not visibles:
+            return
+        version = esperas.version_tabla(self.driver)
+        self.driver.execute_script(JS_CLIC, min(visibles, key=lambda n: abs(n - numero)), SELECTOR_ENLACES)
+        esperas.esperar_tabla_actualizada(self.driver, version, timeout=esperas.LONG_TIMEOUT)
+
+    def ir_a(self, numero):
+        """
+        Va a la página 'numero' y la confirma por los IDs de sus filas.
+        Devuelve False si la página no existe; lanza ErrorPaginacion si no
+        se pudo llegar tras varios intentos.
+        """
+        if numero == self.actual:
+            return True
+        if numero < 1 or (self.total is not None and numero > self.total):
+            return False
+
+        anteriores = set(self.ids_pagina())
+        for intento in range(1, self.intentos + 1):
+            if self.llamada:
+                self._saltar(numero)
+            else:
+                # De a un enlace visible por vez hasta que aparezca el buscado
+                for _ in range(numero + 10):
+                    self._clic(numero)
+                    if self._info()["actual"] in (numero, None):
+                        break
+
+            ids = self.ids_pagina()
+            info = self._info()
+            if ids and not anteriores.intersection(ids) and info["actual"] in (numero, None):
+                self.actual = numero
+                self.total = info["total"] or self.total
+                return True
+            if not ids and info["actual"] in (numero, None):
+                return False  # más allá de la última página
+            logger.warning(f"⚠ La página {numero} no se confirmó (intento {intento}/{self.intentos}).")
+            esperas.esperar_ajax(self.driver)
+        raise ErrorPaginacion(f"No se pudo llegar a la página {numero} (página actual {self.actual}).")
+
+    def hay_siguiente(self):
+        if self.total is not None:
+            return self.actual < self.total
+        # Sin total conocido: la ventana de enlaces siempre incluye la siguiente si existe
+        info = self._info()
+        self._verificar(info)
+        return self.actual + 1 in info["visibles"]
+
+    def siguiente(self):
+        """
+        Avanza una página. False al llegar al final de la tabla.
+        """
+        return self.hay_siguiente() and self.ir_a(self.actual + 1)
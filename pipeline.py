@@ -0,0 +1,225 @@
+"""
+Pipeline completo en un solo proceso:
+
+    SIGO (CARGA MASIVA DT) -> MiDT (ingreso de finiquito masivo) -> SIGO ('Subido al portal DT')
+
+La sesión SIGO queda abierta todo el tiempo; la carga en MiDT corre en un
+segundo navegador en otro hilo. Apenas MiDT confirma un archivo, sus IDs se
+marcan en SIGO, mientras ya se exporta el siguiente lote.
+"""
+import logging
+
+# Configurar logging antes de importar los scripts (cada uno llama a basicConfig)
+logging.basicConfig(
+    filename="pipeline.log",
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(threadName)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+import argparse
+import queue
+import threading
+import traceback
+
+import robot
+import sigo
+import sigo2
+import trazas
+import validacion
+from bitacora import Bitacora
+from navegador import crear_driver
+
+# Marca de fin de cola
+FIN = None
+
+ESTADO_CARGA = {True: "confirmada", False: "fallida", None: "sin confirmar"}
+
+
+def etapa_dt(entrada, salida):
+    """
+    Hilo de MiDT: sube cada CSV de 'entrada' con un único login de Clave Única
+    y deja el lote en 'salida' con el resultado del portal (subido, aceptados,
+    rechazados, error).
+    """
+    driver = None
+    lote = FIN
+    try:
+        while True:
+            lote = entrada.get()
+            if lote is FIN:
+                break
+
+            if driver is None:
+                driver = robot.setup_driver()
+                robot.iniciar_sesion(driver)
+            resultado, = robot.subir_lotes(driver, [(robot.EMPRESA_DT, [lote["csv"]])])
+            lote.update(subido=resultado["subido"], aceptados=resultado["aceptados"],
+                        rechazados=resultado["rechazados"], invalidos=resultado["invalidos"],
+                        error=resultado["error"])
+            logging.info(f"Lote {lote['ciclo']}: carga en MiDT {ESTADO_CARGA[lote['subido']]}.")
+            salida.put(lote)
+            lote = FIN
+
+    except Exception as e:
+        logging.error(f"Error en la etapa MiDT: {str(e)}")
+        traceback.print_exc()
+        if lote is not FIN:
+            # El lote en curso no se subió: vuelve como fallido para liberar sus IDs
+            lote.update(subido=False, aceptados=[], rechazados=[], invalidos=[], error=str(e))
+            salida.put(lote)
+    finally:
+        salida.put(FIN)
+        if driver is not None:
+            driver.quit()
+
+
+def liberar_lote(lote, registro_export, finales=()):
+    """
+    Devuelve a pendientes los IDs de un lote que no llegó a MiDT: dejan de
+    estar EXPORTADO y la siguiente exportación con --resume los vuelve a tomar.
+    """
+    ids = [i for i in lote["ids"] if str(i) not in finales]
+    registro_export.registrar_varios(ids, "CARGA_FALLIDA", detalle=lote.get("error"))
+    logging.warning(f"Lote {lote['ciclo']} no se cargó en MiDT ({lote.get('error')}); "
+                    f"sus {len(ids)} IDs quedan pendientes.")
+
+
+def apartar_sin_confirmar(lote, registro_export, finales=()):
+    """
+    Lote cuyo resultado en MiDT no se pudo leer: pudo haber entrado, así que
+    ni se reexporta ni se marca en SIGO hasta revisarlo a mano.
+    """
+    ids = [i for i in lote["ids"] if str(i) not in finales]
+    registro_export.registrar_varios(ids, "CARGA_SIN_CONFIRMAR", detalle=lote.get("error"))
+    logging.warning(f"Lote {lote['ciclo']}: resultado de MiDT desconocido ({lote.get('error')}); "
+                    f"revisar a mano sus {len(ids)} IDs.")
+
+
+def marcar_subidos(driver, lote, registro, registro_export):
+    """
+    Marca en SIGO como 'Subido al portal DT' los IDs que MiDT aceptó. Los
+    rechazados vuelven a quedar disponibles para la siguiente exportación.
+    """
+    finales = set()
+    for invalido in lote["invalidos"]:
+        # RUT mal formado: final. ID repetido o vacío: vuelve en otra exportación
+        if invalido["motivo"] not in (validacion.ID_DUPLICADO, validacion.ID_VACIO):
+            registro_export.registrar(invalido["id"], invalido["motivo"], detalle=f"RUT {invalido['rut']}")
+            finales.add(str(invalido["id"]))
+
+    if lote["subido"] is None:
+        apartar_sin_confirmar(lote, registro_export, finales)
+        return
+    if not lote["subido"]:
+        liberar_lote(lote, registro_export, finales)
+        return
+
+    for rechazo in lote["rechazados"]:
+        # Deja de estar EXPORTADO: --resume lo vuelve a seleccionar
+        registro_export.registrar(rechazo["id"], "RECHAZADO_DT", detalle=rechazo["motivo"])
+    if lote["rechazados"]:
+        logging.warning(f"Lote {lote['ciclo']}: {len(lote['rechazados'])} IDs rechazados por MiDT, se reencolan.")
+
+    # Partimos de la tabla sin los filtros de la exportación
+    sigo2.refrescar_y_volver(driver)
+    for finiquito_id in lote["aceptados"]:
+        try:
+            resultado, intentos = sigo2.procesar_finiquito(driver, finiquito_id)
+        except Exception as e:
+            logging.error(f"Error con ID {finiquito_id}: {str(e)}")
+            resultado, intentos = "ERROR", 0
+            sigo2.refrescar_y_volver(driver)
+        registro.registrar(finiquito_id, resultado, intentos, detalle=f"pipeline lote {lote['ciclo']}")
+    logging.info(f"Lote {lote['ciclo']}: {len(lote['aceptados'])} IDs procesados en SIGO.")
+
+
+def ejecutar_pipeline(ciclos=1):
+    registro_export = Bitacora("sigo")
+    registro_subido = Bitacora("sigo2")
+    a_dt = queue.Queue()
+    confirmados = queue.Queue()
+    hilo_dt = threading.Thread(target=etapa_dt, args=(a_dt, confirmados), name="MiDT", daemon=True)
+    hilo_dt.start()
+    dt_terminado = False
+
+    driver = crear_driver(download_dir=sigo.download_folder)
+    try:
+        sigo.iniciar_sesion(driver)
+
+        for ciclo in range(1, ciclos + 1):
+            # Marcar lo que MiDT ya confirmó antes de exportar el siguiente lote
+            while not dt_terminado:
+                try:
+                    lote = confirmados.get_nowait()
+                except queue.Empty:
+                    break
+                if lote is FIN:
+                    dt_terminado = True
+                else:
+                    marcar_subidos(driver, lote, registro_subido, registro_export)
+
+            if dt_terminado:
+                logging.error("La etapa MiDT terminó antes de tiempo; no se exportan más lotes.")
+                break
+
+            if ciclo > 1:
+                sigo2.refrescar_y_volver(driver)
+            # Siempre excluye lo ya exportado: sigue en la tabla hasta que se marque
+            ruta_csv, ids = sigo.exportar_carga_masiva(driver, registro_export, resume=True)
+            if not ruta_csv:
+                logging.info(f"Ciclo {ciclo}: no hay más finiquitos para exportar.")
+                break
+            logging.info(f"Ciclo {ciclo}: {len(ids)} IDs exportados en {ruta_csv}.")
+            a_dt.put({"ciclo": ciclo, "csv": ruta_csv, "ids": ids})
+
+        a_dt.put(FIN)
+        while not dt_terminado:
+            lote = confirmados.get()
+            if lote is FIN:
+                dt_terminado = True
+            else:
+                marcar_subidos(driver, lote, registro_subido, registro_export)
+
+    finally:
+        a_dt.put(FIN)
+        hilo_dt.join(timeout=60)
+        if not hilo_dt.is_alive():
+            # Lotes exportados que la etapa MiDT ya no alcanzó a tomar
+            while True:
+                try:
+                    lote = a_dt.get_nowait()
+                except queue.Empty:
+                    break
+                if lote is not FIN:
+                    lote["error"] = "la etapa MiDT terminó antes de subirlo"
+                    liberar_lote(lote, registro_export)
+        # Cargas fallidas o sin confirmar que el hilo principal no alcanzó a procesar
+        while True:
+            try:
+                lote = confirmados.get_nowait()
+            except queue.Empty:
+                break
+            if lote is FIN:
+                continue
+            if lote["subido"] is False:
+                liberar_lote(lote, registro_export)
+            elif lote["subido"] is None:
+                apartar_sin_confirmar(lote, registro_export)
+        registro_export.cerrar()
+        registro_subido.cerrar()
+        driver.quit()
+        logging.info("Pipeline finalizado y navegadores cerrados.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta de SIGO, carga en MiDT y marca 'Subido al portal DT'.")
+    parser.add_argument("--ciclos", type=int, default=1, help="Cantidad de lotes de 100 a procesar.")
+    args = parser.parse_args()
+    trazas.configurar("pipeline")
+    ejecutar_pipeline(args.ciclos)
+    trazas.imprimir_resumen()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Política de reintentos compartida para las acciones contra SIGO:
+
+- PoliticaReintentos: backoff exponencial con jitter, escalado por la latencia
+  que está mostrando el servidor.
+- EstimadorLatencia: media móvil exponencial del tiempo de respuesta (como el
+  RTO de TCP: media + 4 desviaciones).
+- Cortacircuitos: si la tasa de errores se dispara, pausa toda la corrida y la
+  reanuda sola cuando una llamada de prueba vuelve a salir bien.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Backoff (segundos)
+BACKOFF_BASE = float(os.getenv("BOT_DT_BACKOFF_BASE", "0.5"))
+BACKOFF_MAXIMO = float(os.getenv("BOT_DT_BACKOFF_MAXIMO", "20"))
+
+# Cortacircuitos: abre con UMBRAL_ERRORES de fallos en las últimas VENTANA llamadas
+VENTANA = int(os.getenv("BOT_DT_CIRCUITO_VENTANA", "20"))
+MINIMO_MUESTRAS = 8
+UMBRAL_ERRORES = float(os.getenv("BOT_DT_CIRCUITO_UMBRAL", "0.5"))
+PAUSA_INICIAL = float(os.getenv("BOT_DT_CIRCUITO_PAUSA", "30"))
+PAUSA_MAXIMA = 300
+
+
+class EstimadorLatencia:
+    def __init__(self, alfa=0.125, beta=0.25, inicial=None):
+        self.alfa = alfa
+        self.beta = beta
+        self.media = inicial
+        self.desviacion = inicial / 2 if inicial else 0.0
+        self.lock = threading.Lock()
+
+    def observar(self, segundos):
+        with self.lock:
+            if self.media is None:
+                self.media, self.desviacion = segundos, segundos / 2
+            else:
+                self.desviacion = (1 - self.beta) * self.desviacion + self.beta * abs(segundos - self.media)
+                self.media = (1 - self.alfa) * self.media + self.alfa * segundos
+
+    def timeout(self, minimo, maximo):
+        """
+        Cuánto esperar una respuesta: media + 4 desviaciones, acotado.
+        """
+        if self.media is None:
+            return minimo
+        return min(maximo, max(minimo, self.media + 4 * self.desviacion))
+
+
+class PoliticaReintentos:
+    def __init__(self, base=BACKOFF_BASE, maximo=BACKOFF_MAXIMO, factor=2.0, latencia=None):
+        self.base = base
+        self.maximo = maximo
+        self.factor = factor
+        self.latencia = latencia
+
+    def espera(self, intento):
+        """
+        Segundos a esperar antes del reintento 'intento' (1 = primer reintento).
+        Uniforme entre 0 y el tope exponencial ("full jitter") para que las
+        sesiones paralelas no reintenten todas a la vez; el primero espera al
+        menos medio escalón, porque el toast anterior puede venir en camino.
+        """
+        base = self.base
+        if self.latencia is not None and self.latencia.media is not None:
+            # Con el servidor lento, el escalón mínimo crece con su latencia
+            base = max(base, self.latencia.media)
+        tope = min(self.maximo, base * self.factor ** (intento - 1))
+        return random.uniform(tope / 2, tope) if intento == 1 else random.uniform(0, tope)
+
+    def dormir(self, intento):
+        segundos = self.espera(intento)
+        time.sleep(segundos)
+        return segundos
+
+
+class Cortacircuitos:
+    CERRADO = "CERRADO"
+    ABIERTO = "ABIERTO"
+    SEMIABIERTO = "SEMIABIERTO"
+
+    def __init__(self, ventana=VENTANA, umbral=UMBRAL_ERRORES, pausa=PAUSA_INICIAL,
+                 pausa_maxima=PAUSA_MAXIMA, minimo_muestras=MINIMO_MUESTRAS):
+        self.umbral = umbral
+        self.pausa_inicial = pausa
+        self.pausa_maxima = pausa_maxima
+        self.minimo_muestras = minimo_muestras
+        self.resultados = deque(maxlen=ventana)
+        self.estado = self.CERRADO
+        self.pausa = pausa
+        self.reabre_en = 0.0
+        self.sonda = None
+        self.prueba_desde = 0.0
+        self.lock = threading.Lock()
+
+    def esperar(self):
+        """
+        Bloquea mientras el circuito está abierto. Al vencer la pausa deja
+        pasar la siguiente llamada como prueba (semiabierto).
+        """
+        while True:
+            with self.lock:
+                if self.estado == self.CERRADO:
+                    return
+                ahora = time.monotonic()
+                restante = self.reabre_en - ahora
+                if self.estado == self.ABIERTO and restante <= 0:
+                    self.estado = self.SEMIABIERTO
+                    self._iniciar_prueba(ahora)
+                    logger.info("🔌 Circuito semiabierto: llamada de prueba a SIGO.")
+                    return
+                if self.estado == self.SEMIABIERTO:
+                    if self.sonda == threading.get_ident():
+                        return  # el mismo hilo que hace la prueba
+                    if ahora - self.prueba_desde > self.pausa:
+                        # La prueba nunca informó su resultado: se lanza otra
+                        self._iniciar_prueba(ahora)
+                        return
+                    # Otra sesión ya está probando: esperamos su resultado
+                    restante = 1.0
+            time.sleep(min(max(restante, 0.1), 5))
+
+    def _iniciar_prueba(self, ahora):
+        self.sonda = threading.get_ident()
+        self.prueba_desde = ahora
+
+    def exito(self):
+        with self.lock:
+            self.resultados.append(True)
+            if self.estado == self.SEMIABIERTO:
+                logger.info("🔌 SIGO respondió bien: circuito cerrado, se reanuda la corrida.")
+                self.estado = self.CERRADO
+                self.sonda = None
+                self.pausa = self.pausa_inicial
+                self.resultados.clear()
+
+    def fallo(self):
+        with self.lock:
+            self.resultados.append(False)
+            if self.estado == self.SEMIABIERTO:
+                # La prueba falló: otra pausa, el doble de larga
+                self.pausa = min(self.pausa * 2, self.pausa_maxima)
+                self._abrir()
+                return
+            if self.estado == self.CERRADO and len(self.resultados) >= self.minimo_muestras:
+                tasa = self.resultados.count(False) / len(self.resultados)
+                if tasa >= self.umbral:
+                    logger.warning(f"🔌 Tasa de errores {tasa:.0%} en las últimas {len(self.resultados)} llamadas.")
+                    self._abrir()
+
+    def _abrir(self):
+        self.estado = self.ABIERTO
+        self.sonda = None
+        self.reabre_en = time.monotonic() + self.pausa
+        logger.warning(f"🔌 Circuito abierto: corrida en pausa {self.pausa:.0f}s.")
+
+
+# Instancias compartidas por todos los flujos del proceso
+LATENCIA_SIGO = EstimadorLatencia()
+POLITICA_SIGO = PoliticaReintentos(latencia=LATENCIA_SIGO)
+CIRCUITO_SIGO = Cortacircuitos()
@@ -1,15 +1,18 @@
+import argparse
+import csv
 import glob
 import logging
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from selenium.common.exceptions import TimeoutException
 from dotenv import load_dotenv
 import os
-import time
+from navegador import crear_driver
+import almacen_sesion
+import trazas
+import validacion
+from csv_dt import detectar_formato
 
 # Configuración de logging
 logger = logging.getLogger()
@@ -31,22 +34,25 @@ logger.addHandler(console_handler)
 load_dotenv()
 RUT = os.getenv("RUT")
 CLAVE_UNICA = os.getenv("CLAVE_UNICA")
+URL_MIDT = os.getenv("MIDT_URL", "https://midt.dirtrab.cl/welcome")
+EMPRESA_DT = os.getenv("MIDT_EMPRESA", "76333204-7 EMPRESA DE SERVICIOS TRANSITORIOS MVS SPA")
 
 # Directorio de descargas
 DOWNLOAD_DIR = os.path.join(os.getcwd(), "finiquitos")
 
 def setup_driver():
-    options = Options()
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--start-maximized")
-    service = Service("/usr/local/bin/chromedriver") 
-    return webdriver.Chrome(service=service, options=options)
+    return crear_driver()
 
+@trazas.paso("login")
 def iniciar_sesion(driver):
     try:
+        # Reutilizar la sesión de Clave Única guardada si sigue viva
+        if almacen_sesion.restaurar(driver, "midt", URL_MIDT, (By.ID, "btn-empleador")):
+            logger.info("Sesión DT restaurada, se omite Clave Única.")
+            return
+
         logger.info("Navegando al portal DT.")
-        driver.get("https://midt.dirtrab.cl/welcome")
+        driver.get(URL_MIDT)
 
         # Clic en "Iniciar sesión"
         logger.info("Clic en 'Iniciar sesión'.")
@@ -61,13 +67,44 @@ def iniciar_sesion(driver):
         ).send_keys(RUT)
         driver.find_element(By.ID, "pword").send_keys(CLAVE_UNICA)
         driver.find_element(By.ID, "login-submit").click()
+        WebDriverWait(driver, 30).until(
+            EC.presence_of_element_located((By.ID, "btn-empleador"))
+        )
+        almacen_sesion.guardar(driver, "midt")
         logger.info("Inicio de sesión completado.")
 
     except Exception as e:
         logger.error(f"Error en el inicio de sesión: {e}")
         raise
 
-def navegar_perfil_empleador(driver):
+def sesion_activa(driver):
+    """
+    Vuelve al inicio de MiDT y dice si la sesión de Clave Única sigue viva.
+    """
+    driver.get(URL_MIDT)
+    try:
+        elemento = WebDriverWait(driver, 20).until(EC.any_of(
+            EC.presence_of_element_located((By.ID, "btn-empleador")),
+            EC.presence_of_element_located((By.ID, "nuevaSesion")),
+        ))
+    except TimeoutException:
+        # Redirigido fuera del portal (p. ej. a Clave Única)
+        return False
+    return elemento.get_attribute("id") == "btn-empleador"
+
+def abrir_carga_masiva(driver, empresa=EMPRESA_DT):
+    """
+    Deja abierta la carga masiva de 'empresa'. Solo pasa por Clave Única si la sesión se cayó.
+    """
+    if not sesion_activa(driver):
+        logger.warning("🔐 La sesión de MiDT se cerró, re-autenticando.")
+        iniciar_sesion(driver)
+    navegar_perfil_empleador(driver, empresa)
+    navegar_a_finiquitos_masivos(driver)
+
+@trazas.paso()
+def navegar_perfil_empleador(driver, empresa=EMPRESA_DT):
+    """ 'empresa' puede ser el texto completo del botón o solo el RUT del empleador. """
     try:
         # Seleccionar "Empleador"
         logger.info("Seleccionando 'Empleador'.")
@@ -82,15 +119,16 @@ def navegar_perfil_empleador(driver):
         ).click()
 
         # Seleccionar la empresa
-        logger.info("Seleccionando la empresa.")
+        logger.info(f"Seleccionando la empresa {empresa}.")
         WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.XPATH, '//button[contains(text(), "76333204-7 EMPRESA DE SERVICIOS TRANSITORIOS MVS SPA")]'))
+            EC.element_to_be_clickable((By.XPATH, f'//button[contains(text(), "{empresa}")]'))
         ).click()
 
     except Exception as e:
         logger.error(f"Error navegando al perfil de empleador: {e}")
         raise
 
+@trazas.paso()
 def navegar_a_finiquitos_masivos(driver):
     try:
         # Expandir "Contratos de Trabajo y Despido"
@@ -126,60 +164,276 @@ def obtener_csv_mas_reciente():
         logger.info(f"📂 Archivo CSV más reciente encontrado: {latest_file}")
         return latest_file
 
+# Selectores CSS del resultado de la carga. Los valores por defecto son los de
+# la réplica (sitios_mock); contra el portal real se fijan en el .env con los
+# que muestre su página de resultado.
+SELECTORES_RESULTADO = {
+    "contenedor": os.getenv("MIDT_SEL_RESULTADO", "#resultado-carga"),
+    "alerta": os.getenv("MIDT_SEL_ALERTA", ".alert"),
+    "error": os.getenv("MIDT_SEL_ALERTA_ERROR", ".alert-danger"),
+    "aceptados": os.getenv("MIDT_SEL_ACEPTADOS", ".aceptados"),
+    "tabla_errores": os.getenv("MIDT_SEL_TABLA_ERRORES", "table.tabla-errores"),
+}
+
+# Resultado de la carga en una sola llamada. 'contenedor' false si la página no
+# tiene dónde mostrarlo; 'listo' false mientras MiDT procesa.
+JS_RESULTADO_CARGA = """
+var sel = arguments[0];
+var caja = document.querySelector(sel.contenedor);
+if (!caja) { return {contenedor: false, listo: false}; }
+var alerta = caja.querySelector(sel.alerta);
+if (!alerta) { return {contenedor: true, listo: false}; }
+if (alerta.matches(sel.error)) {
+    return {contenedor: true, listo: true, ok: false, mensaje: alerta.innerText.trim()};
+}
+var aceptados = caja.querySelector(sel.aceptados);
+var encabezados = Array.prototype.map.call(
+    caja.querySelectorAll(sel.tabla_errores + ' thead th'), function (th) { return th.innerText.trim().toUpperCase(); }
+);
+var rechazados = Array.prototype.map.call(caja.querySelectorAll(sel.tabla_errores + ' tbody tr'), function (tr) {
+    var fila = {};
+    Array.prototype.forEach.call(tr.cells, function (td, i) { fila[encabezados[i] || i] = td.innerText.trim(); });
+    return fila;
+});
+return {
+    contenedor: true,
+    listo: true,
+    ok: true,
+    mensaje: alerta.innerText.trim(),
+    aceptados: aceptados ? parseInt(aceptados.innerText, 10) : null,
+    rechazados: rechazados
+};
+"""
+
+# Se borra el resultado anterior para no confundirlo con el de este archivo
+JS_LIMPIAR_RESULTADO = """
+var caja = document.querySelector(arguments[0].contenedor);
+if (caja) { caja.innerHTML = ''; }
+"""
+
+# Segundos que se espera a que MiDT procese un archivo
+TIMEOUT_CARGA = int(os.getenv("MIDT_TIMEOUT_CARGA", "180"))
+
+
+class ErrorCargaMiDT(Exception):
+    """
+    MiDT informó un error o no mostró el resultado. 'reintentable' indica si
+    subir de nuevo el archivo no arriesga duplicar finiquitos; 'desconocido'
+    que no se pudo leer el resultado y el archivo pudo haber entrado.
+    """
+
+    def __init__(self, mensaje, reintentable=False, desconocido=False):
+        super().__init__(mensaje)
+        self.reintentable = reintentable
+        self.desconocido = desconocido
+
+
+def ids_del_csv(file_path):
+    """ IDs de finiquito del CSV (columna 'ID', o la primera), en orden. """
+    encoding, delimitador = detectar_formato(file_path)
+    with open(file_path, encoding=encoding, newline="") as f:
+        filas = csv.reader(f, delimiter=delimitador)
+        encabezado = [c.strip().upper() for c in next(filas, [])]
+        columna = encabezado.index("ID") if "ID" in encabezado else 0
+        return [fila[columna].strip() for fila in filas if len(fila) > columna and fila[columna].strip()]
+
+@trazas.paso("subida", item=1)
 def subir_archivo(driver, file_path):
-    """ Sube el archivo CSV más reciente en la página de MiDT. """
+    """
+    Sube el CSV en la página de MiDT y espera el resultado del portal.
+    Devuelve {"aceptados": [ids], "rechazados": [{"fila", "id", "rut", "motivo"}]}.
+    Cualquier error posterior al clic se lanza como ErrorCargaMiDT con
+    desconocido=True.
+    """
+    # Esperar a que la página cargue
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.XPATH, "//label[@for='file_upload']"))
+    )
+
+    # El input file real está oculto: send_keys funciona igual
+    file_input = driver.find_element(By.CSS_SELECTOR, "input[type='file']")
+    file_input.send_keys(file_path)
+    logger.info(f"📤 Archivo '{file_path}' cargado correctamente.")
+
+    # Esperar a que el botón 'Cargar Finiquitos' se habilite
+    upload_btn = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Cargar finiquitos') and not(@disabled)]"))
+    )
+
+    driver.execute_script(JS_LIMPIAR_RESULTADO, SELECTORES_RESULTADO)
+    upload_btn.click()
+    logger.info("✅ Se hizo clic en 'Cargar Finiquitos'.")
     try:
-        # Esperar a que la página cargue
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//label[@for='file_upload']"))
-        )
-
-        # Intentar encontrar el input file real (oculto)
-        file_input = driver.find_element(By.CSS_SELECTOR, "input[type='file']")
-
-        if file_input:
-            # Subir el archivo CSV
-            file_input.send_keys(file_path)
-            logger.info(f"📤 Archivo '{file_path}' cargado correctamente.")
+        return esperar_resultado_carga(driver, file_path)
+    except ErrorCargaMiDT:
+        raise
+    except Exception as e:
+        # Después del clic el archivo pudo haber entrado: no se puede reintentar
+        raise ErrorCargaMiDT(
+            f"Error tras el clic en 'Cargar finiquitos': {type(e).__name__}: {e}", desconocido=True
+        ) from e
+
+@trazas.paso("espera_resultado", item=1)
+def esperar_resultado_carga(driver, file_path, timeout=TIMEOUT_CARGA):
+    """
+    Sondea el resultado de la carga hasta que MiDT termina de procesar. Los
+    aceptados son los IDs del CSV que no aparecen en la tabla de rechazos.
+    Si no aparece el resultado (o su contenedor) no se sabe si el archivo
+    entró: se lanza ErrorCargaMiDT con desconocido=True.
+    """
+    ultimo = {"contenedor": False}
+
+    def _leer(d):
+        ultimo.update(d.execute_script(JS_RESULTADO_CARGA, SELECTORES_RESULTADO))
+        return ultimo if ultimo["listo"] else False
 
-            # Esperar a que el botón 'Cargar Finiquitos' se habilite
-            upload_btn = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Cargar finiquitos') and not(@disabled)]"))
+    try:
+        resultado = WebDriverWait(driver, timeout, poll_frequency=0.5).until(_leer)
+    except TimeoutException:
+        if not ultimo["contenedor"]:
+            raise ErrorCargaMiDT(
+                f"No se encontró el resultado de la carga ({SELECTORES_RESULTADO['contenedor']}) en {timeout}s.",
+                desconocido=True,
             )
-            
-            # Hacer clic en el botón
-            upload_btn.click()
-            logger.info("✅ Se hizo clic en 'Cargar Finiquitos'.")
-            time.sleep(10)  # Espera adicional para la carga
-
-        else:
-            logger.error("❌ No se encontró el input real para la carga del archivo.")
-
-    except Exception as e:
-        logger.error(f"❌ Error al subir el archivo: {e}")
+        raise ErrorCargaMiDT(f"MiDT no mostró el resultado de la carga en {timeout}s.", desconocido=True)
+
+    if not resultado["ok"]:
+        # El portal rechazó el archivo completo: no quedó nada cargado
+        raise ErrorCargaMiDT(f"MiDT rechazó el archivo: {resultado['mensaje']}", reintentable=True)
+
+    rechazados = []
+    for fila in resultado["rechazados"]:
+        numero = fila.get("FILA", "")
+        rechazados.append({
+            "fila": int(numero) if numero.isdigit() else None,
+            "id": fila.get("ID", ""),
+            "rut": fila.get("RUT", ""),
+            "motivo": fila.get("MOTIVO", ""),
+        })
+    ids_rechazados = {r["id"] for r in rechazados}
+    aceptados = [i for i in ids_del_csv(file_path) if i not in ids_rechazados]
+
+    if resultado["aceptados"] is not None and resultado["aceptados"] != len(aceptados):
+        # No se sabe cuáles entraron: mejor no marcar ni reencolar nada
+        raise ErrorCargaMiDT(
+            f"MiDT informa {resultado['aceptados']} finiquitos cargados, pero el CSV deja {len(aceptados)}."
+        )
 
+    logger.info(f"📋 Resultado MiDT: {len(aceptados)} aceptados, {len(rechazados)} rechazados.")
+    for r in rechazados:
+        logger.warning(f"⚠ Rechazado ID {r['id']} (RUT {r['rut']}, fila {r['fila']}): {r['motivo']}")
+    return {"aceptados": aceptados, "rechazados": rechazados}
+
+
+ICONO_SUBIDO = {True: "✅", False: "❌", None: "❓"}
+
+
+def subir_lotes(driver, lotes):
+    """
+    Sube cada CSV de 'lotes' ([(empresa, [archivos])]) con la sesión ya
+    iniciada. Si un archivo falla antes del clic en 'Cargar finiquitos' se
+    reintenta una vez, re-autenticando solo si la sesión se cayó.
+    Antes de subir, cada CSV se depura con validacion.depurar_csv: las filas
+    con RUT inválido o ID repetido (también entre archivos del mismo empleador)
+    quedan en "invalidos" y se sube una copia sin ellas; el original no se toca.
+    Devuelve [{"empresa", "csv", "subido", "aceptados", "rechazados", "invalidos", "error"}];
+    "subido" es None si no se pudo leer el resultado de MiDT.
+    """
+    resultados = []
+    for empresa, archivos in lotes:
+        vistos = {"ids": set(), "ruts": set()}
+        for ruta_csv in archivos:
+            resultado = {"empresa": empresa, "csv": ruta_csv, "subido": False,
+                         "aceptados": [], "rechazados": [], "invalidos": [], "error": None}
+            try:
+                ruta_subida, resultado["invalidos"] = validacion.depurar_csv(ruta_csv, vistos)
+            except (OSError, UnicodeDecodeError) as e:
+                resultado["error"] = f"No se pudo leer el CSV: {e}"
+                logger.error(f"❌ {ruta_csv}: {resultado['error']}")
+                resultados.append(resultado)
+                continue
+            if not ids_del_csv(ruta_subida):
+                resultado["error"] = "El CSV no tiene filas válidas."
+                logger.error(f"❌ {ruta_csv}: {resultado['error']}")
+                resultados.append(resultado)
+                continue
+
+            for intento in (1, 2):
+                try:
+                    abrir_carga_masiva(driver, empresa)
+                    resultado.update(subir_archivo(driver, ruta_subida), subido=True, error=None)
+                    break
+                except ErrorCargaMiDT as e:
+                    resultado["error"] = str(e)
+                    logger.error(f"❌ Intento {intento} de '{ruta_csv}' ({empresa}): {e}")
+                    if e.desconocido:
+                        # Pudo haber entrado: ni reintentar ni darlo por fallido
+                        resultado["subido"] = None
+                    if not e.reintentable:
+                        break
+                except Exception as e:
+                    resultado["error"] = f"{type(e).__name__}: {e}"
+                    logger.warning(f"⚠ Intento {intento} de '{ruta_csv}' ({empresa}) falló: {e}")
+            logger.info(f"{ICONO_SUBIDO[resultado['subido']]} {empresa}: {os.path.basename(ruta_csv)} "
+                        f"({len(resultado['aceptados'])} aceptados, {len(resultado['rechazados'])} rechazados, "
+                        f"{len(resultado['invalidos'])} inválidos)")
+            resultados.append(resultado)
+    return resultados
+
+def leer_lotes(argumentos):
+    """
+    [[empresa, patrón, ...]] de la línea de comandos -> [(empresa, [archivos])].
+    Los patrones se expanden con glob y en orden.
+    """
+    lotes = []
+    for empresa, *patrones in argumentos:
+        archivos = []
+        for patron in patrones:
+            encontrados = sorted(glob.glob(patron)) or [patron]
+            # chromedriver necesita rutas absolutas para el input file
+            archivos.extend(os.path.abspath(a) for a in encontrados if os.path.abspath(a) not in archivos)
+        lotes.append((empresa, archivos))
+    return lotes
+
+def validar_flujo(lotes=None):
+    """
+    Sin 'lotes' sube el CSV más reciente a EMPRESA_DT, como siempre.
+    """
+    trazas.configurar("robot")
+    if lotes is None:
+        latest_csv = obtener_csv_mas_reciente()
+        lotes = [(EMPRESA_DT, [latest_csv])] if latest_csv else []
 
-def validar_flujo():
     driver = setup_driver()
     try:
         iniciar_sesion(driver)
-        navegar_perfil_empleador(driver)
-        navegar_a_finiquitos_masivos(driver)
-
-        # Obtener el archivo CSV más reciente
-        latest_csv = obtener_csv_mas_reciente()
-        if latest_csv:
-            subir_archivo(driver, latest_csv)
-
-        logger.info("Flujo validado exitosamente hasta la carga del archivo.")
+        resultados = subir_lotes(driver, lotes)
+        fallidos = [r for r in resultados if r["subido"] is False]
+        dudosos = [r for r in resultados if r["subido"] is None]
+        logger.info(f"Flujo terminado: {len(resultados) - len(fallidos) - len(dudosos)}/{len(resultados)} archivos cargados.")
+        for r in fallidos:
+            logger.error(f"❌ Sin cargar: {r['csv']} ({r['empresa']}): {r['error']}")
+        for r in dudosos:
+            logger.warning(f"❓ Revisar en MiDT si se cargó: {r['csv']} ({r['empresa']}): {r['error']}")
+        logger.info(f"Finiquitos aceptados: {sum(len(r['aceptados']) for r in resultados)}, "
+                    f"rechazados: {sum(len(r['rechazados']) for r in resultados)}.")
+        return resultados
 
     except Exception as e:
         logger.error(f"Error validando el flujo: {e}")
     finally:
         driver.quit()
         logger.info("Driver cerrado.")
+        trazas.imprimir_resumen()
 
 
 if __name__ == "__main__":
-    validar_flujo()
+    parser = argparse.ArgumentParser(description="Sube CSV de finiquitos a MiDT con un solo login de Clave Única.")
+    parser.add_argument("--lote", nargs="+", action="append", metavar="EMPRESA_O_CSV",
+                        help="RUT (o nombre) del empleador seguido de sus CSV; se puede repetir. "
+                             "Sin --lote se sube el CSV más reciente de 'finiquitos'.")
+    args = parser.parse_args()
+    if args.lote and any(len(lote) < 2 for lote in args.lote):
+        parser.error("cada --lote necesita el empleador y al menos un CSV")
+    validar_flujo(leer_lotes(args.lote) if args.lote else None)
 
@@ -1,15 +1,21 @@
 import logging
 import os
-import time
-import traceback
-import pandas as pd
-from selenium import webdriver
+import argparse
+import itertools
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
+import esperas
+from navegador import crear_driver
+import almacen_sesion
+import tabla
+import paginacion
+from bitacora import Bitacora
+import descargas
+import trazas
+import validacion
+import entradas
 
 # Configurar logging
 log_file = "sigo_rut.log"
@@ -24,18 +30,20 @@ logging.basicConfig(
 load_dotenv()
 USUARIO = os.getenv("MVS_SIGO_USER")
 PASSWORD = os.getenv("MVS_SIGO_PASS")
+URL_SIGO = os.getenv("SIGO_URL", "http://35.184.233.114/MVS_SIGO/")
 
-# Configurar opciones de Chrome
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+# Carpeta donde queda la CARGA MASIVA DT
+DOWNLOAD_DIR = os.path.join(os.getcwd(), "finiquitos")
 
-finiquitos_seleccionados = 0
-
-def acceder_a_sigo():
+@trazas.paso("login")
+def acceder_a_sigo(driver):
     try:
+        if almacen_sesion.restaurar(driver, "sigo", URL_SIGO, (By.ID, "enlace5")):
+            logging.info("♻️ Sesión restaurada, se omite el login.")
+            return True
+
         logging.info("🚀 Accediendo a la página de inicio de sesión...")
-        driver.get("http://35.184.233.114/MVS_SIGO/")
+        driver.get(URL_SIGO)
         
         usuario_input = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "user")))
         password_input = driver.find_element(By.ID, "pass")
@@ -46,12 +54,15 @@ def acceder_a_sigo():
 
         driver.find_element(By.ID, "btnLogn").click()
         WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, "enlace5")))
+        almacen_sesion.guardar(driver, "sigo")
         logging.info("🎯 Inicio de sesión exitoso.")
+        return True
 
     except Exception as e:
         logging.error(f"❌ Error en inicio de sesión: {str(e)}")
+        return False
 
-def acceder_a_solicitud_finiquitos():
+def acceder_a_solicitud_finiquitos(driver):
     try:
         enlace_finiquitos = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.ID, "enlace5"))
@@ -64,7 +75,8 @@ def acceder_a_solicitud_finiquitos():
 # ─────────────────────────────────────────────────────────────────────────────
 # 🔹 **Función para seleccionar el tipo de finiquito 'DT'**
 # ─────────────────────────────────────────────────────────────────────────────
-def seleccionar_tipo_dt():
+@trazas.paso()
+def seleccionar_tipo_dt(driver):
     """Muestra el dropdown de 'TIPO FINIQUITO' y elige la opción 'DT'."""
     try:
         logging.info("📌 Seleccionando tipo finiquito 'DT'...")
@@ -88,7 +100,8 @@ def seleccionar_tipo_dt():
         input_tipo.click()
         logging.info("✅ Se hizo clic en #filtro_tipo.")
 
-        # 4) Elige la opción "DT" en la lista
+        # 4) Elige la opción "DT" en la lista y espera el re-render de la tabla
+        version = esperas.version_tabla(driver)
         dt_opcion_xpath = "//ul[contains(@class, 'dropdown-content')]/li/span[text()='DT']"
         try:
             dt_option = WebDriverWait(driver, 10).until(
@@ -101,13 +114,16 @@ def seleccionar_tipo_dt():
                 f"document.evaluate(\"{dt_opcion_xpath}\", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue.click();"
             )
 
-        time.sleep(2)
+        esperas.esperar_tabla_actualizada(driver, version, timeout=esperas.SHORT_TIMEOUT)
         logging.info("✅ Tipo DT filtrado correctamente.")
+        return True
 
     except Exception as e:
         logging.error(f"❌ Error al seleccionar tipo DT: {str(e)}")
+        return False
 
-def seleccionar_estado():
+@trazas.paso()
+def seleccionar_estado(driver):
     try:
         logging.info("📌 Seleccionando estado 'Enviado al Representante'...")
 
@@ -127,6 +143,7 @@ def seleccionar_estado():
         input_estado.click()
         logging.info("✅ Se hizo clic en input_estado.")
 
+        version = esperas.version_tabla(driver)
         estado_opcion_xpath = "//ul[contains(@class, 'dropdown-content')]/li/span[text()='Enviado al representante']"
         try:
             estado_opcion = WebDriverWait(driver, 10).until(
@@ -138,77 +155,160 @@ def seleccionar_estado():
                 f"document.evaluate(\"{estado_opcion_xpath}\", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue.click();"
             )
 
-        time.sleep(3)
+        esperas.esperar_tabla_actualizada(driver, version, timeout=esperas.SHORT_TIMEOUT)
         logging.info("✅ Estado filtrado correctamente.")
+        return True
 
     except Exception as e:
         logging.error(f"❌ Error al seleccionar Estado: {str(e)}")
+        return False
 
-# AQUÍ está el cambio, llamamos "cambia('rut')" antes de escribir
-def buscar_rut_y_filtrar(rut):
+# ─────────────────────────────────────────────────────────────────────────────
+# 🔹 **Estado de los filtros: solo se toca lo que cambia**
+# ─────────────────────────────────────────────────────────────────────────────
+TIPO_DT = "DT"
+ESTADO_ENVIADO = "Enviado al representante"
+
+# Tipo y estado se comparan por el texto que se ve: en un <select> el value es un código
+JS_VALORES_FILTROS = """
+var valor = function (id) {
+    var e = document.getElementById(id);
+    if (!e) { return null; }
+    if (e.tagName === 'SELECT') {
+        var opcion = e.selectedOptions && e.selectedOptions[0];
+        return opcion ? opcion.text.trim() : '';
+    }
+    return (e.value || '').trim();
+};
+return {tipo: valor('filtro_tipo'), estado: valor('input_estado'), rut: valor('filtro_rut')};
+"""
+
+# Escribe el RUT de una vez y dispara un solo keyup (send_keys filtraba por cada tecla)
+JS_ESCRIBIR_RUT = """
+arguments[0].value = arguments[1];
+arguments[0].dispatchEvent(new Event('keyup'));
+"""
+
+def valores_filtros(driver):
+    """
+    Valores actuales de filtro_tipo, input_estado y filtro_rut en la página
+    (None si no existen); en los <select>, el texto de la opción elegida.
+    """
+    return driver.execute_script(JS_VALORES_FILTROS)
+
+def _igual(actual, deseado):
+    return (actual or "").strip().lower() == deseado.strip().lower()
+
+def aplicar_filtros(driver, tipo=None, estado=None, rut=None):
+    """
+    Deja los filtros con estos valores tocando solo los que difieren de la
+    página (None = no importa). Devuelve cuántos filtros se cambiaron.
+    """
+    actuales = valores_filtros(driver)
+    cambios = 0
+    if tipo is not None and not _igual(actuales["tipo"], tipo):
+        seleccionar_tipo_dt(driver)
+        cambios += 1
+    if estado is not None and not _igual(actuales["estado"], estado):
+        seleccionar_estado(driver)
+        cambios += 1
+    if rut is not None and not _igual(actuales["rut"], rut):
+        escribir_rut(driver, rut)
+        cambios += 1
+    if cambios:
+        esperas.esperar_ajax(driver)
+    return cambios
+
+def filtros_aplicados(driver, tipo=None, estado=None, rut=None):
+    """True si la página muestra exactamente esos filtros (None = no importa)."""
+    actuales = valores_filtros(driver)
+    deseados = {"tipo": tipo, "estado": estado, "rut": rut}
+    return all(valor is None or _igual(actuales[clave], valor) for clave, valor in deseados.items())
+
+def escribir_rut(driver, rut):
+    # cambia('rut') muestra el input si estaba oculto
+    driver.execute_script("cambia('rut')")
+    input_rut = WebDriverWait(driver, 5).until(
+        EC.visibility_of_element_located((By.ID, "filtro_rut"))
+    )
+    accion = lambda: driver.execute_script(JS_ESCRIBIR_RUT, input_rut, rut)
+    if driver.find_elements(By.CSS_SELECTOR, "table.highlight tbody tr"):
+        esperas.tras_accion(driver, accion)
+        return
+    # De una tabla vacía a otra vacía no hay re-render: se espera la petición del filtro
+    previo = esperas.estado_pagina(driver)
+    accion()
+    if not esperas.esperar_respuesta(driver, previo):
+        # Sin petición la tabla sigue vacía, que es lo que mostraría el filtro sin
+        # resultados; buscar_rut_y_filtrar revisa las filas que queden
+        logging.info(f"ℹ La búsqueda del RUT {rut} no envió petición; la tabla sigue vacía.")
+
+def ruts_ajenos(driver, rut):
+    """RUTs de la tabla que no son 'rut' (filas de otro filtro que quedaron en pantalla)."""
+    buscado = validacion.normalizar_rut(rut)
+    return sorted({fila["rut"] for fila in tabla.snapshot(driver) if fila["rut"] and fila["rut"] != buscado})
+
+@trazas.paso(item=1)
+def buscar_rut_y_filtrar(driver, rut):
+    """
+    Filtra la tabla por el RUT. Devuelve "ENCONTRADO", "NO_ENCONTRADO" (la
+    tabla quedó vacía con los tres filtros puestos) o "ERROR" si no se pudo
+    saber: un error no debe quedar como resultado final en la bitácora.
+    """
     try:
         logging.info(f"🔍 Buscando finiquitos para RUT: {rut}")
 
-        # 1) Forzamos que se muestre el input con la función cambia('rut')
-        driver.execute_script("cambia('rut')")
-        time.sleep(1)
+        # Tipo y estado se aplican solo la primera vez (o si la página los perdió)
+        aplicar_filtros(driver, tipo=TIPO_DT, estado=ESTADO_ENVIADO, rut=rut)
+        if not filtros_aplicados(driver, tipo=TIPO_DT, estado=ESTADO_ENVIADO, rut=rut):
+            logging.error(f"❌ Los filtros no quedaron aplicados para el RUT {rut}: {valores_filtros(driver)}")
+            return "ERROR"
 
-        # 2) Esperamos el input #filtro_rut
-        input_rut = WebDriverWait(driver, 5).until(
-            EC.visibility_of_element_located((By.ID, "filtro_rut"))
-        )
-
-        # 3) Si hay algo previo, limpiamos
-        if input_rut.get_attribute('value'):
-            input_rut.clear()
-
-        # 4) Escribimos el RUT
-        input_rut.click()
-        input_rut.send_keys(rut)
-        driver.execute_script("arguments[0].dispatchEvent(new Event('keyup'))", input_rut)
-
-        time.sleep(2)
-        # 5) Seleccionar estado
-        seleccionar_tipo_dt()
-        seleccionar_estado()
-        time.sleep(3)
-
-        # 6) Revisar si hay registros
+        # Revisar si hay registros
         registros = driver.find_elements(By.CSS_SELECTOR, "table.highlight tbody tr")
         if not registros:
             logging.info(f"❌ No hay finiquitos disponibles para el RUT {rut}. Pasando al siguiente.")
-            return False
+            return "NO_ENCONTRADO"
+
+        ajenos = ruts_ajenos(driver, rut)
+        if ajenos:
+            # La tabla no corresponde al filtro: no se sabe qué tiene este RUT
+            logging.error(f"❌ La tabla del RUT {rut} muestra otros RUT: {ajenos[:5]}")
+            return "ERROR"
 
         logging.info(f"📄 Se encontraron {len(registros)} registros para el RUT {rut}.")
-        return True
+        return "ENCONTRADO"
 
     except Exception as e:
         logging.error(f"❌ Error en la búsqueda y filtrado del RUT: {str(e)}")
-        return False
+        return "ERROR"
 
-def seleccionar_finiquito_mas_reciente():
+@trazas.paso()
+def seleccionar_finiquito_mas_reciente(driver):
     try:
         logging.info("📌 Seleccionando el finiquito más reciente...")
 
-        registros = driver.find_elements(By.CSS_SELECTOR, "table.highlight tbody tr")
+        registros = tabla.snapshot(driver)
         if not registros:
             logging.info("❌ No hay finiquitos disponibles.")
             return False
 
         logging.info(f"📄 {len(registros)} registros encontrados.")
 
-        finiquitos = []
-        for registro in registros:
-            try:
-                checkbox = registro.find_element(By.CSS_SELECTOR, "input.check_listado")
-                finiquitos.append(checkbox)
-            except:
-                continue
-
+        finiquitos = [fila for fila in registros if fila["tiene_check"]]
         if not finiquitos:
             return False
 
-        driver.execute_script("arguments[0].click();", finiquitos[0])
+        fila = finiquitos[0]
+        if fila["id"]:
+            marcado = tabla.marcar(driver, [fila["id"]]).get(str(fila["id"]))
+        else:
+            # Sin ID en onclick ni en el checkbox: se marca por posición
+            marcado = tabla.marcar_indices(driver, [fila["indice"]]).get(fila["indice"])
+        if not marcado:
+            logging.warning("⚠ El checkbox del finiquito más reciente no quedó marcado.")
+            return False
+
         logging.info("✅ Se seleccionó el finiquito más reciente.")
         return True
 
@@ -216,82 +316,267 @@ def seleccionar_finiquito_mas_reciente():
         logging.error(f"❌ Error al seleccionar el finiquito más reciente: {str(e)}")
         return False
 
-def limpiar_rut():
+@trazas.paso()
+def limpiar_rut(driver):
     try:
         input_rut = WebDriverWait(driver, 5).until(
             EC.presence_of_element_located((By.ID, "filtro_rut"))
         )
         input_rut.clear()
-        driver.execute_script("arguments[0].dispatchEvent(new Event('keyup'))", input_rut)
+        esperas.tras_accion(
+            driver,
+            lambda: driver.execute_script("arguments[0].dispatchEvent(new Event('keyup'))", input_rut),
+        )
         logging.info("✅ RUT eliminado.")
-        time.sleep(2)  
+        return True
     except Exception as e:
         logging.error(f"❌ Error al limpiar el RUT: {str(e)}")
+        return False
 
-def procesar_finiquitos_por_rut(ruts):
-    global finiquitos_seleccionados
+def procesar_finiquitos_por_rut(driver, registro, ruts):
+    """
+    Selecciona el finiquito más reciente de cada RUT hasta juntar 100 y
+    descarga la CARGA MASIVA DT. Devuelve cuántos se seleccionaron.
+    """
+    seleccionados = []
     for rut in ruts:
-        if buscar_rut_y_filtrar(rut):
-            if seleccionar_finiquito_mas_reciente():
-                finiquitos_seleccionados += 1
-                if finiquitos_seleccionados >= 100:
-                    cargar_masivo_dt()
+        # El RUT siguiente reemplaza al anterior: no hace falta limpiar entre medio
+        resultado = buscar_rut_y_filtrar(driver, rut)
+        if resultado == "ENCONTRADO":
+            if seleccionar_finiquito_mas_reciente(driver):
+                seleccionados.append(rut)
+                registro.registrar(rut, "SELECCIONADO")
+                if len(seleccionados) >= 100:
+                    if cargar_masivo_dt(driver):
+                        registro.registrar_varios(seleccionados, "EXPORTADO")
                     break
-        limpiar_rut()
+            continue
+
+        # ERROR no es final: --resume vuelve a intentar ese RUT
+        registro.registrar(rut, resultado)
+        if resultado == "ERROR" and not sesion_viva(driver):
+            logging.error("❌ El navegador dejó de responder; los RUTs restantes quedan pendientes.")
+            return len(seleccionados)
+    limpiar_rut(driver)
+    return len(seleccionados)
 
-def cargar_masivo_dt():
+def sesion_viva(driver):
+    try:
+        driver.execute_script("return 1;")
+        return True
+    except Exception:
+        return False
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 🔹 **Modo índice: filtra tipo/estado una sola vez y lee todas las páginas**
+# ─────────────────────────────────────────────────────────────────────────────
+@trazas.paso()
+def construir_indice_rut(driver):
+    """
+    Aplica tipo DT y estado 'Enviado al representante' una vez, recorre todas
+    las páginas y devuelve (indice, paginador): {rut: [filas]} con la fila más
+    reciente primero y el cursor con el que se numeraron las páginas.
+    Lanza una excepción si los filtros no quedaron puestos o la paginación
+    falla: un índice incompleto no sirve para decidir que un RUT no tiene
+    finiquitos.
+    """
+    aplicar_filtros(driver, tipo=TIPO_DT, estado=ESTADO_ENVIADO, rut="")
+    esperas.esperar_ajax(driver)
+    if not filtros_aplicados(driver, tipo=TIPO_DT, estado=ESTADO_ENVIADO, rut=""):
+        raise RuntimeError(f"Los filtros no quedaron aplicados: {valores_filtros(driver)}")
+
+    indice = {}
+    paginador = paginacion.Paginador(driver)
+    while True:
+        pagina = paginador.actual
+        filas = tabla.snapshot(driver)
+        for fila in filas:
+            if not fila["rut"] or not fila["tiene_check"]:
+                continue
+            indice.setdefault(fila["rut"], []).append({
+                "id": fila["id"], "fecha": fila["fecha"], "pagina": pagina, "orden": fila["indice"],
+            })
+        logging.info(f"📄 Página {pagina} indexada ({len(filas)} filas).")
+
+        with trazas.span("avance_pagina", item=pagina + 1):
+            if not paginador.siguiente():
+                break
+
+    # Más reciente primero; sin fecha se respeta el orden de la tabla
+    for filas in indice.values():
+        filas.sort(key=lambda f: (-(f["fecha"].timestamp() if f["fecha"] else 0), f["pagina"], f["orden"]))
+    logging.info(f"🗂 Índice construido: {len(indice)} RUTs en {pagina} páginas.")
+    return indice, paginador
+
+def procesar_finiquitos_por_indice(driver, registro, ruts):
+    """
+    Igual que procesar_finiquitos_por_rut pero con O(#páginas) cargas en vez de
+    un ciclo de filtros por RUT. Devuelve cuántos se seleccionaron.
+    """
+    indice, paginador = construir_indice_rut(driver)
+
+    por_pagina = {}
+    rut_por_id = {}
+    seleccionados = []
+    vistos = set()
+    for rut in ruts:
+        clave = validacion.normalizar_rut(rut)
+        if clave in vistos:
+            continue
+        vistos.add(clave)
+        if clave not in indice:
+            logging.info(f"❌ No hay finiquitos disponibles para el RUT {rut}.")
+            registro.registrar(rut, "NO_ENCONTRADO")
+            continue
+        if len(rut_por_id) >= 100:
+            break
+        # La más reciente que se pueda marcar por ID
+        fila = next((f for f in indice[clave] if f["id"]), None)
+        if fila is None:
+            logging.warning(f"⚠ Las filas del RUT {rut} no tienen ID legible; queda pendiente.")
+            registro.registrar(rut, "ERROR", detalle="fila sin ID")
+            continue
+        por_pagina.setdefault(fila["pagina"], []).append(fila["id"])
+        rut_por_id[str(fila["id"])] = rut
+
+    # Desde la última página hacia atrás: el recorrido terminó al final
+    for pagina in sorted(por_pagina, reverse=True):
+        try:
+            with trazas.span("avance_pagina", item=pagina):
+                if not paginador.ir_a(pagina):
+                    continue
+        except paginacion.ErrorPaginacion as e:
+            logging.error(f"❌ {str(e)}")
+            continue
+        estado = tabla.marcar(driver, por_pagina[pagina])
+        ruts_marcados = [rut_por_id[str(i)] for i, seleccionado in estado.items() if seleccionado]
+        registro.registrar_varios(ruts_marcados, "SELECCIONADO")
+        seleccionados.extend(ruts_marcados)
+        marcados = len(ruts_marcados)
+        logging.info(f"✅ Página {pagina}: {marcados} finiquitos seleccionados.")
+
+    # Los que no se pudieron marcar (página inalcanzable o checkbox que no quedó
+    # marcado) quedan como ERROR: no son finales y --resume los vuelve a intentar
+    marcados = set(seleccionados)
+    fallidos = [r for r in rut_por_id.values() if r not in marcados]
+    if fallidos:
+        logging.warning(f"⚠ {len(fallidos)} RUTs no se pudieron marcar.")
+        registro.registrar_varios(fallidos, "ERROR", detalle="no se pudo marcar")
+
+    logging.info(f"✅ Total seleccionados por índice: {len(seleccionados)}")
+    if len(seleccionados) >= 100:
+        if cargar_masivo_dt(driver):
+            registro.registrar_varios(seleccionados, "EXPORTADO")
+    return len(seleccionados)
+
+@trazas.paso()
+def cargar_masivo_dt(driver):
     try:
         logging.info("📥 Iniciando Carga Masiva DT...")
+        carpeta_descarga = descargas.preparar_directorio(DOWNLOAD_DIR)
+        descargas.dirigir_descargas(driver, carpeta_descarga)
+
         boton_carga = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.ID, "DtBtn")))
         driver.execute_script("arguments[0].click();", boton_carga)
-        logging.info("✅ Carga Masiva DT completada.")
-        time.sleep(5)
+
+        archivo = descargas.mover_a(descargas.esperar_descarga(carpeta_descarga), DOWNLOAD_DIR)
+        logging.info(f"✅ Carga Masiva DT completada: {archivo}")
+        return True
     except Exception as e:
         logging.error(f"❌ Error al presionar Carga Masiva DT: {str(e)}")
+        return False
+
+# Lista de RUTs a procesar si no se pasa --entrada
+RUTS_A_BUSCAR = [
+    "20377094-4", "18711238-9", "17313121-6", "17284160-0", "11861000-8",
+    "16682157-6", "21558400-3", "26219984-3", "26351131-K", "10561637-6", "18526700-8", "20403582-2",
+    "16939469-5", "16391428-K", "20601312-5", "13556074-K", "19844229-1", "9806190-8", "18049274-7",
+    "18530794-8", "10243463-3", "19782685-1", "25931059-8", "16070368-7", "21239969-8", "20580274-6",
+    "13133505-9", "18347442-1", "19117060-1", "26137820-5", "26366014-5", "17571894-K", "9794737-6",
+    "19600589-7", "16928306-0", "18838659-8", "21014686-5", "6403005-1", "26462461-4", "19428812-3",
+    "20400058-1", "18532162-2", "17243198-4", "19784171-0", "17516498-7", "7575506-6", "12643411-1",
+    "20635664-2", "27146175-5", "11090857-1", "8408540-5", "15898989-1", "20406222-6", "20517342-0",
+    "17625970-1", "19208302-8", "19385908-9", "27119460-9", "20517261-0", "9226432-7", "9169749-1",
+    "15419192-5", "13056726-6", "17060452-0", "7470230-9", "13453235-1", "19559408-2", "15388759-4",
+    "19733892-K", "10402177-8", "10293229-3", "12841380-4", "10071471-K", "13175187-7", "16006517-6",
+    "16150471-8", "9980373-8", "20157101-4", "26919893-1", "8441972-9", "17339809-3", "18969946-8",
+    "17383363-6", "10176871-6", "18670691-9", "18816438-2", "11848551-3", "20817498-3", "14138209-8",
+    "13026724-6", "10148096-8", "9195430-3", "18528384-4", "13698988-K", "27113544-0", "19544729-2",
+    "18976522-3", "18047488-9", "20598834-3", "10230748-8", "12942387-0", "7376716-4", "19247068-4",
+    "15400850-0", "19257848-5", "14498577-K", "16940208-6", "19117448-8", "19856865-1", "17400166-9",
+    "15985802-2", "12750847-K", "13263629-K", "18168658-8", "13049509-5", "19733635-8", "11668811-5",
+    "18178054-1", "17902434-9", "17681974-K", "18676802-7", "18494630-0", "21283021-6", "17484122-5",
+    "14353015-9", "26768861-3", "14385764-6", "16932553-7", "10304977-6", "18029959-9", "9170595-8",
+    "26679274-3", "18358770-6", "26802028-4", "19921769-0", "19746358-9", "20227897-3", "17451904-8",
+    "16631250-7", "20332908-3", "11208836-9", "16786309-4", "26749413-4", "19800620-3", "20202007-0",
+    "14091237-9", "14024990-4", "20381786-K", "19134653-K", "18087722-3", "17103520-1", "16248825-2",
+    "21574475-2", "20404977-7", "10760539-8", "13668169-9", "18116297-K", "18064594-2", "17555105-0",
+    "19711999-3", "11875145-0", "18676747-0", "9383236-1", "26649039-9", "25972222-5", "18632928-7",
+    "11405212-4", "20224846-2", "18743018-6", "17052396-2", "13904237-9", "16979539-8", "19915869-4",
+    "19500046-8", "25563580-8", "12900011-2", "18026183-4", "27129584-7", "19497301-2", "9382199-8",
+    "19117789-4", "11685143-1", "10911158-9", "19548341-8", "9703230-0", "18469744-0", "17689232-3",
+    "12354298-3", "20403191-6", "7746355-0", "19427512-9", "26400954-5", "8853018-7", "20597718-K",
+    "18364144-1", "26791417-6", "27227638-2", "20059620-K", "16912965-7", "18266426-K", "12820635-3",
+    "18180027-5", "19940462-8", "18931215-6", "15887829-1", "27048955-9", "27005291-6", "18323829-9",
+    "20330030-1", "17353709-3", "11879799-K", "10107849-3", "27365952-8", "13976446-3", "16054394-9",
+    "17191374-8", "17117695-6", "7925441-K", "15421758-4", "19116381-8", "20205503-6", "19219276-5",
+    "16103337-5", "24900673-4", "25074316-5", "8344724-9", "18050116-9", "20410774-2", "17668966-8",
+    "25691366-6", "20041023-8", "14050223-5", "26588297-8", "18834599-9", "13247909-7", "14441190-0",
+    "15930575-9", "12239089-6", "15432766-5", "9905629-0", "19062173-1", "13266760-8", "19369993-6",
+    "19934310-6", "28403307-8", "8120059-9", "16363740-5", "9314008-7", "10981563-2", "25654287-0",
+    "11725300-7", "12715755-3", "20571236-4", "22176350-5", "27013610-9", "17143878-0", "9775361-K",
+    "18519091-9", "15175880-0", "18589971-3", "20461104-1", "16769652-K", "21909473-6", "16903613-6"]  # etc.
 
 # 🏁 Script
-try:
-    acceder_a_sigo()
-    acceder_a_solicitud_finiquitos()
-    ruts_a_buscar = [        "20377094-4", "18711238-9", "17313121-6", "17284160-0", "11861000-8",
-        "16682157-6", "21558400-3", "26219984-3", "26351131-K", "10561637-6", "18526700-8", "20403582-2",
-        "16939469-5", "16391428-K", "20601312-5", "13556074-K", "19844229-1", "9806190-8", "18049274-7",
-        "18530794-8", "10243463-3", "19782685-1", "25931059-8", "16070368-7", "21239969-8", "20580274-6",
-        "13133505-9", "18347442-1", "19117060-1", "26137820-5", "26366014-5", "17571894-K", "9794737-6",
-        "19600589-7", "16928306-0", "18838659-8", "21014686-5", "6403005-1", "26462461-4", "19428812-3",
-        "20400058-1", "18532162-2", "17243198-4", "19784171-0", "17516498-7", "7575506-6", "12643411-1",
-        "20635664-2", "27146175-5", "11090857-1", "8408540-5", "15898989-1", "20406222-6", "20517342-0",
-        "17625970-1", "19208302-8", "19385908-9", "27119460-9", "20517261-0", "9226432-7", "9169749-1",
-        "15419192-5", "13056726-6", "17060452-0", "7470230-9", "13453235-1", "19559408-2", "15388759-4",
-        "19733892-K", "10402177-8", "10293229-3", "12841380-4", "10071471-K", "13175187-7", "16006517-6",
-        "16150471-8", "9980373-8", "20157101-4", "26919893-1", "8441972-9", "17339809-3", "18969946-8",
-        "17383363-6", "10176871-6", "18670691-9", "18816438-2", "11848551-3", "20817498-3", "14138209-8",
-        "13026724-6", "10148096-8", "9195430-3", "18528384-4", "13698988-K", "27113544-0", "19544729-2",
-        "18976522-3", "18047488-9", "20598834-3", "10230748-8", "12942387-0", "7376716-4", "19247068-4",
-        "15400850-0", "19257848-5", "14498577-K", "16940208-6", "19117448-8", "19856865-1", "17400166-9",
-        "15985802-2", "12750847-K", "13263629-K", "18168658-8", "13049509-5", "19733635-8", "11668811-5",
-        "18178054-1", "17902434-9", "17681974-K", "18676802-7", "18494630-0", "21283021-6", "17484122-5",
-        "14353015-9", "26768861-3", "14385764-6", "16932553-7", "10304977-6", "18029959-9", "9170595-8",
-        "26679274-3", "18358770-6", "26802028-4", "19921769-0", "19746358-9", "20227897-3", "17451904-8",
-        "16631250-7", "20332908-3", "11208836-9", "16786309-4", "26749413-4", "19800620-3", "20202007-0",
-        "14091237-9", "14024990-4", "20381786-K", "19134653-K", "18087722-3", "17103520-1", "16248825-2",
-        "21574475-2", "20404977-7", "10760539-8", "13668169-9", "18116297-K", "18064594-2", "17555105-0",
-        "19711999-3", "11875145-0", "18676747-0", "9383236-1", "26649039-9", "25972222-5", "18632928-7",
-        "11405212-4", "20224846-2", "18743018-6", "17052396-2", "13904237-9", "16979539-8", "19915869-4",
-        "19500046-8", "25563580-8", "12900011-2", "18026183-4", "27129584-7", "19497301-2", "9382199-8",
-        "19117789-4", "11685143-1", "10911158-9", "19548341-8", "9703230-0", "18469744-0", "17689232-3",
-        "12354298-3", "20403191-6", "7746355-0", "19427512-9", "26400954-5", "8853018-7", "20597718-K",
-        "18364144-1", "26791417-6", "27227638-2", "20059620-K", "16912965-7", "18266426-K", "12820635-3",
-        "18180027-5", "19940462-8", "18931215-6", "15887829-1", "27048955-9", "27005291-6", "18323829-9",
-        "20330030-1", "17353709-3", "11879799-K", "10107849-3", "27365952-8", "13976446-3", "16054394-9",
-        "17191374-8", "17117695-6", "7925441-K", "15421758-4", "19116381-8", "20205503-6", "19219276-5",
-        "16103337-5", "24900673-4", "25074316-5", "8344724-9", "18050116-9", "20410774-2", "17668966-8",
-        "25691366-6", "20041023-8", "14050223-5", "26588297-8", "18834599-9", "13247909-7", "14441190-0",
-        "15930575-9", "12239089-6", "15432766-5", "9905629-0", "19062173-1", "13266760-8", "19369993-6",
-        "19934310-6", "28403307-8", "8120059-9", "16363740-5", "9314008-7", "10981563-2", "25654287-0",
-        "11725300-7", "12715755-3", "20571236-4", "22176350-5", "27013610-9", "17143878-0", "9775361-K",
-        "18519091-9", "15175880-0", "18589971-3", "20461104-1", "16769652-K", "21909473-6", "16903613-6"]  # etc.
-    procesar_finiquitos_por_rut(ruts_a_buscar)
-finally:
-    driver.quit()
-    logging.info("🏁 Script finalizado y navegador cerrado.")
+def main():
+    parser = argparse.ArgumentParser(description="Selecciona en SIGO el finiquito más reciente de cada RUT.")
+    parser.add_argument("--indice", action="store_true",
+                        help="Filtrar tipo/estado una vez y leer todas las páginas en vez de filtrar por RUT.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Omitir los RUTs que la bitácora ya tiene como exportados o no encontrados.")
+    parser.add_argument("--entrada",
+                        help="CSV, XLSX o texto con los RUTs ('-' = stdin). Sin esto se usa RUTS_A_BUSCAR.")
+    parser.add_argument("--columna", help="Encabezado o número de columna con el RUT (por defecto la primera).")
+    parser.add_argument("--hoja", help="Hoja del XLSX (por defecto la primera).")
+    args = parser.parse_args()
+
+    trazas.configurar("rut")
+    registro = Bitacora("rut")
+
+    def descartar(rut, motivo):
+        logging.warning(f"⚠ RUT {rut} descartado: {motivo}")
+        if motivo != validacion.RUT_DUPLICADO:
+            registro.registrar(rut, motivo)
+
+    # Se leen a medida que se procesan: los mal escritos o repetidos no llegan al navegador
+    fuente = entradas.leer(args.entrada, args.columna, args.hoja) if args.entrada else RUTS_A_BUSCAR
+    ruts_a_buscar = validacion.filtrar_ruts(fuente, descartar)
+    if args.resume:
+        ruts_a_buscar = entradas.omitir_finalizados(ruts_a_buscar, registro.finalizados(), "rut")
+
+    # El primero se lee antes de abrir Chrome: un archivo o columna inválidos fallan al tiro
+    primero = next(ruts_a_buscar, None)
+    if primero is None:
+        logging.info("No hay RUTs para procesar.")
+        registro.cerrar()
+        return
+    ruts_a_buscar = itertools.chain([primero], ruts_a_buscar)
+
+    # Crear Chrome (perfil ligero con BOT_DT_LIGERO=1)
+    driver = crear_driver()
+
+    try:
+        acceder_a_sigo(driver)
+        acceder_a_solicitud_finiquitos(driver)
+        if args.indice:
+            procesar_finiquitos_por_indice(driver, registro, ruts_a_buscar)
+        else:
+            procesar_finiquitos_por_rut(driver, registro, ruts_a_buscar)
+    finally:
+        registro.cerrar()
+        driver.quit()
+        logging.info("🏁 Script finalizado y navegador cerrado.")
+        trazas.imprimir_resumen()
+
+if __name__ == "__main__":
+    main()
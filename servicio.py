@@ -0,0 +1,358 @@
+"""
+Servicio residente con un pool de sesiones SIGO y MiDT ya logueadas.
+
+Recibe trabajos como JSON por una carpeta de entrada o por HTTP en localhost:
+
+    {"tipo": "ruts",     "items": ["12345678-9", ...]}   flujo de rut.py ("indice": true opcional)
+    {"tipo": "ids",      "items": [12345, ...]}          flujo de sigo2.py
+    {"tipo": "exportar"}                                  flujo de sigo.py
+    {"tipo": "subir",    "items": ["finiquitos/x.csv"]}   flujo de robot.py ("empresa" opcional)
+
+    curl -X POST localhost:8787/trabajos -d '{"tipo": "ids", "items": [123]}'
+    curl localhost:8787/trabajos/<id>
+    cp trabajo.json trabajos/entrada/
+
+Cada trabajo va a una sesión libre del tipo que corresponde; las sesiones
+que fallan el chequeo de salud se cierran y se vuelven a abrir.
+"""
+import logging
+
+# Configurar logging antes de importar los scripts (cada uno llama a basicConfig)
+logging.basicConfig(
+    filename="servicio.log",
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(threadName)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import robot
+import rut
+import sigo
+import sigo2
+import trazas
+import validacion
+from bitacora import Bitacora
+from navegador import crear_driver
+
+PUERTO = 8787
+CARPETA_TRABAJOS = os.path.join(os.getcwd(), "trabajos")
+INTERVALO_CARPETA = 1.0
+
+# Una sesión se recicla tras este número de trabajos aunque esté sana
+MAX_TRABAJOS_POR_SESION = 50
+
+TIPOS_SIGO = ("ruts", "ids", "exportar")
+TIPOS_DT = ("subir",)
+
+
+class Sesion:
+    """
+    Un navegador logueado en SIGO o MiDT y su hilo de trabajo.
+    """
+
+    def __init__(self, tipo, numero):
+        self.tipo = tipo
+        self.nombre = f"{tipo}-{numero}"
+        self.driver = None
+        self.trabajos = 0
+        self.ocupada = False
+
+    def abrir(self):
+        if self.tipo == "sigo":
+            self.driver = crear_driver(download_dir=sigo.download_folder)
+            sigo2.iniciar_sesion(self.driver, nombre_sesion=f"sigo_{self.nombre}")
+            sigo2.entrar_a_solicitud_finiquitos(self.driver)
+        else:
+            self.driver = robot.setup_driver()
+            robot.iniciar_sesion(self.driver)
+        self.trabajos = 0
+        logging.info(f"Sesión {self.nombre} lista.")
+
+    def cerrar(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def sana(self):
+        if self.driver is None or not sigo2.sesion_viva(self.driver):
+            return False
+        try:
+            if self.tipo == "sigo":
+                # Si SIGO nos devolvió al login, la sesión expiró
+                return not self.driver.find_elements("id", "user") and sigo2.pagina_sana(self.driver)
+            return urlparse(self.driver.current_url).netloc == urlparse(robot.URL_MIDT).netloc
+        except Exception:
+            return False
+
+    def asegurar(self):
+        """
+        Deja la sesión abierta y sana, reciclándola si hace falta.
+        """
+        if self.driver is not None and self.trabajos < MAX_TRABAJOS_POR_SESION and self.sana():
+            return
+        if self.driver is not None:
+            logging.warning(f"Sesión {self.nombre} no está sana o cumplió su ciclo; se recicla.")
+        self.cerrar()
+        self.abrir()
+
+
+def ejecutar_trabajo(sesion, trabajo):
+    """
+    Corre un trabajo en la sesión y devuelve su resultado (JSON-serializable).
+    """
+    driver = sesion.driver
+    tipo = trabajo["tipo"]
+    items = trabajo.get("items", [])
+
+    if tipo == "ids":
+        registro = Bitacora("sigo2")
+        try:
+            resultados = []
+            for finiquito_id in items:
+                resultado, intentos = sigo2.procesar_finiquito(driver, finiquito_id)
+                registro.registrar(finiquito_id, resultado, intentos, detalle=f"servicio {trabajo['id']}")
+                resultados.append({"id": finiquito_id, "resultado": resultado, "intentos": intentos})
+            return resultados
+        finally:
+            registro.cerrar()
+
+    if tipo == "exportar":
+        registro = Bitacora("sigo")
+        try:
+            ruta_csv, ids = sigo.exportar_carga_masiva(driver, registro, resume=True)
+            return {"csv": ruta_csv, "ids": ids}
+        finally:
+            registro.cerrar()
+
+    if tipo == "ruts":
+        items, rechazados = validacion.validar_ruts(items)
+        registro = Bitacora("rut")
+        try:
+            if trabajo.get("indice"):
+                seleccionados = rut.procesar_finiquitos_por_indice(driver, registro, items)
+            else:
+                seleccionados = rut.procesar_finiquitos_por_rut(driver, registro, items)
+            return {"seleccionados": seleccionados,
+                    "rechazados": [{"rut": r, "motivo": m} for r, m in rechazados]}
+        finally:
+            registro.cerrar()
+
+    if tipo == "subir":
+        # chromedriver necesita rutas absolutas para el input file (como robot.leer_lotes)
+        archivos = [os.path.abspath(ruta) for ruta in items]
+        return robot.subir_lotes(driver, [(trabajo.get("empresa") or robot.EMPRESA_DT, archivos)])
+
+    raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+
+
+class Servicio:
+    def __init__(self, sesiones_sigo=2, sesiones_dt=1, carpeta=CARPETA_TRABAJOS):
+        self.colas = {"sigo": queue.Queue(), "dt": queue.Queue()}
+        self.sesiones = [Sesion("sigo", i) for i in range(1, sesiones_sigo + 1)]
+        self.sesiones += [Sesion("dt", i) for i in range(1, sesiones_dt + 1)]
+        self.trabajos = {}
+        self.lock = threading.Lock()
+        self.detener = threading.Event()
+        self.carpeta = carpeta
+        for sub in ("entrada", "en_curso", "hechos"):
+            os.makedirs(os.path.join(carpeta, sub), exist_ok=True)
+
+    # ── Trabajos ────────────────────────────────────────────────────────────
+    def encolar(self, trabajo, origen="http"):
+        tipo = trabajo.get("tipo")
+        if tipo not in TIPOS_SIGO + TIPOS_DT:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+        cola = "sigo" if tipo in TIPOS_SIGO else "dt"
+        if not any(s.tipo == cola for s in self.sesiones):
+            raise ValueError(f"No hay sesiones '{cola}' en el pool para trabajos '{tipo}'.")
+
+        trabajo = dict(trabajo)
+        trabajo.setdefault("id", uuid.uuid4().hex[:12])
+        trabajo.update({"estado": "EN_COLA", "origen": origen, "recibido": datetime.now().isoformat(timespec="seconds")})
+        with self.lock:
+            self.trabajos[trabajo["id"]] = trabajo
+        self.colas[cola].put(trabajo["id"])
+        logging.info(f"Trabajo {trabajo['id']} ({tipo}, {len(trabajo.get('items', []))} items) en cola '{cola}'.")
+        return trabajo["id"]
+
+    def estado(self, trabajo_id):
+        with self.lock:
+            trabajo = self.trabajos.get(trabajo_id)
+            return dict(trabajo) if trabajo else None
+
+    def _actualizar(self, trabajo_id, **campos):
+        with self.lock:
+            self.trabajos[trabajo_id].update(campos)
+            return dict(self.trabajos[trabajo_id])
+
+    # ── Hilos ───────────────────────────────────────────────────────────────
+    def _atender(self, sesion):
+        cola = self.colas[sesion.tipo]
+        while not self.detener.is_set():
+            try:
+                trabajo_id = cola.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            trabajo = self._actualizar(trabajo_id, estado="EN_CURSO", sesion=sesion.nombre)
+            inicio = time.monotonic()
+            sesion.ocupada = True
+            try:
+                sesion.asegurar()
+                if trabajo["tipo"] == "ids":
+                    sigo2.restablecer_estado(sesion.driver)
+                elif sesion.tipo == "sigo":
+                    # Filtros y checks del trabajo anterior no deben arrastrarse
+                    sigo2.refrescar_y_volver(sesion.driver)
+                resultado = ejecutar_trabajo(sesion, trabajo)
+                trabajo = self._actualizar(trabajo_id, estado="HECHO", resultado=resultado)
+            except Exception as e:
+                logging.error(f"Trabajo {trabajo_id} falló en {sesion.nombre}: {str(e)}")
+                traceback.print_exc()
+                trabajo = self._actualizar(trabajo_id, estado="ERROR", error=str(e))
+                # Ante cualquier error la sesión se revisa antes del próximo trabajo
+                if not sesion.sana():
+                    sesion.cerrar()
+            finally:
+                sesion.ocupada = False
+                sesion.trabajos += 1
+
+            trabajo = self._actualizar(trabajo_id, segundos=round(time.monotonic() - inicio, 2))
+            if trabajo["origen"] == "carpeta":
+                self._escribir_resultado(trabajo)
+            logging.info(f"Trabajo {trabajo_id} terminado: {trabajo['estado']} en {trabajo['segundos']}s.")
+
+    def _vigilar_carpeta(self):
+        entrada = os.path.join(self.carpeta, "entrada")
+        en_curso = os.path.join(self.carpeta, "en_curso")
+        while not self.detener.is_set():
+            for nombre in sorted(os.listdir(entrada)):
+                if not nombre.endswith(".json"):
+                    continue
+                ruta = os.path.join(en_curso, nombre)
+                try:
+                    # Renombrar primero: así un archivo nunca se toma dos veces
+                    os.replace(os.path.join(entrada, nombre), ruta)
+                    with open(ruta, encoding="utf-8") as f:
+                        trabajo = json.load(f)
+                    trabajo.setdefault("id", os.path.splitext(nombre)[0])
+                    self.encolar(trabajo, origen="carpeta")
+                except Exception as e:
+                    logging.error(f"Trabajo inválido en {nombre}: {str(e)}")
+                    self._escribir_resultado({"id": os.path.splitext(nombre)[0], "estado": "ERROR", "error": str(e)})
+            self.detener.wait(INTERVALO_CARPETA)
+
+    def _escribir_resultado(self, trabajo):
+        hechos = os.path.join(self.carpeta, "hechos")
+        destino = os.path.join(hechos, f"{trabajo['id']}.json")
+        with open(destino + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(trabajo, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(destino + ".tmp", destino)
+        try:
+            os.remove(os.path.join(self.carpeta, "en_curso", f"{trabajo['id']}.json"))
+        except FileNotFoundError:
+            pass
+
+    def salud(self):
+        return {
+            "sesiones": [
+                {"nombre": s.nombre, "abierta": s.driver is not None, "ocupada": s.ocupada, "trabajos": s.trabajos}
+                for s in self.sesiones
+            ],
+            "en_cola": {nombre: cola.qsize() for nombre, cola in self.colas.items()},
+        }
+
+    def iniciar(self):
+        # Las sesiones se abren en paralelo para no sumar los logins
+        aperturas = [threading.Thread(target=s.asegurar, name=f"abrir-{s.nombre}") for s in self.sesiones]
+        for hilo in aperturas:
+            hilo.start()
+        for hilo in aperturas:
+            hilo.join()
+
+        for sesion in self.sesiones:
+            threading.Thread(target=self._atender, args=(sesion,), name=sesion.nombre, daemon=True).start()
+        threading.Thread(target=self._vigilar_carpeta, name="carpeta", daemon=True).start()
+
+    def cerrar(self):
+        self.detener.set()
+        for sesion in self.sesiones:
+            sesion.cerrar()
+
+
+def crear_servidor_http(servicio, puerto=PUERTO):
+    class Manejador(BaseHTTPRequestHandler):
+        def log_message(self, formato, *args):
+            logging.debug(formato % args)
+
+        def _responder(self, codigo, cuerpo):
+            datos = json.dumps(cuerpo, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/trabajos":
+                return self._responder(404, {"error": "no existe"})
+            try:
+                largo = int(self.headers.get("Content-Length") or 0)
+                trabajo_id = servicio.encolar(json.loads(self.rfile.read(largo) or b"{}"))
+                return self._responder(202, {"id": trabajo_id})
+            except (ValueError, json.JSONDecodeError) as e:
+                return self._responder(400, {"error": str(e)})
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/salud":
+                return self._responder(200, servicio.salud())
+            if self.path.startswith("/trabajos/"):
+                trabajo = servicio.estado(self.path.split("/")[2])
+                return self._responder(200 if trabajo else 404, trabajo or {"error": "no existe"})
+            return self._responder(404, {"error": "no existe"})
+
+    # Solo localhost: el servicio maneja credenciales y no tiene autenticación
+    return ThreadingHTTPServer(("127.0.0.1", puerto), Manejador)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pool residente de sesiones SIGO/MiDT con cola de trabajos.")
+    parser.add_argument("--sigo", type=int, default=2, help="Sesiones SIGO en el pool.")
+    parser.add_argument("--dt", type=int, default=1, help="Sesiones MiDT en el pool.")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--carpeta", default=CARPETA_TRABAJOS, help="Carpeta con entrada/, en_curso/ y hechos/.")
+    args = parser.parse_args()
+    trazas.configurar("servicio")
+
+    servicio = Servicio(args.sigo, args.dt, args.carpeta)
+    servicio.iniciar()
+    servidor = crear_servidor_http(servicio, args.puerto)
+    logging.info(f"Servicio escuchando en http://127.0.0.1:{args.puerto} y en {args.carpeta}/entrada")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.shutdown()
+        servicio.cerrar()
+        logging.info("Servicio detenido.")
+        trazas.imprimir_resumen()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,24 @@
-
 import logging
 import os
-import time
 import traceback
-import pandas as pd
-import openpyxl
+import argparse
 import csv
-from selenium import webdriver
+import json
+from datetime import datetime
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.action_chains import ActionChains
-from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
+import esperas
+from navegador import crear_driver
+import almacen_sesion
+import tabla
+import toasts
+import trazas
+import paginacion
+from bitacora import Bitacora
+from csv_dt import normalizar_csv, ENCODING_SALIDA
+import descargas
 
 # Configurar logging
 log_file = "sigo.log"
@@ -28,71 +33,136 @@ logging.basicConfig(
 load_dotenv()
 USUARIO = os.getenv("MVS_SIGO_USER")
 PASSWORD = os.getenv("MVS_SIGO_PASS")
+URL_SIGO = os.getenv("SIGO_URL", "http://35.184.233.114/MVS_SIGO/")
 
 # Definir la carpeta de descargas
 download_folder = os.path.join(os.getcwd(), "finiquitos")
 
-# Configurar opciones de Chrome
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-
-# Opcional: Para descargas automáticas
-prefs = {
-    "download.default_directory": download_folder,
-    "download.prompt_for_download": False,
-    "safebrowsing.enabled": True,
-    "profile.default_content_settings.popups": 0,
-    "filebrowser.download.dir": download_folder
-}
-options.add_experimental_option("prefs", prefs)
-
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
-# 🔄 Función para convertir un archivo .xlsx a .csv
-def convertir_csv_utf8_a_csv():
+# 🔄 Función para normalizar el CSV UTF-8 descargado al CSV que acepta el portal DT
+def convertir_csv_utf8_a_csv(archivo_original=None):
     try:
-        # Obtener el archivo más reciente en la carpeta de descargas
-        archivos = [f for f in os.listdir(download_folder) if f.endswith(".csv")]
-        if not archivos:
-            logging.error("❌ No se encontraron archivos .xlsx en la carpeta de finiquitos.")
-            return None
-        
-        archivos.sort(key=lambda x: os.path.getmtime(os.path.join(download_folder, x)), reverse=True)
-        archivo_mas_reciente = archivos[0]  # Obtener el archivo más reciente
-
-        archivo_original = os.path.join(download_folder, archivo_mas_reciente)
+        if archivo_original is None:
+            # Obtener el archivo más reciente en la carpeta de descargas (sin ordenar toda la carpeta)
+            archivos = [e for e in os.scandir(download_folder) if e.is_file() and e.name.endswith(".csv")]
+            if not archivos:
+                logging.error("❌ No se encontraron archivos .csv en la carpeta de finiquitos.")
+                return None
+            archivo_original = max(archivos, key=lambda e: e.stat().st_mtime).path
 
         logging.info(f"🔄 Convirtiendo archivo: {archivo_original} a formato CSV estándar")
 
-        # Leer el archivo Excel y guardarlo en formato CSV
-        df = pd.read_csv(archivo_original, delimiter=",", encoding="utf-8")
-        df.to_csv(archivo_original, index=False, sep=",", encoding=None) 
+        # Transcodificar fila a fila, validando el esquema, con reemplazo atómico
+        _, filas = normalizar_csv(archivo_original)
 
-        logging.info(f"✅ Archivo convertido y guardado como: {archivo_original}")
+        logging.info(f"✅ Archivo convertido y guardado como: {archivo_original} ({filas} filas)")
         return archivo_original
 
     except Exception as e:
-        logging.error(f"❌ Error al convertir el archivo .xlsx a .csv: {str(e)}")
+        logging.error(f"❌ Error al convertir el archivo a CSV estándar: {str(e)}")
         return None
 
-try:
-    logging.info("🚀 Iniciando script de automatización...")
-
-    # 1️⃣ Acceder a la página de inicio de sesión
-    driver.get("http://35.184.233.114/MVS_SIGO/")
-    logging.info("🔑 Accediendo a la página de inicio de sesión.")
-
-    usuario_input = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "user")))
-    password_input = driver.find_element(By.ID, "pass")
-
-    usuario_input.send_keys(USUARIO)
-    password_input.send_keys(PASSWORD)
-    logging.info("✅ Credenciales ingresadas correctamente.")
-
-    driver.find_element(By.ID, "btnLogn").click()
-    WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, "enlace5")))
-    logging.info("🎯 Inicio de sesión exitoso.")
-
+# Clic en ráfaga sobre los checkboxes de los IDs dados. Para cada uno registra
+# si apareció un toast rojo de inmediato (validación sincrónica) y el instante.
+JS_RAFAGA = """
+var ids = arguments[0].map(String), salida = [];
+var rojos = function () { return document.querySelectorAll('div.toast.red.darken-2').length; };
+var filas = document.querySelectorAll('table.highlight tbody tr');
+for (var i = 0; i < filas.length; i++) {
+    var m = (filas[i].getAttribute('onclick') || '').match(/Busca\\((\\d+)\\)/);
+    var check = filas[i].querySelector('input.check_listado');
+    if (!check) { continue; }
+    var id = String(m ? m[1] : (check.value || check.id));
+    if (ids.indexOf(id) === -1 || check.checked) { continue; }
+    var antes = rojos();
+    check.click();
+    salida.push({id: id, marcado: check.checked, rojo: rojos() > antes, t: performance.now()});
+}
+return salida;
+"""
+
+TAMANO_RAFAGA = 10
+
+@trazas.paso()
+def seleccionar_en_rafagas(driver, filas, cupo):
+    """
+    Marca los checkboxes en ráfagas de TAMANO_RAFAGA, lee los toasts del buffer
+    y desmarca solo los duplicados. Si llegan toasts tardíos la ráfaga se
+    verifica de a un checkbox. Devuelve los IDs que quedaron seleccionados.
+    """
+    validos = []
+    cursor = 0
+    while cursor < len(filas) and len(validos) < cupo:
+        # La ráfaga se acorta cerca del cupo; el cursor avanza solo lo ofrecido
+        rafaga = filas[cursor:cursor + min(TAMANO_RAFAGA, cupo - len(validos))]
+        cursor += len(rafaga)
+
+        desde = toasts.marca(driver)
+        clics = driver.execute_script(JS_RAFAGA, [fila["id"] for fila in rafaga])
+        esperas.esperar_ajax(driver, esperas.SHORT_TIMEOUT)
+        errores = [t for t in toasts.esperar_quietud(driver, desde) if toasts.es_error(t)]
+
+        # Toasts sincrónicos: ya sabemos qué clic los causó. Son los primeros del
+        # buffer; el resto llegó después, con la respuesta del servidor, y su
+        # texto no dice de qué fila es.
+        sincronicos = [c["id"] for c in clics if c["rojo"]]
+        duplicados = set(sincronicos)
+        ambiguos = len(errores) - len(sincronicos)
+
+        if duplicados:
+            logging.warning(f"⚠ Finiquitos duplicados detectados en toast, deseleccionando: {sorted(duplicados)}")
+            tabla.desmarcar(driver, list(duplicados))
+
+        marcados = [c["id"] for c in clics if c["marcado"] and c["id"] not in duplicados]
+        if not ambiguos:
+            validos.extend(marcados)
+            logging.info(f"✅ Ráfaga de {len(clics)}: {len(marcados)} válidos (total {len(validos)})")
+            continue
+
+        # No se puede saber qué checkbox causó el toast: se revisan uno a uno
+        logging.info(f"ℹ {ambiguos} toasts sin dueño en la ráfaga, verificando uno a uno...")
+        tabla.desmarcar(driver, marcados)
+        for finiquito_id in marcados:
+            if len(validos) >= cupo:
+                break
+            desde = toasts.marca(driver)
+            tabla.marcar(driver, [finiquito_id])
+            esperas.esperar_ajax(driver, esperas.SHORT_TIMEOUT)
+            if any(toasts.es_error(t) for t in toasts.esperar_quietud(driver, desde)):
+                logging.warning(f"⚠ Finiquito duplicado detectado en toast (ID {finiquito_id}), deseleccionando...")
+                tabla.desmarcar(driver, [finiquito_id])
+            else:
+                validos.append(finiquito_id)
+                logging.info(f"✅ Checkbox {len(validos)} seleccionado válido (ID {finiquito_id})")
+    return validos
+
+@trazas.paso("login")
+def iniciar_sesion(driver):
+    """
+    Hace login en SIGO o reutiliza la sesión guardada.
+    """
+    # 1️⃣ Acceder a la página de inicio de sesión (o reutilizar la sesión guardada)
+    if almacen_sesion.restaurar(driver, "sigo", URL_SIGO, (By.ID, "enlace5")):
+        logging.info("♻️ Sesión restaurada, se omite el login.")
+    else:
+        driver.get(URL_SIGO)
+        logging.info("🔑 Accediendo a la página de inicio de sesión.")
+
+        usuario_input = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "user")))
+        password_input = driver.find_element(By.ID, "pass")
+
+        usuario_input.send_keys(USUARIO)
+        password_input.send_keys(PASSWORD)
+        logging.info("✅ Credenciales ingresadas correctamente.")
+
+        driver.find_element(By.ID, "btnLogn").click()
+        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, "enlace5")))
+        almacen_sesion.guardar(driver, "sigo")
+        logging.info("🎯 Inicio de sesión exitoso.")
+
+def entrar_a_solicitud_finiquitos(driver):
+    """
+    Abre la sección 'Solicitud de Finiquitos'.
+    """
     # 2️⃣ Acceder a la sección "Solicitud de Finiquitos"
     enlace_finiquitos = WebDriverWait(driver, 10).until(
         EC.element_to_be_clickable((By.ID, "enlace5"))
@@ -101,6 +171,11 @@ try:
     driver.execute_script("arguments[0].click();", enlace_finiquitos)
     logging.info("📂 Accediendo a 'Solicitud de Finiquitos'.")
 
+@trazas.paso()
+def seleccionar_empresa(driver):
+    """
+    Filtra por 'Empresa de Servicios Transitorios MVS SPA'.
+    """
     # 3️⃣ Seleccionar la empresa en el dropdown
     try:
         empresa_label = WebDriverWait(driver, 10).until(
@@ -117,8 +192,8 @@ try:
             EC.element_to_be_clickable((By.ID, "input_cliente"))
         )
         input_cliente.click()
-        time.sleep(2)
 
+        version = esperas.version_tabla(driver)
         empresa_opcion_xpath = "//ul[contains(@class, 'dropdown-content')]/li/span[text()='Empresa de Servicios Transitorios MVS SPA']"
 
         try:
@@ -132,14 +207,22 @@ try:
                 f"document.evaluate(\"{empresa_opcion_xpath}\", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue.click();"
             )
 
+        esperas.esperar_tabla_actualizada(driver, version, timeout=esperas.SHORT_TIMEOUT)
         logging.info("✅ Empresa seleccionada correctamente.")
+        return True
 
     except Exception as e:
         screenshot_path = os.path.join(os.getcwd(), "error_empresa.png")
         driver.save_screenshot(screenshot_path)
         error_details = traceback.format_exc()
         logging.error(f"❌ Error al seleccionar empresa: {str(e)}\n{error_details}")
+        return False
 
+@trazas.paso()
+def seleccionar_estado(driver):
+    """
+    Filtra por estado 'Enviado al representante'.
+    """
     # 4️⃣ Seleccionar el Estado
     try:
         estado_label = WebDriverWait(driver, 10).until(
@@ -158,6 +241,7 @@ try:
         input_estado.click()
         logging.info("✅ Se hizo clic en input_estado.")
 
+        version = esperas.version_tabla(driver)
         estado_opcion_xpath = "//ul[contains(@class, 'dropdown-content')]/li/span[text()='Enviado al representante']"
 
         try:
@@ -170,14 +254,21 @@ try:
                 f"document.evaluate(\"{estado_opcion_xpath}\", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue.click();"
             )
 
-        time.sleep(2)
-        
+        esperas.esperar_tabla_actualizada(driver, version, timeout=esperas.SHORT_TIMEOUT)
+        return True
+
     except Exception as e:
         screenshot_path = os.path.join(os.getcwd(), "error_estado.png")
         driver.save_screenshot(screenshot_path)
         error_details = traceback.format_exc()
         logging.error(f"❌ Error al seleccionar Estado: {str(e)}\n{error_details}")
+        return False
 
+@trazas.paso()
+def seleccionar_monto(driver):
+    """
+    Filtra por monto 0.
+    """
     # 5️⃣ Seleccionar Monto
     try:
         label_monto = WebDriverWait(driver, 10).until(
@@ -190,97 +281,65 @@ try:
         )
         monto_input.clear()
         monto_input.send_keys("0")
-        driver.execute_script("arguments[0].dispatchEvent(new Event('keyup'))", monto_input)
-        time.sleep(3)
-        
+        esperas.esperar_input_estable(driver, monto_input, "0")
+        esperas.tras_accion(
+            driver,
+            lambda: driver.execute_script("arguments[0].dispatchEvent(new Event('keyup'))", monto_input),
+        )
+        return True
+
     except Exception as e:
         screenshot_path = os.path.join(os.getcwd(), "error_monto.png")
         driver.save_screenshot(screenshot_path)
         error_details = traceback.format_exc()
         logging.error(f"❌ Error al seleccionar Monto: {str(e)}\n{error_details}")
-
+        return False
+
+def seleccionar_finiquitos(driver, registro, ya_exportados=frozenset(), maximo=100, paginador=None):
+    """
+    Selecciona hasta 'maximo' finiquitos válidos recorriendo las páginas desde
+    la actual. Devuelve la lista de IDs seleccionados; menos de 'maximo'
+    significa que se llegó al final de la tabla.
+    """
     # 6️⃣ Seleccionar checkboxes con manejo de notificaciones y paginación
+    seleccionados = []
     try:
-        logging.info("📌 Seleccionando hasta 100 finiquitos válidos...")
+        logging.info(f"📌 Seleccionando hasta {maximo} finiquitos válidos...")
         selected_count = 0
-        max_attempts = 5  # Máximo de intentos de paginación sin progreso
-
-        while selected_count < 100 and max_attempts > 0:
-            # Esperar a que la tabla se cargue
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "table.highlight"))
-            )
-
-            # Obtener checkboxes de la página actual
-            checkboxes = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "input.check_listado"))
-            )
-
-            logging.info(f"🔍 Encontrados {len(checkboxes)} checkboxes en la página actual.")
 
-            for checkbox in checkboxes:
-                if selected_count >= 100:
-                    break
-
-                try:
-                    if not checkbox.is_selected():
-                        # Seleccionar checkbox
-                        driver.execute_script("arguments[0].click();", checkbox)
-
-                        # Esperar y verificar si aparece el mensaje toast de error
-                        try:
-                            toast_error = WebDriverWait(driver, 2).until(
-                                EC.visibility_of_element_located((By.CSS_SELECTOR, "div.toast.red.darken-2"))
-                            )
-                            if toast_error:
-                                logging.warning("⚠ Finiquito duplicado detectado en toast, deseleccionando...")
-                                driver.execute_script("arguments[0].click();", checkbox)  # Deseleccionar
-                                continue  # No contar este checkbox
+        # Esperar a que la tabla se cargue
+        WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "table.highlight"))
+        )
+        paginador = paginador or paginacion.Paginador(driver)
 
-                        except:
-                            # Si no hay toast, el checkbox es válido
-                            selected_count += 1
-                            logging.info(f"✅ Checkbox {selected_count} seleccionado válido")
+        while selected_count < maximo:
+            # Foto de la página actual en una sola llamada
+            filas = [
+                fila for fila in tabla.snapshot(driver)
+                if fila["tiene_check"] and fila["id"] and not fila["seleccionado"] and fila["id"] not in ya_exportados
+            ]
 
-                        time.sleep(0.3)  # Espera corta para estabilidad
+            logging.info(f"🔍 Encontrados {len(filas)} checkboxes sin seleccionar en la página {paginador.actual}.")
 
-                except Exception as e:
-                    logging.warning(f"⚠ Error procesando checkbox: {str(e)}")
-                    continue
+            try:
+                nuevos = seleccionar_en_rafagas(driver, filas, maximo - selected_count)
+                registro.registrar_varios(nuevos, "SELECCIONADO")
+                seleccionados.extend(nuevos)
+                selected_count = len(seleccionados)
+            except Exception as e:
+                logging.warning(f"⚠ Error procesando checkboxes: {str(e)}")
 
             logging.info(f"📄 Página procesada - Total seleccionados: {selected_count}")
+            if selected_count >= maximo:
+                # El cursor queda en esta página: puede tener filas para el siguiente lote
+                break
 
-            # Intentar pasar a la siguiente página numérica (sin chevron)
-            try:
-                current_page_element = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, "//li[contains(@class, 'active indigo darken-1')]/a"))
-                )
-                current_page = int(current_page_element.text.strip())
-                logging.info(f"📄 Página actual: {current_page}")
-
-                # Buscar el botón de la siguiente página
-                next_page_xpath = f"//li[contains(@class, 'indigo darken-1')]/a[contains(text(), '{current_page + 1}')]"
-                next_page_btn = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, next_page_xpath))
-                )
-
-                if next_page_btn:
-                    driver.execute_script("arguments[0].click();", next_page_btn)
-                    logging.info(f"➡️ Avanzando a la página {current_page + 1}")
-
-                    WebDriverWait(driver, 10).until(
-                        lambda d: int(d.find_element(By.XPATH, "//li[contains(@class, 'active indigo darken-1')]/a").text.strip()) == current_page + 1
-                    )
-                    time.sleep(2)  # Espera adicional para estabilidad
-
-                else:
-                    logging.info("➡️ No hay más páginas disponibles o ya estamos en la última página.")
+            with trazas.span("avance_pagina", item=paginador.actual + 1):
+                if not paginador.siguiente():
+                    logging.info(f"➡️ Fin de la tabla en la página {paginador.actual}.")
                     break
-
-            except Exception as e:
-                max_attempts -= 1
-                logging.warning(f"⚠ Error navegando a la siguiente página. Intentos restantes: {max_attempts}")
-                time.sleep(2)
+            logging.info(f"➡️ Página {paginador.actual}")
 
         logging.info(f"✅ Total final de checkboxes seleccionados: {selected_count}")
 
@@ -289,32 +348,230 @@ try:
         driver.save_screenshot(screenshot_path)
         error_details = traceback.format_exc()
         logging.error(f"❌ Error crítico en selección de checkboxes: {str(e)}\n{error_details}")
-
-
+        if isinstance(e, paginacion.ErrorPaginacion):
+            # No se sabe si quedan filas: no cortar la exportación como si la tabla se hubiera agotado
+            raise
+
+    return seleccionados
+
+@trazas.paso()
+def descargar_carga_masiva(driver, registro, seleccionados, nombre=None):
+    """
+    Descarga la CARGA MASIVA DT y la normaliza. Devuelve la ruta del CSV o None.
+    Con 'nombre' el archivo queda con ese nombre en la carpeta de descargas.
+    """
     # 7️⃣ Descargar archivo
     try:
+        # Carpeta exclusiva para esta descarga: así no se confunde con archivos viejos
+        carpeta_descarga = descargas.preparar_directorio(download_folder)
+        descargas.dirigir_descargas(driver, carpeta_descarga)
+
         descarga_btn = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.LINK_TEXT, "CARGA MASIVA DT"))
         )
         driver.execute_script("arguments[0].click();", descarga_btn)
         logging.info("📥 Descarga iniciada...")
 
-        time.sleep(5)  # Esperar la descarga (puedes ajustar el tiempo según sea necesario)
+        # Esperar a que Chrome termine de escribir el archivo
+        descargado = descargas.mover_a(descargas.esperar_descarga(carpeta_descarga), download_folder, nombre)
 
-        # 🔄 Convertir el archivo descargado de .xlsx a .csv
-        nuevo_csv = convertir_csv_utf8_a_csv()
+        # 🔄 Normalizar el archivo descargado
+        nuevo_csv = convertir_csv_utf8_a_csv(descargado)
         if nuevo_csv:
+            registro.registrar_varios(seleccionados, "EXPORTADO", detalle=os.path.basename(nuevo_csv))
             logging.info(f"✅ Archivo CSV final para carga: {nuevo_csv}")
         else:
             logging.error("❌ No se pudo convertir el archivo correctamente.")
+        return nuevo_csv
 
     except Exception as e:
         screenshot_path = os.path.join(os.getcwd(), "error_descarga.png")
         driver.save_screenshot(screenshot_path)
         error_details = traceback.format_exc()
         logging.error(f"❌ Error al descargar archivo: {str(e)}\n{error_details}")
+        return None
+
+def exportar_carga_masiva(driver, registro, resume=False):
+    """
+    Aplica los filtros, selecciona hasta 100 finiquitos y descarga la CARGA
+    MASIVA DT. Devuelve (ruta_csv, ids_seleccionados); ruta_csv es None si
+    no hubo nada que exportar o falló la descarga.
+    """
+    entrar_a_solicitud_finiquitos(driver)
+    seleccionar_empresa(driver)
+    seleccionar_estado(driver)
+    seleccionar_monto(driver)
+
+    ya_exportados = registro.finalizados() if resume else frozenset()
+    seleccionados = seleccionar_finiquitos(driver, registro, ya_exportados)
+    if not seleccionados:
+        logging.info("ℹ No hay finiquitos para exportar.")
+        return None, []
+    return descargar_carga_masiva(driver, registro, seleccionados), seleccionados
+
+def nombre_lote(corrida, numero):
+    # Mantiene el prefijo "Informe DT #" que busca robot.obtener_csv_mas_reciente
+    return f"Informe DT #{corrida}-{numero:03d}.csv"
+
+def contar_filas(ruta):
+    with open(ruta, encoding=ENCODING_SALIDA, newline="") as f:
+        return max(0, sum(1 for fila in csv.reader(f) if any(c.strip() for c in fila)) - 1)
+
+def escribir_manifiesto(ruta, manifiesto):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+
+def limpiar_seleccion(driver, paginador, desde):
+    """
+    Desmarca lo seleccionado en las páginas que recorrió el lote (de 'desde'
+    hasta la actual) y confirma que no quedó nada marcado. Termina en la
+    página donde estaba el cursor. Devuelve False si algo sigue marcado.
+    """
+    hasta = paginador.actual
+    for numero in range(desde, hasta + 1):
+        if not paginador.ir_a(numero):
+            logging.error(f"❌ No se pudo volver a la página {numero} para limpiar la selección.")
+            return False
+        marcados = [fila["id"] for fila in tabla.snapshot(driver) if fila["seleccionado"]]
+        if not marcados:
+            continue
+        tabla.desmarcar(driver, marcados)
+        quedan = [fila["id"] for fila in tabla.snapshot(driver) if fila["seleccionado"]]
+        if quedan:
+            logging.error(f"❌ Siguen marcados {len(quedan)} IDs en la página {numero}: {quedan[:5]}")
+            return False
+    return True
+
+def apartar_lote(registro, lote, ruta_csv):
+    """
+    Deja fuera de carga un CSV con filas de más: se renombra a '.rechazado'
+    (robot.obtener_csv_mas_reciente solo toma '.csv') y sus IDs dejan de
+    estar EXPORTADO para que --resume los vuelva a seleccionar.
+    """
+    rechazado = ruta_csv + ".rechazado"
+    os.replace(ruta_csv, rechazado)
+    registro.registrar_varios(lote["ids"], "SELECCION_NO_LIMPIADA", detalle=os.path.basename(rechazado))
+    lote.update(archivo=os.path.basename(rechazado), rechazado=True)
+    logging.warning(f"🚫 {os.path.basename(rechazado)} apartado; sus {len(lote['ids'])} IDs quedan pendientes.")
+
+def exportar_lotes(driver, registro, lotes, resume=False, tamano=100):
+    """
+    Exporta hasta 'lotes' CSV de 'tamano' finiquitos en la misma sesión, sin
+    volver a la página 1 entre lotes. Cada archivo se llama
+    'Informe DT #<corrida>-<n>.csv' y queda listado en manifiesto_<corrida>.json.
+    Devuelve el manifiesto.
+    """
+    corrida = datetime.now().strftime("%Y%m%d-%H%M%S")
+    ruta_manifiesto = os.path.join(download_folder, f"manifiesto_{corrida}.json")
+    manifiesto = {
+        "corrida": corrida,
+        "inicio": datetime.now().isoformat(timespec="seconds"),
+        "lotes_pedidos": lotes,
+        "tamano_lote": tamano,
+        "estado": "EN_CURSO",
+        "lotes": [],
+    }
+    os.makedirs(download_folder, exist_ok=True)
+    escribir_manifiesto(ruta_manifiesto, manifiesto)
+
+    entrar_a_solicitud_finiquitos(driver)
+    seleccionar_empresa(driver)
+    seleccionar_estado(driver)
+    seleccionar_monto(driver)
+
+    # Los IDs exportados siguen en la tabla hasta que se marquen en SIGO
+    ya_exportados = set(registro.finalizados()) if resume else set()
+    # Un solo cursor para toda la corrida: cada lote sigue donde quedó el anterior
+    paginador = None
+    for numero in range(1, lotes + 1):
+        try:
+            paginador = paginador or paginacion.Paginador(driver)
+            desde = paginador.actual
+            seleccionados = seleccionar_finiquitos(driver, registro, ya_exportados, tamano, paginador)
+        except paginacion.ErrorPaginacion as e:
+            logging.error(f"❌ {str(e)}")
+            manifiesto["estado"] = "ERROR_PAGINACION"
+            break
+        if not seleccionados:
+            manifiesto["estado"] = "TABLA_AGOTADA"
+            break
+
+        ruta_csv = descargar_carga_masiva(driver, registro, seleccionados, nombre_lote(corrida, numero))
+        if not ruta_csv:
+            manifiesto["estado"] = "ERROR_DESCARGA"
+            break
+
+        filas = contar_filas(ruta_csv)
+        ya_exportados.update(seleccionados)
+        manifiesto["lotes"].append({
+            "lote": numero,
+            "archivo": os.path.basename(ruta_csv),
+            "filas": filas,
+            "ids": seleccionados,
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+        })
+        escribir_manifiesto(ruta_manifiesto, manifiesto)
+        logging.info(f"📦 Lote {numero}/{lotes}: {filas} filas en {os.path.basename(ruta_csv)}")
+
+        if filas != len(seleccionados):
+            # SIGO no limpió la selección anterior: el siguiente lote repetiría filas
+            logging.error(f"❌ El lote {numero} trae {filas} filas para {len(seleccionados)} IDs seleccionados.")
+            apartar_lote(registro, manifiesto["lotes"][-1], ruta_csv)
+            escribir_manifiesto(ruta_manifiesto, manifiesto)
+            manifiesto["estado"] = "SELECCION_NO_LIMPIADA"
+            break
+        if len(seleccionados) < tamano:
+            manifiesto["estado"] = "TABLA_AGOTADA"
+            break
+        try:
+            limpia = limpiar_seleccion(driver, paginador, desde)
+        except paginacion.ErrorPaginacion as e:
+            logging.error(f"❌ {str(e)}")
+            manifiesto["estado"] = "ERROR_PAGINACION"
+            break
+        if not limpia:
+            # El siguiente lote arrastraría filas de este
+            manifiesto["estado"] = "SELECCION_NO_LIMPIADA"
+            break
+    else:
+        manifiesto["estado"] = "COMPLETO"
+
+    manifiesto["fin"] = datetime.now().isoformat(timespec="seconds")
+    escribir_manifiesto(ruta_manifiesto, manifiesto)
+    logging.info(f"🗂 Manifiesto {ruta_manifiesto}: {len(manifiesto['lotes'])} lotes, estado {manifiesto['estado']}.")
+    return manifiesto
+
+def main():
+    parser = argparse.ArgumentParser(description="Selecciona finiquitos de a 100 y descarga la CARGA MASIVA DT.")
+    parser.add_argument("--resume", action="store_true",
+                        help="No volver a seleccionar IDs que la bitácora ya tiene como exportados.")
+    parser.add_argument("--lotes", type=int, default=1,
+                        help="Cantidad de CSV de 100 a exportar en la misma sesión.")
+    args = parser.parse_args()
+
+    trazas.configurar("sigo")
+
+    # Bitácora de IDs seleccionados/exportados
+    registro = Bitacora("sigo")
+
+    # Crear Chrome con descargas automáticas (perfil ligero con BOT_DT_LIGERO=1)
+    driver = crear_driver(download_dir=download_folder)
+
+    try:
+        logging.info("🚀 Iniciando script de automatización...")
+        iniciar_sesion(driver)
+        if args.lotes > 1:
+            exportar_lotes(driver, registro, args.lotes, resume=args.resume)
+        else:
+            exportar_carga_masiva(driver, registro, resume=args.resume)
 
+    finally:
+        registro.cerrar()
+        driver.quit()
+        logging.info("🏁 Script finalizado y navegador cerrado.")
+        trazas.imprimir_resumen()
 
-finally:
-    driver.quit()
-    logging.info("🏁 Script finalizado y navegador cerrado.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
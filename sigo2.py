@@ -3,16 +3,25 @@ import os
 import time
 import traceback
 import csv
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from dotenv import load_dotenv
+import esperas
+from navegador import crear_driver
+import almacen_sesion
+import toasts
+import reintentos
+import trazas
+import entradas
+from bitacora import Bitacora
 
 # Timeouts estándar
 SHORT_TIMEOUT = 5
@@ -21,11 +30,22 @@ LONG_TIMEOUT = 15
 # Reintentos estándar
 MAX_REINTENTOS_BOTON = 5
 MAX_REINTENTOS_GLOBAL = 5
+MAX_REINTENTOS_SESION = 2
+
+# Tope de la espera del toast cuando SIGO está lento (ver reintentos.LATENCIA_SIGO)
+TIMEOUT_TOAST_MAXIMO = 20
+
+# Registro unificado de resultados por ID
+RESULTADOS_CSV = "sigo_subido_resultados.csv"
 
 # Cargar variables de entorno y credenciales
 load_dotenv()
 USUARIO = os.getenv("MVS_SIGO_USER")
 PASSWORD = os.getenv("MVS_SIGO_PASS")
+URL_SIGO = os.getenv("SIGO_URL", "http://35.184.233.114/MVS_SIGO/")
+
+# Tope de sesiones paralelas para no saturar el servidor SIGO
+MAX_SESIONES = int(os.getenv("SIGO_MAX_SESIONES", "4"))
 
 # Configurar logging
 log_file = "sigo_subido.log"
@@ -36,7 +56,7 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 
-# Lista de IDs a procesar
+# Lista de IDs a procesar si no se pasa --entrada
 FINIQUITO_IDS = [
 
 ]
@@ -44,16 +64,23 @@ FINIQUITO_IDS = [
 ###############################
 # FUNCIONES AUXILIARES
 ###############################
-def iniciar_sesion(driver):
+@trazas.paso("login")
+def iniciar_sesion(driver, nombre_sesion="sigo"):
     """
-    Entra al sitio y hace login con las credenciales.
+    Entra al sitio y hace login con las credenciales, salvo que haya una
+    sesión guardada que siga viva.
     """
-    driver.get("http://35.184.233.114/MVS_SIGO/")
+    if almacen_sesion.restaurar(driver, nombre_sesion, URL_SIGO, (By.ID, "enlace5")):
+        logging.info("Sesión restaurada desde caché.")
+        return
+
+    driver.get(URL_SIGO)
     WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "user")))
     driver.find_element(By.ID, "user").send_keys(USUARIO)
     driver.find_element(By.ID, "pass").send_keys(PASSWORD)
     driver.find_element(By.ID, "btnLogn").click()
     WebDriverWait(driver, 20).until(EC.element_to_be_clickable((By.ID, "enlace5")))
+    almacen_sesion.guardar(driver, nombre_sesion)
     logging.info("Sesión iniciada correctamente.")
 
 def entrar_a_solicitud_finiquitos(driver):
@@ -66,10 +93,14 @@ def entrar_a_solicitud_finiquitos(driver):
     driver.execute_script("arguments[0].click();", enlace_finiquitos)
     logging.info("Entrando a 'Solicitud de Finiquitos'...")
 
+@trazas.paso(item=1)
 def filtrar_por_id(driver, finiquito_id):
     """
-    Activa el filtro por ID, escribe el ID y presiona ENTER.
+    Activa el filtro por ID, escribe el ID y presiona ENTER. Devuelve
+    "ENCONTRADO", "NO_ENCONTRADO" (la tabla se re-renderizó sin la fila) o
+    "TIMEOUT" (SIGO no respondió a tiempo: cuenta como fallo del servidor).
     """
+    fila_xpath = f"//tr[contains(@onclick, 'solicitudes.Busca({finiquito_id})')]"
     label_id = WebDriverWait(driver, 5).until(
         EC.element_to_be_clickable((By.ID, "label_id"))
     )
@@ -80,17 +111,28 @@ def filtrar_por_id(driver, finiquito_id):
     )
     input_id.clear()
     input_id.send_keys(str(finiquito_id))
-    time.sleep(2)
+    esperas.esperar_input_estable(driver, input_id, finiquito_id)
+    version = esperas.version_tabla(driver)
     input_id.send_keys(Keys.ENTER)  # Simular la tecla ENTER
 
-    # Esperar a que la fila del ID esté presente en la tabla
+    # Esperar a que la fila del ID esté presente en la tabla (más si SIGO viene lento)
+    timeout = reintentos.LATENCIA_SIGO.timeout(SHORT_TIMEOUT, TIMEOUT_TOAST_MAXIMO)
     try:
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.XPATH, f"//tr[contains(@onclick, 'solicitudes.Busca({finiquito_id})')]"))
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, fila_xpath))
         )
+        reintentos.CIRCUITO_SIGO.exito()
+        return "ENCONTRADO"
     except TimeoutException:
-        logging.warning(f"La tabla no mostró el ID {finiquito_id} tras filtrar.")
-
+        pass
+
+    estado = esperas.estado_pagina(driver)
+    if estado["version"] > version and estado["pendientes"] <= 0:
+        logging.warning(f"La tabla filtrada no contiene el ID {finiquito_id}.")
+        return "NO_ENCONTRADO"
+    logging.warning(f"La tabla no respondió al filtrar el ID {finiquito_id} en {timeout:.1f}s.")
+    reintentos.CIRCUITO_SIGO.fallo()
+    return "TIMEOUT"
     
 def verificar_avanza_pago(driver):
     """
@@ -111,28 +153,32 @@ def verificar_avanza_pago(driver):
         logging.warning(f"Error al verificar botón: {str(e)}")
         return False
     
+@trazas.paso(item=1)
 def entrar_detalle_finiquito(driver, finiquito_id):
     """
     Añadir espera para confirmar que el modal se cargó completamente.
     """
     fila_xpath = f"//tr[contains(@onclick, 'solicitudes.Busca({finiquito_id})')]"
+    timeout = reintentos.LATENCIA_SIGO.timeout(SHORT_TIMEOUT, TIMEOUT_TOAST_MAXIMO)
     try:
         # Hacer clic en la fila
-        fila_element = WebDriverWait(driver, 5).until(
+        fila_element = WebDriverWait(driver, timeout).until(
             EC.element_to_be_clickable((By.XPATH, fila_xpath))
         )
         fila_element.click()
         
         # Esperar a que el modal esté completamente cargado
-        WebDriverWait(driver, 5).until(
+        WebDriverWait(driver, timeout).until(
             EC.visibility_of_element_located((By.ID, "btnrgt4"))  # Usar elemento del modal
         )
         logging.info(f"Modal del ID {finiquito_id} cargado correctamente.")
         return True
     except TimeoutException:
         logging.warning(f"Modal no se cargó para ID {finiquito_id}.")
+        reintentos.CIRCUITO_SIGO.fallo()
         return False
     
+@trazas.paso()
 def presionar_subido_dt_reintentos(driver, max_intentos=5):
     """
     Intenta presionar el botón 'Subido al portal DT' hasta 'max_intentos' veces
@@ -145,13 +191,17 @@ def presionar_subido_dt_reintentos(driver, max_intentos=5):
     # 1) Ver si está el botón 'Avanzar a pago'
     if verificar_avanza_pago(driver):
         logging.info("El botón 'Avanzar a pago' está presente => se omite este finiquito (SKIP).")
-        refrescar_y_volver(driver)
+        restablecer_estado(driver)
         return "SKIP"
 
     # 2) Intentar ubicar y presionar #btnrgt4
     xpath_subido = "//div[@id='btnrgt4' and normalize-space(text())='Subido al portal DT']"
 
     for intento in range(1, max_intentos + 1):
+        if intento > 1:
+            # Backoff exponencial con jitter (crece con la latencia de SIGO)
+            reintentos.POLITICA_SIGO.dormir(intento - 1)
+        reintentos.CIRCUITO_SIGO.esperar()
         logging.info(f"[Reintento {intento}/{max_intentos}] Presionando 'Subido al portal DT'...")
 
         try:
@@ -162,136 +212,356 @@ def presionar_subido_dt_reintentos(driver, max_intentos=5):
             logging.warning("No se encontró el botón 'Subido al portal DT' (#btnrgt4).")
             return "NO_BUTTON"
 
+        desde = toasts.marca(driver)
+        inicio = time.monotonic()
         subido_btn.click()
         logging.info("Se hizo clic en 'Subido al portal DT'.")
 
         # Esperar toast
-        toast_text = esperar_y_leer_toast(driver)
+        toast_text = esperar_y_leer_toast(driver, desde)
         if not toast_text:
             logging.warning("No apareció ningún toast tras el clic. Reintentando...")
-            time.sleep(1)
+            reintentos.CIRCUITO_SIGO.fallo()
             continue
+        reintentos.LATENCIA_SIGO.observar(time.monotonic() - inicio)
 
         toast_lower = toast_text.lower()
         if "datos guardados" in toast_lower:
+            reintentos.CIRCUITO_SIGO.exito()
             return "DATOS_GUARDADOS"
         elif "finiquito sin firma generado" in toast_lower:
+            # Respuesta de negocio: el servidor está sano
+            reintentos.CIRCUITO_SIGO.exito()
             return "SIN_FIRMA"
         else:
             logging.warning(f"Toast inesperado: '{toast_text}'. Reintento...")
-            time.sleep(1)
+            reintentos.CIRCUITO_SIGO.fallo()
             continue
 
     return "OTRO_ERROR"
 
 
-def esperar_y_leer_toast(driver):
+@trazas.paso("espera_toast")
+def esperar_y_leer_toast(driver, desde):
     """
-    Espera hasta 5s a que aparezca un toast dentro de #toast-container .toast.
-    Devuelve el texto del toast o None si no aparece.
+    Espera a que el buffer de toasts registre uno posterior a 'desde' (ver
+    toasts.marca): 5s, o más si SIGO viene respondiendo lento. Devuelve el
+    texto del toast o None si no aparece.
     """
-    try:
-        toast_div = WebDriverWait(driver, 5).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, "#toast-container .toast"))
-        )
-        return toast_div.text.strip()
-    except TimeoutException:
-        return None
+    timeout = reintentos.LATENCIA_SIGO.timeout(SHORT_TIMEOUT, TIMEOUT_TOAST_MAXIMO)
+    toast = toasts.esperar_toast(driver, desde, timeout=timeout)
+    return toast["texto"] if toast else None
 
 def cerrar_modal(driver):
     """
-    Espera 5s a que desaparezca el botón Subido al portal DT (#btnrgt4) 
-    para confirmar el cierre del modal.
+    Cierra el modal de detalle (JS_CERRAR_MODALES) y confirma que el botón
+    Subido al portal DT (#btnrgt4) dejó de verse. Sin modal abierto no espera.
     """
+    if not driver.execute_script(JS_CERRAR_MODALES):
+        return
     try:
-        WebDriverWait(driver, 5).until_not(
+        WebDriverWait(driver, SHORT_TIMEOUT, poll_frequency=esperas.INTERVALO_SONDEO).until_not(
             EC.visibility_of_element_located((By.ID, "btnrgt4"))
         )
     except TimeoutException:
-        pass  # Si no cierra, no hay más que hacer
+        pass  # Si no cierra, restablecer_estado termina en refresco completo
 
+@trazas.paso()
 def refrescar_y_volver(driver):
     """
     Refresca la página y vuelve a 'Solicitud de Finiquitos'.
     """
     driver.refresh()
     entrar_a_solicitud_finiquitos(driver)
-    time.sleep(2)
-
-###############################
-# LÓGICA PRINCIPAL
-###############################
-def main():
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
+    WebDriverWait(driver, LONG_TIMEOUT).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "table.highlight"))
+    )
+    esperas.esperar_ajax(driver)
+
+# Cierra los modales abiertos de Materialize (v1 con M, v0 con jQuery)
+JS_CERRAR_MODALES = """
+var abiertos = document.querySelectorAll('.modal.open');
+for (var i = 0; i < abiertos.length; i++) {
+    var modal = abiertos[i];
+    if (window.M && M.Modal && M.Modal.getInstance(modal)) { M.Modal.getInstance(modal).close(); }
+    else if (window.jQuery && jQuery.fn.modal) { jQuery(modal).modal('close'); }
+}
+var overlays = document.querySelectorAll('.modal-overlay');
+for (var j = 0; j < overlays.length; j++) { overlays[j].click(); }
+return abiertos.length;
+"""
+
+# Chequeo de salud: tabla presente, filtro por ID disponible y sin modal/overlay encima
+JS_PAGINA_SANA = """
+var visible = function (el) { return !!el && el.offsetParent !== null; };
+var overlay = Array.prototype.some.call(document.querySelectorAll('.modal-overlay'), function (o) {
+    return getComputedStyle(o).display !== 'none' && getComputedStyle(o).opacity !== '0';
+});
+return !!document.querySelector('table.highlight')
+    && !!document.getElementById('label_id')
+    && !visible(document.getElementById('btnrgt4'))
+    && !overlay;
+"""
+
+def pagina_sana(driver):
     try:
-        # 1) Iniciar sesión y entrar a la página de Finiquitos
-        iniciar_sesion(driver)
-        entrar_a_solicitud_finiquitos(driver)
-
-        for finiquito_id in FINIQUITO_IDS:
-            try:
-                logging.info(f"=== Procesando ID: {finiquito_id} ===")
+        return bool(driver.execute_script(JS_PAGINA_SANA)) and esperas.esperar_ajax(driver, SHORT_TIMEOUT)
+    except Exception:
+        return False
 
-                max_reintentos_global = 5
-                for intento_global in range(1, max_reintentos_global + 1):
-                    logging.info(f"(ID {finiquito_id}) Intento global {intento_global}/{max_reintentos_global}")
+@trazas.paso()
+def restablecer_estado(driver):
+    """
+    Deja la tabla lista para el siguiente ID sin recargar: cierra el modal de
+    detalle, limpia #filtro_id y confirma que la página está sana. Solo si el
+    chequeo falla se hace el refresh completo (refrescar_y_volver).
+    """
+    try:
+        cerrar_modal(driver)
 
-                    # Filtrar por ID y entrar al detalle
-                    filtrar_por_id(driver, finiquito_id)
-                    if not entrar_detalle_finiquito(driver, finiquito_id):
-                        # No se halló la fila -> pasamos al siguiente ID
-                        break
+        input_id = driver.find_element(By.ID, "filtro_id")
+        if input_id.get_attribute("value"):
+            input_id.clear()
+            esperas.tras_accion(driver, lambda: input_id.send_keys(Keys.ENTER), timeout=SHORT_TIMEOUT)
+    except Exception as e:
+        logging.warning(f"No se pudo restablecer la tabla sin recargar: {str(e)}")
 
-                    # Presionar con reintentos
-                    resultado = presionar_subido_dt_reintentos(driver, max_intentos=5)
+    if not pagina_sana(driver):
+        logging.warning("La página quedó en mal estado => refresco completo.")
+        refrescar_y_volver(driver)
 
-                    if resultado == "SKIP":
-                        # 'Avanzar a pago' => no hace falta nada
-                        break  # pasa al siguiente ID
+###############################
+# LÓGICA PRINCIPAL
+###############################
+@trazas.paso(item=1)
+def procesar_finiquito(driver, finiquito_id):
+    """
+    Marca un ID como 'Subido al portal DT' con reintentos globales.
+    Devuelve (resultado, intentos_globales).
+    """
+    resultado = "TIMEOUT"
+    for intento_global in range(1, MAX_REINTENTOS_GLOBAL + 1):
+        if intento_global > 1:
+            reintentos.POLITICA_SIGO.dormir(intento_global - 1)
+        # Si SIGO está caído, toda la corrida espera aquí
+        reintentos.CIRCUITO_SIGO.esperar()
+        logging.info(f"(ID {finiquito_id}) Intento global {intento_global}/{MAX_REINTENTOS_GLOBAL}")
+
+        # Filtrar por ID y entrar al detalle
+        busqueda = filtrar_por_id(driver, finiquito_id)
+        if busqueda == "NO_ENCONTRADO":
+            # La tabla filtrada no tiene la fila -> pasamos al siguiente ID
+            return busqueda, intento_global
+        if busqueda == "TIMEOUT" or not entrar_detalle_finiquito(driver, finiquito_id):
+            # SIGO no respondió a tiempo: no es un NO_ENCONTRADO, se reintenta
+            resultado = "TIMEOUT"
+            restablecer_estado(driver)
+            continue
 
-                    elif resultado == "NO_BUTTON":
-                        logging.info("No hay botón 'Subido al portal DT'. Pasamos al siguiente ID.")
+        # Presionar con reintentos
+        resultado = presionar_subido_dt_reintentos(driver, max_intentos=MAX_REINTENTOS_BOTON)
+
+        if resultado == "SKIP":
+            # 'Avanzar a pago' => no hace falta nada
+            return resultado, intento_global
+
+        elif resultado == "NO_BUTTON":
+            logging.info("No hay botón 'Subido al portal DT'. Pasamos al siguiente ID.")
+            return resultado, intento_global
+
+        elif resultado == "DATOS_GUARDADOS":
+            logging.info("Éxito: 'Datos guardados'. Cerramos modal y limpiamos el filtro.")
+            restablecer_estado(driver)
+            return resultado, intento_global
+
+        elif resultado == "SIN_FIRMA":
+            logging.warning("Finiquito sin firma => reintentamos desde cero.")
+            restablecer_estado(driver)
+
+        else:  # "OTRO_ERROR"
+            logging.warning("Toast de error repetido o no se logró éxito => reintentamos globalmente.")
+            restablecer_estado(driver)
+
+    # Si completó los intentos globales sin éxito
+    logging.error(f"No se logró 'Datos guardados' para ID {finiquito_id} tras {MAX_REINTENTOS_GLOBAL} reintentos globales.")
+    return resultado, MAX_REINTENTOS_GLOBAL
+
+def fila_resultado(finiquito_id, resultado, intentos=0, worker=0, sesion=0):
+    return {
+        "id": finiquito_id,
+        "resultado": resultado,
+        "intentos": intentos,
+        "worker": worker,
+        "sesion": sesion,
+        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+def procesar_lote(finiquito_ids, worker=1):
+    """
+    Procesa una lista de IDs en una sola sesión de Chrome.
+    Si la sesión muere se abre otra (hasta MAX_REINTENTOS_SESION veces) y se
+    continúa con los IDs pendientes. Devuelve una lista de dicts por ID y
+    anota cada resultado en la bitácora apenas se conoce.
+    """
+    if multiprocessing.parent_process() is not None:
+        # Proceso del pool (--sesiones): cada worker escribe su propio .prom
+        trazas.configurar("sigo2", worker)
+    resultados = []
+    # Se consume a medida que avanza: la lista puede venir de un archivo grande
+    pendientes = iter(finiquito_ids)
+    en_curso = None  # tomado de 'pendientes' y todavía sin resultado
+    terminado = False
+    sesiones = 0
+    registro = Bitacora("sigo2")
+
+    def anotar(finiquito_id, resultado, intentos=0):
+        resultados.append(fila_resultado(finiquito_id, resultado, intentos, worker, sesiones))
+        registro.registrar(finiquito_id, resultado, intentos, detalle=f"W{worker}")
+
+    while not terminado and sesiones <= MAX_REINTENTOS_SESION:
+        sesiones += 1
+        driver = None
+        try:
+            driver = crear_driver()
+            # 1) Iniciar sesión y entrar a la página de Finiquitos
+            iniciar_sesion(driver, nombre_sesion=f"sigo_w{worker}")
+            entrar_a_solicitud_finiquitos(driver)
+
+            while True:
+                if en_curso is None:
+                    en_curso = next(pendientes, None)
+                    if en_curso is None:
+                        terminado = True
                         break
+                finiquito_id = en_curso
+                logging.info(f"=== [W{worker}] Procesando ID: {finiquito_id} ===")
+                try:
+                    resultado, intentos = procesar_finiquito(driver, finiquito_id)
+                except Exception as e_id:
+                    logging.error(f"Error con ID {finiquito_id}: {str(e_id)}")
+                    traceback.print_exc()
+                    resultado, intentos = "ERROR", 0
+                    # Si el navegador ya no responde, abrimos otra sesión
+                    if not sesion_viva(driver):
+                        raise
+
+                anotar(finiquito_id, resultado, intentos)
+                en_curso = None
+
+        except Exception as e:
+            logging.error(f"[W{worker}] Error general en sesión {sesiones}: {str(e)}")
+            traceback.print_exc()
+            if en_curso is not None:
+                # El ID en curso cuenta como error; se sigue con los demás
+                anotar(en_curso, "ERROR")
+                en_curso = None
+
+        finally:
+            if driver is not None:
+                driver.quit()
+                logging.info(f"[W{worker}] Navegador cerrado.")
+
+    for finiquito_id in itertools.chain([en_curso] if en_curso is not None else [], pendientes):
+        resultados.append(fila_resultado(finiquito_id, "SIN_PROCESAR", worker=worker, sesion=sesiones))
+    registro.cerrar()
+    # En los procesos del pool no corre atexit: el .prom se vuelca aquí
+    trazas.volcar_prometheus()
+    return resultados
+
+def sesion_viva(driver):
+    try:
+        driver.execute_script("return 1;")
+        return True
+    except Exception:
+        return False
 
-                    elif resultado == "DATOS_GUARDADOS":
-                        logging.info("Éxito: 'Datos guardados'. Cerramos modal y refrescamos.")
-                        cerrar_modal(driver)
-                        refrescar_y_volver(driver)
-                        break  # pasa al siguiente ID
-
-                    elif resultado == "SIN_FIRMA":
-                        logging.warning("Finiquito sin firma => reintentamos desde cero.")
-                        cerrar_modal(driver)
-                        refrescar_y_volver(driver)
-                        continue  # reintenta el mismo ID en el intento_global
-
-                    else:  # "OTRO_ERROR"
-                        logging.warning("Toast de error repetido o no se logró éxito => reintentamos globalmente.")
-                        cerrar_modal(driver)
-                        refrescar_y_volver(driver)
-                        continue  # reintenta el mismo ID en el intento_global
+def repartir_ids(finiquito_ids, n):
+    """
+    Reparte los IDs en 'n' tramos intercalados (0, n, 2n...), para que cada
+    sesión reciba una mezcla parecida de trabajo.
+    """
+    return [finiquito_ids[i::n] for i in range(n) if finiquito_ids[i::n]]
 
-                else:
-                    # Si completó los 5 intentos_global sin break => no logramos éxito
-                    logging.error(f"No se logró 'Datos guardados' para ID {finiquito_id} tras {max_reintentos_global} reintentos globales.")
+def ejecutar_en_paralelo(finiquito_ids, sesiones):
+    """
+    Reparte los IDs entre varias sesiones de Chrome en procesos separados,
+    limitadas por MAX_SESIONES, y devuelve los resultados en el orden original.
+    """
+    sesiones = max(1, min(sesiones, MAX_SESIONES, len(finiquito_ids)))
+    tramos = repartir_ids(finiquito_ids, sesiones)
+    logging.info(f"Repartiendo {len(finiquito_ids)} IDs en {len(tramos)} sesiones.")
+
+    resultados = []
+    with ProcessPoolExecutor(max_workers=len(tramos)) as executor:
+        futuros = {
+            executor.submit(procesar_lote, tramo, worker): (worker, tramo)
+            for worker, tramo in enumerate(tramos, start=1)
+        }
+        for futuro in as_completed(futuros):
+            worker, tramo = futuros[futuro]
+            try:
+                resultados.extend(futuro.result())
+            except Exception as e:
+                logging.error(f"[W{worker}] El proceso terminó con error: {str(e)}")
+                resultados.extend(fila_resultado(fid, "SIN_PROCESAR", worker=worker) for fid in tramo)
 
-            except Exception as e_id:
-                logging.error(f"Error con ID {finiquito_id}: {str(e_id)}")
-                traceback.print_exc()
-                # Continúa con siguiente ID
+    orden = {fid: i for i, fid in enumerate(finiquito_ids)}
+    resultados.sort(key=lambda r: orden.get(r["id"], len(orden)))
+    return resultados
 
-        logging.info("Proceso finalizado para todos los IDs.")
+def guardar_resultados(resultados, ruta=RESULTADOS_CSV):
+    """
+    Escribe el registro unificado de resultados (uno por ID) y un resumen en el log.
+    """
+    campos = ["id", "resultado", "intentos", "worker", "sesion", "fecha"]
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=campos)
+        writer.writeheader()
+        writer.writerows(resultados)
 
-    except Exception as e:
-        logging.error(f"Error general: {str(e)}")
-        traceback.print_exc()
+    resumen = {}
+    for r in resultados:
+        resumen[r["resultado"]] = resumen.get(r["resultado"], 0) + 1
+    logging.info(f"Resultados guardados en {ruta}: {resumen}")
 
-    finally:
-        driver.quit()
-        logging.info("Navegador cerrado.")
+def main():
+    parser = argparse.ArgumentParser(description="Marca finiquitos como 'Subido al portal DT' en SIGO.")
+    parser.add_argument("--sesiones", type=int, default=1,
+                        help=f"Sesiones de Chrome en paralelo (máximo {MAX_SESIONES}).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Omitir los IDs que la bitácora ya tiene como finalizados.")
+    parser.add_argument("--entrada",
+                        help="CSV, XLSX o texto con los IDs ('-' = stdin). Sin esto se usa FINIQUITO_IDS.")
+    parser.add_argument("--columna", help="Encabezado o número de columna con el ID (por defecto la primera).")
+    parser.add_argument("--hoja", help="Hoja del XLSX (por defecto la primera).")
+    args = parser.parse_args()
+    trazas.configurar("sigo2")
+
+    fuente = entradas.leer(args.entrada, args.columna, args.hoja) if args.entrada else FINIQUITO_IDS
+    finiquito_ids = entradas.sin_repetidos(fuente, clave=str)
+    if args.resume:
+        registro = Bitacora("sigo2")
+        finiquito_ids = entradas.omitir_finalizados(finiquito_ids, registro.finalizados(), "sigo2")
+        registro.cerrar()
+
+    primero = next(finiquito_ids, None)
+    if primero is None:
+        logging.info("No quedan IDs pendientes.")
+        return
+    finiquito_ids = itertools.chain([primero], finiquito_ids)
+    if args.sesiones > 1:
+        # Para repartir entre procesos hace falta la lista completa
+        finiquito_ids = list(finiquito_ids)
+
+    if args.sesiones > 1:
+        resultados = ejecutar_en_paralelo(finiquito_ids, args.sesiones)
+    else:
+        resultados = procesar_lote(finiquito_ids)
+
+    guardar_resultados(resultados)
+    logging.info("Proceso finalizado para todos los IDs.")
+    # Con --sesiones los pasos se midieron en otros procesos: se leen de la traza
+    trazas.imprimir_resumen(desde_traza=args.sesiones > 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,152 @@
+"""
+Datos de finiquitos y endpoints JSON de la réplica de SIGO (sitios_mock).
+
+Los endpoints (API_SOLICITUDES + accion) son el protocolo propio de la
+réplica, no el de SIGO, que no está documentado en este repositorio. Por eso
+los bots hablan con SIGO solo a través del navegador: no hay cliente HTTP
+directo.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import validacion
+
+PREFIJO = "/MVS_SIGO/"
+COOKIE_SESION = "PHPSESSID"
+POR_PAGINA = 10
+
+# Endpoint que llama el JS de la réplica; 'accion' elige la operación
+API_SOLICITUDES = "ajax/solicitudes.php"
+ACCION_LISTAR = "listar"
+ACCION_BUSCA = "busca"
+ACCION_SUBIDO_DT = "subidoDT"
+
+
+def generar_finiquitos(n=50, semilla=1):
+    """
+    Finiquitos de ejemplo: mezcla de tipos, estados y botones disponibles.
+    """
+    aleatorio = random.Random(semilla)
+    estados = ["Enviado al representante", "Firmado", "Subido al portal DT"]
+    finiquitos = {}
+    for i in range(1, n + 1):
+        finiquito_id = 1000 + i
+        cuerpo = str(10000000 + i * 7919 % 9000000)
+        estado = aleatorio.choice(estados)
+        if estado == "Firmado":
+            botones = ["subido_dt"]
+        elif estado == "Subido al portal DT":
+            botones = ["avanzar_pago"]
+        else:
+            botones = []
+        finiquitos[finiquito_id] = {
+            "id": finiquito_id,
+            "rut": f"{cuerpo}-{validacion.digito_verificador(cuerpo)}",
+            "tipo": aleatorio.choice(["DT", "NOTARIA"]),
+            "estado": estado,
+            "cliente": "Empresa de Servicios Transitorios MVS SPA",
+            "monto": aleatorio.choice([0, 150000, 320000]),
+            "fecha": f"2025-01-{(i % 28) + 1:02d}",
+            "firma": aleatorio.random() > 0.1,
+            "botones": botones,
+        }
+    return finiquitos
+
+
+class EstadoStub:
+    def __init__(self, finiquitos=None, latencia=0.0, tasa_error=0.0):
+        self.finiquitos = finiquitos if finiquitos is not None else generar_finiquitos()
+        self.latencia = latencia
+        self.tasa_error = tasa_error
+        self.lock = threading.Lock()
+        self.llamadas = 0
+
+
+class ManejadorStub(BaseHTTPRequestHandler):
+    estado = None  # EstadoStub, asignado en crear_servidor
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, codigo, cuerpo, cookie=None):
+        datos = json.dumps(cuerpo).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        if cookie:
+            self.send_header("Set-Cookie", f"{COOKIE_SESION}={cookie}; Path=/")
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _sesion_ok(self):
+        return f"{COOKIE_SESION}=" in (self.headers.get("Cookie") or "")
+
+    def _params(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if self.command == "POST":
+            largo = int(self.headers.get("Content-Length") or 0)
+            cuerpo = self.rfile.read(largo).decode("utf-8")
+            params.update({k: v[0] for k, v in parse_qs(cuerpo).items()})
+        return url.path, params
+
+    def _atender(self):
+        estado = self.estado
+        with estado.lock:
+            estado.llamadas += 1
+        if estado.latencia:
+            time.sleep(estado.latencia)
+
+        ruta, params = self._params()
+        if ruta == PREFIJO:
+            # Como PHP: la página de inicio abre la sesión
+            return self._responder(200, {"ok": True}, cookie="stub")
+        if ruta != PREFIJO + API_SOLICITUDES:
+            return self._responder(404, {"error": "no existe"})
+        if not self._sesion_ok():
+            return self._responder(401, {"error": "sin sesión"})
+        if estado.tasa_error and random.random() < estado.tasa_error:
+            return self._responder(500, {"error": "fallo inyectado"})
+
+        accion = params.get("accion")
+        if accion == ACCION_LISTAR:
+            return self._responder(200, self._listar(params))
+        if accion == ACCION_BUSCA:
+            fila = estado.finiquitos.get(int(params.get("id", 0)))
+            return self._responder(200, fila or {})
+        if accion == ACCION_SUBIDO_DT and self.command == "POST":
+            return self._responder(200, self._subido_dt(int(params.get("id", 0))))
+        return self._responder(400, {"error": f"acción desconocida: {accion}"})
+
+    def _listar(self, params):
+        filas = sorted(self.estado.finiquitos.values(), key=lambda f: f["fecha"], reverse=True)
+        for campo in ("id", "rut", "tipo", "estado", "cliente", "monto"):
+            if campo in params and params[campo] != "":
+                filas = [f for f in filas if str(f[campo]) == params[campo]]
+        por_pagina = int(params.get("por_pagina", POR_PAGINA))
+        pagina = int(params.get("pagina", 1))
+        paginas = max(1, -(-len(filas) // por_pagina))
+        inicio = (pagina - 1) * por_pagina
+        return {"filas": filas[inicio:inicio + por_pagina], "paginas": paginas, "total": len(filas)}
+
+    def _subido_dt(self, finiquito_id):
+        with self.estado.lock:
+            fila = self.estado.finiquitos.get(finiquito_id)
+            if not fila or "subido_dt" not in fila["botones"]:
+                return {"ok": False, "mensaje": "Acción no disponible"}
+            if not fila["firma"]:
+                return {"ok": False, "mensaje": "Finiquito sin firma generado"}
+            fila["estado"] = "Subido al portal DT"
+            fila["botones"] = ["avanzar_pago"]
+        return {"ok": True, "mensaje": "Datos guardados"}
+
+    def do_GET(self):
+        self._atender()
+
+    def do_POST(self):
+        self._atender()
+
@@ -0,0 +1,602 @@
+"""
+Réplica local de las páginas de SIGO y MiDT con los mismos ids, clases y
+flujos que usan los scripts, para medir y probar sin tocar los servidores reales.
+
+SIGO (PREFIJO):  login #user/#pass/#btnLogn, menú #enlace5, filtros label_*/
+                 filtro_*/input_*, table.highlight con input.check_listado,
+                 paginación li.active.indigo.darken-1, modal con #btnrgt4/#btnrgt6,
+                 toasts y descarga "CARGA MASIVA DT" (#DtBtn).
+MiDT (PREFIJO_MIDT): #nuevaSesion -> Clave Única (#uname/#pword/#login-submit)
+                 -> #btn-empleador -> ... -> label[for=file_upload] y resultado de la carga.
+
+Las llamadas XHR van a los endpoints JSON de sigo_stub (propios de la
+réplica, no los de SIGO), con latencia y fallos inyectables:
+
+    python sitios_mock.py --finiquitos 2000 --latencia 0.05 --tasa-error 0.02
+    SIGO_URL=http://127.0.0.1:8766/MVS_SIGO/ MIDT_URL=http://127.0.0.1:8766/midt/welcome python sigo2.py
+"""
+import argparse
+import csv
+import io
+import random
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer
+
+import sigo_stub
+from sigo_stub import PREFIJO, COOKIE_SESION, API_SOLICITUDES, ACCION_LISTAR, ACCION_BUSCA, ACCION_SUBIDO_DT
+
+PREFIJO_MIDT = "/midt/"
+COOKIE_MIDT = "MIDTSESSID"
+
+API_CARGA_MASIVA = "ajax/carga_masiva.php"
+ACCION_SELECCIONAR = "seleccionar"
+
+EMPRESA_MIDT = "76333204-7 EMPRESA DE SERVICIOS TRANSITORIOS MVS SPA"
+MOTIVOS_RECHAZO = (
+    "RUT del trabajador no válido",
+    "El finiquito ya fue ingresado",
+    "Fecha de término anterior a la fecha de inicio",
+)
+
+
+class EstadoMock(sigo_stub.EstadoStub):
+    """
+    Estado compartido de ambos sitios: finiquitos, sesiones abiertas,
+    selección de checkboxes por sesión y cargas recibidas en MiDT.
+    """
+
+    def __init__(self, finiquitos=None, latencia=0.0, tasa_error=0.0,
+                 tasa_duplicados=0.05, tasa_rechazo=0.0, latencia_carga=1.0, semilla=1):
+        super().__init__(finiquitos, latencia, tasa_error)
+        aleatorio = random.Random(semilla)
+        self.duplicados = {i for i in self.finiquitos if aleatorio.random() < tasa_duplicados}
+        self.tasa_rechazo = tasa_rechazo
+        self.latencia_carga = latencia_carga
+        self.sesiones = {}        # PHPSESSID -> set de IDs seleccionados
+        self.sesiones_midt = set()
+        self.cargas = []
+        self.exportaciones = 0
+
+
+class ManejadorMock(sigo_stub.ManejadorStub):
+    estado = None  # EstadoMock, asignado en crear_servidor
+
+    # ── Respuestas ──────────────────────────────────────────────────────────
+    def _cookie(self, nombre):
+        for parte in (self.headers.get("Cookie") or "").split(";"):
+            clave, _, valor = parte.strip().partition("=")
+            if clave == nombre:
+                return valor
+        return None
+
+    def _sesion_ok(self):
+        return self._cookie(COOKIE_SESION) in self.estado.sesiones
+
+    def _html(self, cuerpo, codigo=200):
+        datos = cuerpo.encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _redirigir(self, destino, cookie=None):
+        self.send_response(303)
+        self.send_header("Location", destino)
+        if cookie:
+            self.send_header("Set-Cookie", f"{cookie[0]}={cookie[1]}; Path=/")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    # ── Despacho ────────────────────────────────────────────────────────────
+    def _atender(self):
+        estado = self.estado
+        with estado.lock:
+            estado.llamadas += 1
+        if estado.latencia:
+            time.sleep(estado.latencia)
+
+        ruta, params = self._params()
+        if ruta.startswith(PREFIJO_MIDT):
+            return self._atender_midt(ruta[len(PREFIJO_MIDT):], params)
+
+        if ruta == PREFIJO:
+            return self._html(PAGINA_SIGO if self._sesion_ok() else LOGIN_SIGO)
+        if ruta == PREFIJO + "login" and self.command == "POST":
+            if not params.get("user") or not params.get("pass"):
+                return self._html(LOGIN_SIGO, 401)
+            sesion = uuid.uuid4().hex
+            with estado.lock:
+                estado.sesiones[sesion] = set()
+            return self._redirigir(PREFIJO, (COOKIE_SESION, sesion))
+        if ruta == PREFIJO + API_CARGA_MASIVA:
+            if not self._sesion_ok():
+                return self._responder(401, {"error": "sin sesión"})
+            return self._carga_masiva()
+        if ruta != PREFIJO + API_SOLICITUDES:
+            return self._responder(404, {"error": "no existe"})
+
+        if not self._sesion_ok():
+            return self._responder(401, {"error": "sin sesión"})
+        if estado.tasa_error and random.random() < estado.tasa_error:
+            return self._responder(500, {"error": "fallo inyectado"})
+
+        accion = params.get("accion")
+        if accion == ACCION_LISTAR:
+            return self._responder(200, self._listar_con_seleccion(params))
+        if accion == ACCION_BUSCA:
+            fila = estado.finiquitos.get(int(params.get("id", 0)))
+            return self._responder(200, fila or {})
+        if accion == ACCION_SUBIDO_DT and self.command == "POST":
+            return self._responder(200, self._subido_dt(int(params.get("id", 0))))
+        if accion == ACCION_SELECCIONAR and self.command == "POST":
+            return self._responder(200, self._seleccionar(int(params.get("id", 0)), params.get("marcado") == "1"))
+        return self._responder(400, {"error": f"acción desconocida: {accion}"})
+
+    # ── SIGO ────────────────────────────────────────────────────────────────
+    def _listar_con_seleccion(self, params):
+        datos = self._listar(params)
+        seleccion = self.estado.sesiones[self._cookie(COOKIE_SESION)]
+        datos["filas"] = [dict(f, seleccionado=f["id"] in seleccion) for f in datos["filas"]]
+        return datos
+
+    def _seleccionar(self, finiquito_id, marcado):
+        estado = self.estado
+        with estado.lock:
+            fila = estado.finiquitos.get(finiquito_id)
+            seleccion = estado.sesiones[self._cookie(COOKIE_SESION)]
+            if not fila:
+                return {"ok": False, "mensaje": "Finiquito no encontrado"}
+            if not marcado:
+                seleccion.discard(finiquito_id)
+                return {"ok": True}
+            seleccion.add(finiquito_id)
+            if finiquito_id in estado.duplicados:
+                # Igual que SIGO: avisa, pero deja el check puesto
+                return {"ok": False, "mensaje": f"Finiquito duplicado para el RUT {fila['rut']}"}
+        return {"ok": True}
+
+    def _carga_masiva(self):
+        estado = self.estado
+        with estado.lock:
+            seleccion = estado.sesiones[self._cookie(COOKIE_SESION)]
+            filas = [estado.finiquitos[i] for i in sorted(seleccion)]
+            seleccion.clear()
+            estado.exportaciones += 1
+            numero = estado.exportaciones
+
+        salida = io.StringIO()
+        escritor = csv.writer(salida, delimiter=";", lineterminator="\r\n")
+        escritor.writerow(["ID", "RUT", "TIPO", "ESTADO", "CLIENTE", "MONTO", "FECHA"])
+        for f in filas:
+            escritor.writerow([f["id"], f["rut"], f["tipo"], f["estado"], f["cliente"], f["monto"], f["fecha"]])
+        datos = b"\xef\xbb\xbf" + salida.getvalue().encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Content-Disposition", f'attachment; filename="Informe DT #{numero}.csv"')
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    # ── MiDT ────────────────────────────────────────────────────────────────
+    def _atender_midt(self, ruta, params):
+        estado = self.estado
+        logueado = self._cookie(COOKIE_MIDT) in estado.sesiones_midt
+
+        if ruta == "welcome":
+            return self._html(PAGINA_MIDT if logueado else BIENVENIDA_MIDT)
+        if ruta == "claveunica":
+            return self._html(CLAVE_UNICA)
+        if ruta == "login" and self.command == "POST":
+            if not params.get("uname") or not params.get("pword"):
+                return self._html(CLAVE_UNICA, 401)
+            sesion = uuid.uuid4().hex
+            with estado.lock:
+                estado.sesiones_midt.add(sesion)
+            return self._redirigir(PREFIJO_MIDT + "welcome", (COOKIE_MIDT, sesion))
+        if ruta == "api/carga" and self.command == "POST":
+            if not logueado:
+                return self._responder(401, {"error": "sin sesión"})
+            if estado.tasa_error and random.random() < estado.tasa_error:
+                return self._responder(500, {"error": "fallo inyectado"})
+            return self._responder(200, self._cargar(params))
+        return self._responder(404, {"error": "no existe"})
+
+    def _cargar(self, params):
+        estado = self.estado
+        texto = params.get("contenido", "").lstrip("\ufeff")
+        delimitador = ";" if texto.count(";") > texto.count(",") else ","
+        filas = list(csv.reader(io.StringIO(texto), delimiter=delimitador))[1:]
+
+        aceptados, rechazados = [], []
+        for numero, fila in enumerate(filas, start=2):
+            if not any(c.strip() for c in fila):
+                continue
+            registro = {"fila": numero, "id": fila[0], "rut": fila[1] if len(fila) > 1 else ""}
+            if estado.tasa_rechazo and random.random() < estado.tasa_rechazo:
+                registro["motivo"] = random.choice(MOTIVOS_RECHAZO)
+                rechazados.append(registro)
+            else:
+                aceptados.append(registro)
+
+        # MiDT procesa el archivo antes de responder
+        time.sleep(estado.latencia_carga)
+        with estado.lock:
+            estado.cargas.append({"archivo": params.get("nombre"), "aceptados": aceptados, "rechazados": rechazados})
+        return {"aceptados": aceptados, "rechazados": rechazados}
+
+
+def crear_servidor(puerto=0, estado=None):
+    """
+    Levanta ambos sitios en un hilo. Devuelve (servidor, url_sigo, url_midt);
+    cerrar con servidor.shutdown().
+    """
+    manejador = type("Manejador", (ManejadorMock,), {"estado": estado or EstadoMock()})
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    return servidor, base + PREFIJO, base + PREFIJO_MIDT + "welcome"
+
+
+###############################
+# PÁGINAS
+###############################
+ESTILO = """
+<style>
+  body { font-family: sans-serif; margin: 0; }
+  .oculto { display: none; }
+  .toast { padding: 8px 16px; margin: 4px; color: #fff; background: #323232; }
+  .toast.green { background: #2e7d32; }
+  .toast.red.darken-2 { background: #c62828; }
+  #toast-container { position: fixed; top: 10px; right: 10px; z-index: 1003; }
+  .modal { display: none; position: fixed; top: 10%; left: 20%; width: 60%; background: #fff; z-index: 1003; padding: 16px; }
+  .modal.open { display: block; }
+  .modal-overlay { display: none; position: fixed; inset: 0; background: #000; opacity: 0.5; z-index: 1002; }
+  .modal-overlay.open { display: block; }
+  .dropdown-content { list-style: none; padding: 0; margin: 0; border: 1px solid #ccc; background: #fff; }
+  .dropdown-content li span { display: block; padding: 4px 8px; cursor: pointer; }
+  .pagination li { display: inline-block; margin: 0 2px; }
+  .pagination li a { display: block; padding: 4px 8px; }
+  .btn { display: inline-block; padding: 8px 12px; margin: 4px; background: #3f51b5; color: #fff; cursor: pointer; }
+  table.highlight td, table.highlight th { padding: 4px 8px; border-bottom: 1px solid #eee; }
+</style>
+"""
+
+LOGIN_SIGO = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>MVS SIGO</title>""" + ESTILO + """</head>
+<body>
+  <form method="post" action="login">
+    <input id="user" name="user" type="text" placeholder="Usuario">
+    <input id="pass" name="pass" type="password" placeholder="Contraseña">
+    <button id="btnLogn" type="submit">Ingresar</button>
+  </form>
+</body></html>
+"""
+
+OPCIONES = {
+    "tipo": ["DT", "NOTARIA"],
+    "estado": ["Enviado al representante", "Firmado", "Subido al portal DT"],
+    "cliente": ["Empresa de Servicios Transitorios MVS SPA"],
+}
+
+
+def _dropdown(campo):
+    opciones = "".join(f"<li><span>{o}</span></li>" for o in [""] + OPCIONES[campo])
+    return f'<ul class="dropdown-content oculto" id="dropdown_{campo}" data-campo="{campo}">{opciones}</ul>'
+
+
+PAGINA_SIGO = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>MVS SIGO</title>""" + ESTILO + """</head>
+<body>
+  <nav><a id="enlace5" href="#" onclick="solicitudes.Abrir(); return false;">Solicitud de Finiquitos</a></nav>
+  <div id="toast-container"></div>
+
+  <section id="seccion_finiquitos" class="oculto">
+    <div class="filtros">
+      <span id="label_id" onclick="cambia('id')">ID</span>
+      <div id="input_id" class="oculto">
+        <input id="filtro_id" type="text" onkeydown="if (event.key === 'Enter') { filtrar('id', this.value); }">
+      </div>
+
+      <span id="label_rut" onclick="cambia('rut')">RUT</span>
+      <div id="input_rut" class="oculto">
+        <input id="filtro_rut" type="text" onkeyup="filtrar('rut', this.value)">
+      </div>
+
+      <span id="label_tipo" onclick="cambia('tipo')">TIPO FINIQUITO</span>
+      <div id="input_tipo" class="oculto">
+        <input id="filtro_tipo" type="text" readonly value="" onclick="abrir('tipo')">
+        """ + _dropdown("tipo") + """
+      </div>
+
+      <span id="label_estado" onclick="cambia('estado')">ESTADO</span>
+      <input id="input_estado" class="oculto" type="text" readonly value="" onclick="abrir('estado')">
+      """ + _dropdown("estado") + """
+
+      <span id="label_cliente" onclick="cambia('cliente')">EMPRESA CONTRATANTE</span>
+      <input id="input_cliente" class="oculto" type="text" readonly value="" onclick="abrir('cliente')">
+      """ + _dropdown("cliente") + """
+
+      <span id="label_monto" onclick="cambia('monto')">MONTO</span>
+      <div id="input_monto" class="oculto">
+        <input id="filtro_monto" type="text" onkeyup="filtrar('monto', this.value)">
+      </div>
+    </div>
+
+    <a href="#" onclick="solicitudes.CargaMasiva(); return false;">CARGA MASIVA DT</a>
+    <button id="DtBtn" type="button" onclick="solicitudes.CargaMasiva()">Carga Masiva DT</button>
+
+    <table class="highlight">
+      <thead><tr><th></th><th>ID</th><th>RUT</th><th>TIPO</th><th>ESTADO</th><th>CLIENTE</th><th>MONTO</th><th>FECHA</th></tr></thead>
+      <tbody></tbody>
+    </table>
+    <ul class="pagination" id="paginacion"></ul>
+  </section>
+
+  <div id="modal_detalle" class="modal"></div>
+  <div class="modal-overlay" onclick="solicitudes.Cerrar()"></div>
+
+<script>
+var API = 'ajax/solicitudes.php';
+var filtros = {id: '', rut: '', tipo: '', estado: '', cliente: '', monto: ''};
+
+function toast(texto, clases) {
+    var div = document.createElement('div');
+    div.className = 'toast ' + (clases || '');
+    div.textContent = texto;
+    document.getElementById('toast-container').appendChild(div);
+    setTimeout(function () { div.remove(); }, 4000);
+}
+
+function cambia(campo) {
+    var contenedor = document.getElementById('input_' + campo);
+    contenedor.classList.remove('oculto');
+}
+
+function abrir(campo) {
+    document.getElementById('dropdown_' + campo).classList.remove('oculto');
+}
+
+function filtrar(campo, valor) {
+    filtros[campo] = valor.trim();
+    solicitudes.Listar(1);
+}
+
+Array.prototype.forEach.call(document.querySelectorAll('.dropdown-content'), function (ul) {
+    ul.addEventListener('click', function (e) {
+        if (e.target.tagName !== 'SPAN') { return; }
+        var campo = ul.getAttribute('data-campo');
+        var destino = document.getElementById(campo === 'tipo' ? 'filtro_tipo' : 'input_' + campo);
+        destino.value = e.target.textContent;
+        ul.classList.add('oculto');
+        filtrar(campo, e.target.textContent);
+    });
+});
+
+var solicitudes = {
+    pagina: 1,
+    porPagina: 10,
+    paginas: 1,
+    secuencia: 0,
+
+    ajax: function (metodo, params, listo) {
+        var cuerpo = Object.keys(params).map(function (k) {
+            return encodeURIComponent(k) + '=' + encodeURIComponent(params[k]);
+        }).join('&');
+        var xhr = new XMLHttpRequest();
+        xhr.open(metodo, API + (metodo === 'GET' ? '?' + cuerpo : ''));
+        if (metodo === 'POST') { xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded'); }
+        xhr.onload = function () {
+            if (xhr.status !== 200) { toast('Error de comunicación con el servidor', 'red darken-2'); return; }
+            listo(JSON.parse(xhr.responseText));
+        };
+        xhr.onerror = function () { toast('Error de comunicación con el servidor', 'red darken-2'); };
+        xhr.send(metodo === 'POST' ? cuerpo : null);
+    },
+
+    Abrir: function () {
+        document.getElementById('seccion_finiquitos').classList.remove('oculto');
+        solicitudes.Listar(1);
+    },
+
+    Listar: function (pagina) {
+        var params = {accion: 'listar', pagina: pagina, por_pagina: solicitudes.porPagina};
+        Object.keys(filtros).forEach(function (k) { if (filtros[k] !== '') { params[k] = filtros[k]; } });
+        var secuencia = ++solicitudes.secuencia;
+        solicitudes.ajax('GET', params, function (datos) {
+            // Respuestas de filtros anteriores llegan tarde: se descartan
+            if (secuencia !== solicitudes.secuencia) { return; }
+            solicitudes.pagina = pagina;
+            solicitudes.paginas = datos.paginas;
+            solicitudes.Pintar(datos.filas);
+        });
+    },
+
+    Pintar: function (filas) {
+        var html = '';
+        filas.forEach(function (f) {
+            html += '<tr onclick="solicitudes.Busca(' + f.id + ')">'
+                + '<td><input type="checkbox" class="check_listado" value="' + f.id + '"'
+                + (f.seleccionado ? ' checked' : '') + ' onclick="solicitudes.Seleccionar(this, event)"></td>'
+                + '<td>' + f.id + '</td><td>' + f.rut + '</td><td>' + f.tipo + '</td><td>' + f.estado + '</td>'
+                + '<td>' + f.cliente + '</td><td>' + f.monto + '</td><td>' + f.fecha + '</td></tr>';
+        });
+        document.querySelector('table.highlight tbody').innerHTML = html;
+
+        var desde = Math.max(1, solicitudes.pagina - 4);
+        var hasta = Math.min(solicitudes.paginas, desde + 9);
+        var paginas = '';
+        for (var p = desde; p <= hasta; p++) {
+            paginas += '<li class="' + (p === solicitudes.pagina ? 'active ' : 'waves-effect ') + 'indigo darken-1">'
+                + '<a href="#!" onclick="solicitudes.Listar(' + p + '); return false;">' + p + '</a></li>';
+        }
+        document.getElementById('paginacion').innerHTML = paginas;
+    },
+
+    Seleccionar: function (check, evento) {
+        evento.stopPropagation();
+        solicitudes.ajax('POST', {accion: 'seleccionar', id: check.value, marcado: check.checked ? 1 : 0}, function (r) {
+            if (!r.ok) { toast(r.mensaje, 'red darken-2'); }
+        });
+    },
+
+    Busca: function (id) {
+        solicitudes.ajax('GET', {accion: 'busca', id: id}, function (f) {
+            var html = '<h5>Finiquito ' + f.id + '</h5><p>' + f.rut + ' - ' + f.estado + '</p>';
+            if (f.botones.indexOf('subido_dt') !== -1) {
+                html += '<div id="btnrgt4" class="btn" onclick="solicitudes.SubidoDT(' + f.id + ')">Subido al portal DT</div>';
+            }
+            if (f.botones.indexOf('avanzar_pago') !== -1) {
+                html += '<div id="btnrgt6" class="btn">Avanzar a pago</div>';
+            }
+            document.getElementById('modal_detalle').innerHTML = html;
+            document.getElementById('modal_detalle').classList.add('open');
+            document.querySelector('.modal-overlay').classList.add('open');
+        });
+    },
+
+    Cerrar: function () {
+        document.getElementById('modal_detalle').classList.remove('open');
+        document.getElementById('modal_detalle').innerHTML = '';
+        document.querySelector('.modal-overlay').classList.remove('open');
+    },
+
+    SubidoDT: function (id) {
+        solicitudes.ajax('POST', {accion: 'subidoDT', id: id}, function (r) {
+            if (r.ok) {
+                toast(r.mensaje, 'green');
+                solicitudes.Cerrar();
+                solicitudes.Listar(solicitudes.pagina);
+            } else {
+                toast(r.mensaje, 'red darken-2');
+            }
+        });
+    },
+
+    CargaMasiva: function () {
+        window.location.href = '""" + API_CARGA_MASIVA + """';
+    }
+};
+</script>
+</body></html>
+"""
+
+BIENVENIDA_MIDT = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Mi DT</title>""" + ESTILO + """</head>
+<body>
+  <button id="nuevaSesion" type="button" onclick="location.href = 'claveunica'">Iniciar sesión</button>
+</body></html>
+"""
+
+CLAVE_UNICA = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>ClaveÚnica</title>""" + ESTILO + """</head>
+<body>
+  <form method="post" action="login">
+    <input id="uname" name="uname" type="text" placeholder="RUN">
+    <input id="pword" name="pword" type="password" placeholder="ClaveÚnica">
+    <button id="login-submit" type="submit">Autenticar</button>
+  </form>
+</body></html>
+"""
+
+PAGINA_MIDT = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Mi DT</title>""" + ESTILO + """</head>
+<body>
+  <button id="btn-empleador" type="button" onclick="mostrar('perfiles')">Empleador</button>
+
+  <div id="perfiles" class="oculto">
+    <div class="perfil" onclick="mostrar('empresas')">Empleador Persona Jurídica</div>
+  </div>
+
+  <div id="empresas" class="oculto">
+    <button type="button" onclick="mostrar('menu')">""" + EMPRESA_MIDT + """</button>
+  </div>
+
+  <div id="menu" class="oculto">
+    <div class="accordion-title" onclick="mostrar('tramites')">Contratos de Trabajo y Despido</div>
+    <div id="tramites" class="oculto">
+      <a href="#" onclick="mostrar('finiquitos'); return false;">Finiquito Laboral Electrónico</a>
+    </div>
+  </div>
+
+  <div id="finiquitos" class="oculto">
+    <button type="button" onclick="mostrar('carga')">Ingreso de finiquito masivo</button>
+  </div>
+
+  <div id="carga" class="oculto">
+    <label for="file_upload">Seleccione el archivo CSV</label>
+    <input id="file_upload" type="file" accept=".csv" style="display: none">
+    <button id="btn-cargar" type="button" disabled>Cargar finiquitos</button>
+    <div id="procesando" class="oculto">Procesando archivo...</div>
+  </div>
+
+  <div id="resultado-carga" class="oculto"></div>
+
+<script>
+function mostrar(id) { document.getElementById(id).classList.remove('oculto'); }
+
+var archivo = document.getElementById('file_upload');
+var boton = document.getElementById('btn-cargar');
+archivo.addEventListener('change', function () { boton.disabled = !archivo.files.length; });
+
+boton.addEventListener('click', function () {
+    var lector = new FileReader();
+    boton.disabled = true;
+    mostrar('procesando');
+    lector.onload = function () {
+        var cuerpo = 'nombre=' + encodeURIComponent(archivo.files[0].name)
+            + '&contenido=' + encodeURIComponent(lector.result);
+        var xhr = new XMLHttpRequest();
+        xhr.open('POST', 'api/carga');
+        xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+        xhr.onload = function () {
+            document.getElementById('procesando').classList.add('oculto');
+            var resultado = document.getElementById('resultado-carga');
+            if (xhr.status !== 200) {
+                resultado.innerHTML = '<div class="alert alert-danger">Ocurrió un error al procesar el archivo.</div>';
+            } else {
+                var r = JSON.parse(xhr.responseText);
+                var html = '<div class="alert alert-success">Finiquitos cargados: <span class="aceptados">'
+                    + r.aceptados.length + '</span>. Rechazados: <span class="rechazados">'
+                    + r.rechazados.length + '</span>.</div>';
+                html += '<table class="tabla-errores"><thead><tr><th>Fila</th><th>ID</th><th>RUT</th><th>Motivo</th></tr></thead><tbody>';
+                r.rechazados.forEach(function (e) {
+                    html += '<tr><td>' + e.fila + '</td><td>' + e.id + '</td><td>' + e.rut + '</td><td>' + e.motivo + '</td></tr>';
+                });
+                resultado.innerHTML = html + '</tbody></table>';
+            }
+            resultado.classList.remove('oculto');
+        };
+        xhr.send(cuerpo);
+    };
+    lector.readAsText(archivo.files[0]);
+});
+</script>
+</body></html>
+"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Réplica local de SIGO y MiDT.")
+    parser.add_argument("--puerto", type=int, default=8766)
+    parser.add_argument("--finiquitos", type=int, default=500)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos añadidos a cada respuesta.")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="Fracción de respuestas 500 en las APIs.")
+    parser.add_argument("--tasa-duplicados", type=float, default=0.05, help="Fracción de finiquitos que SIGO marca como duplicados.")
+    parser.add_argument("--tasa-rechazo", type=float, default=0.0, help="Fracción de filas que MiDT rechaza.")
+    parser.add_argument("--latencia-carga", type=float, default=1.0, help="Segundos que MiDT tarda en procesar un CSV.")
+    args = parser.parse_args()
+
+    estado = EstadoMock(
+        sigo_stub.generar_finiquitos(args.finiquitos), args.latencia, args.tasa_error,
+        args.tasa_duplicados, args.tasa_rechazo, args.latencia_carga,
+    )
+    servidor, url_sigo, url_midt = crear_servidor(args.puerto, estado)
+    print(f"SIGO: {url_sigo}\nMiDT: {url_midt}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,157 @@
+import logging
+import re
+from datetime import datetime
+
+from validacion import normalizar_rut
+
+logger = logging.getLogger(__name__)
+
+PATRON_RUT = re.compile(r"^\d{1,2}\.?\d{3}\.?\d{3}-[\dkK]$")
+FORMATOS_FECHA = ("%d/%m/%Y %H:%M", "%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+# Encabezados de table.highlight -> clave de la fila
+COLUMNAS = {
+    "id": ("ID", "N°", "FOLIO"),
+    "rut": ("RUT",),
+    "estado": ("ESTADO",),
+    "monto": ("MONTO",),
+    "fecha": ("FECHA",),
+}
+
+# Foto completa de table.highlight en una sola llamada a chromedriver
+JS_SNAPSHOT = """
+var tabla = document.querySelector('table.highlight');
+if (!tabla) { return null; }
+var encabezados = Array.prototype.map.call(
+    tabla.querySelectorAll('thead th'), function (th) { return th.innerText.trim().toUpperCase(); }
+);
+var filas = tabla.querySelectorAll('tbody tr');
+var salida = [];
+for (var i = 0; i < filas.length; i++) {
+    var tr = filas[i];
+    var onclick = tr.getAttribute('onclick') || '';
+    var m = onclick.match(/Busca\\((\\d+)\\)/);
+    var check = tr.querySelector('input.check_listado');
+    salida.push({
+        indice: i,
+        id: m ? m[1] : (check ? (check.value || check.id || null) : null),
+        onclick: onclick,
+        celdas: Array.prototype.map.call(tr.cells, function (td) { return td.innerText.trim(); }),
+        tiene_check: !!check,
+        seleccionado: check ? check.checked : false
+    });
+}
+return {encabezados: encabezados, filas: salida};
+"""
+
+# Marca o desmarca por ID en una sola llamada. Devuelve {id: checked} de las filas tocadas.
+JS_APLICAR = """
+var ids = arguments[0].map(String), marcar = arguments[1], estado = {};
+var filas = document.querySelectorAll('table.highlight tbody tr');
+for (var i = 0; i < filas.length; i++) {
+    var tr = filas[i];
+    var m = (tr.getAttribute('onclick') || '').match(/Busca\\((\\d+)\\)/);
+    var check = tr.querySelector('input.check_listado');
+    if (!check) { continue; }
+    var id = m ? m[1] : (check.value || check.id);
+    if (ids.indexOf(String(id)) === -1) { continue; }
+    if (check.checked !== marcar) { check.click(); }
+    estado[id] = check.checked;
+}
+return estado;
+"""
+
+# Igual que JS_APLICAR pero por posición de la fila, para filas sin ID legible
+JS_APLICAR_INDICES = """
+var indices = arguments[0], marcar = arguments[1], estado = {};
+var filas = document.querySelectorAll('table.highlight tbody tr');
+for (var k = 0; k < indices.length; k++) {
+    var tr = filas[indices[k]];
+    var check = tr ? tr.querySelector('input.check_listado') : null;
+    if (!check) { continue; }
+    if (check.checked !== marcar) { check.click(); }
+    estado[indices[k]] = check.checked;
+}
+return estado;
+"""
+
+
+def parsear_fecha(texto):
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    return None
+
+
+def parsear_monto(texto):
+    digitos = re.sub(r"[^\d-]", "", texto or "")
+    return int(digitos) if digitos not in ("", "-") else None
+
+
+def _columna(encabezados, clave):
+    for i, encabezado in enumerate(encabezados):
+        if any(nombre in encabezado for nombre in COLUMNAS[clave]):
+            return i
+    return None
+
+
+def snapshot(driver):
+    """
+    Devuelve las filas de table.highlight como dicts con id, rut, estado,
+    monto, fecha, seleccionado, tiene_check, onclick y celdas. Lista vacía si
+    la tabla no está en la página.
+    """
+    datos = driver.execute_script(JS_SNAPSHOT)
+    if not datos:
+        return []
+
+    encabezados = datos["encabezados"]
+    indices = {clave: _columna(encabezados, clave) for clave in COLUMNAS}
+
+    filas = []
+    for fila in datos["filas"]:
+        celdas = fila["celdas"]
+
+        def celda(clave):
+            i = indices[clave]
+            return celdas[i] if i is not None and i < len(celdas) else None
+
+        # Si no hay encabezado reconocible se buscan por formato
+        rut = celda("rut") or next((c for c in celdas if PATRON_RUT.match(c)), None)
+        fecha_texto = celda("fecha")
+        fecha = parsear_fecha(fecha_texto) if fecha_texto else next(
+            (f for f in map(parsear_fecha, celdas) if f), None
+        )
+
+        fila.update({
+            "id": fila["id"] or celda("id"),
+            "rut": normalizar_rut(rut) if rut else None,
+            "estado": celda("estado"),
+            "monto": parsear_monto(celda("monto")),
+            "fecha": fecha,
+        })
+        filas.append(fila)
+    return filas
+
+
+def marcar(driver, ids):
+    """
+    Marca los checkboxes de las filas con esos IDs (los ya marcados no se tocan).
+    Devuelve {id: checked}.
+    """
+    return driver.execute_script(JS_APLICAR, [str(i) for i in ids], True)
+
+
+def desmarcar(driver, ids):
+    return driver.execute_script(JS_APLICAR, [str(i) for i in ids], False)
+
+
+def marcar_indices(driver, indices):
+    """
+    Marca los checkboxes de las filas en esas posiciones (ver 'indice' en
+    snapshot). Devuelve {indice: checked}.
+    """
+    estado = driver.execute_script(JS_APLICAR_INDICES, [int(i) for i in indices], True)
+    return {int(k): v for k, v in (estado or {}).items()}
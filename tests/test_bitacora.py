@@ -0,0 +1,55 @@
+import sqlite3
+
+from bitacora import Bitacora
+
+
+def test_finalizados_segun_el_ultimo_resultado(tmp_path):
+    bitacora = Bitacora("sigo2", ruta=str(tmp_path / "b.db"))
+    bitacora.registrar(1, "DATOS_GUARDADOS")
+    bitacora.registrar(2, "ERROR", detalle="timeout")
+    bitacora.registrar(3, "NO_ENCONTRADO")
+    bitacora.registrar(3, "ERROR")
+    bitacora.registrar(4, "ERROR")
+    bitacora.registrar(4, "SKIP")
+
+    assert bitacora.finalizados() == {"1", "4"}
+    bitacora.cerrar()
+
+
+def test_resume_omite_finalizados_de_otra_corrida(tmp_path):
+    ruta = str(tmp_path / "b.db")
+    anterior = Bitacora("rut", ruta=ruta, corrida="1")
+    anterior.registrar_varios(["11111111-1", "22222222-2"], "EXPORTADO")
+    anterior.registrar("33333333-3", "ERROR")
+    anterior.cerrar()
+
+    # Otro flujo en la misma base no cuenta
+    otro = Bitacora("sigo", ruta=ruta, corrida="1")
+    otro.registrar("44444444-4", "EXPORTADO")
+    otro.cerrar()
+
+    bitacora = Bitacora("rut", ruta=ruta, corrida="2")
+    claves = ["11111111-1", "33333333-3", "44444444-4", "22222222-2"]
+    assert bitacora.pendientes(claves) == ["33333333-3", "44444444-4"]
+    bitacora.cerrar()
+
+
+def test_historial_guarda_cada_intento(tmp_path):
+    ruta = str(tmp_path / "b.db")
+    bitacora = Bitacora("sigo2", ruta=ruta, corrida="c")
+    bitacora.registrar(7, "ERROR", intentos=1)
+    bitacora.registrar(7, "DATOS_GUARDADOS", intentos=2)
+    bitacora.cerrar()
+
+    conexion = sqlite3.connect(ruta)
+    assert conexion.execute("SELECT resultado, intentos FROM items").fetchall() == [("DATOS_GUARDADOS", 2)]
+    assert conexion.execute("SELECT resultado FROM historial ORDER BY rowid").fetchall() == [
+        ("ERROR",), ("DATOS_GUARDADOS",)
+    ]
+    conexion.close()
+
+
+def test_ruta_por_variable_de_entorno(tmp_path, monkeypatch):
+    monkeypatch.setenv("BOT_DT_BITACORA", str(tmp_path / "env.db"))
+    Bitacora("sigo").cerrar()
+    assert (tmp_path / "env.db").exists()
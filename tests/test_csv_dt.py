@@ -0,0 +1,70 @@
+import codecs
+import os
+
+import pytest
+
+import csv_dt
+
+
+def escribir(ruta, texto, encoding="utf-8", bom=False):
+    with open(ruta, "wb") as f:
+        if bom:
+            f.write(codecs.BOM_UTF8)
+        f.write(texto.encode(encoding))
+    return str(ruta)
+
+
+def leer(ruta):
+    with open(ruta, encoding="utf-8", newline="") as f:
+        return f.read().splitlines()
+
+
+def test_detecta_bom_y_delimitador(tmp_path):
+    ruta = escribir(tmp_path / "a.csv", "ID;RUT\n1;12345678-5\n2;11111111-1\n", bom=True)
+    assert csv_dt.detectar_formato(ruta) == ("utf-8-sig", ";")
+
+
+def test_detecta_cp1252_y_tabulador(tmp_path):
+    ruta = escribir(tmp_path / "a.csv", "ID\tRUT\tNOMBRE\n1\t12345678-5\tMuñoz\n", encoding="cp1252")
+    assert csv_dt.detectar_formato(ruta) == ("cp1252", "\t")
+
+
+def test_multibyte_cortado_en_la_muestra_sigue_siendo_utf8(tmp_path, monkeypatch):
+    texto = "ID,RUT,NOMBRE\n1,12345678-5,ñandú\n"
+    ruta = escribir(tmp_path / "a.csv", texto)
+    # La muestra termina a mitad de la 'ñ'
+    monkeypatch.setattr(csv_dt, "TAMANO_MUESTRA", len(texto.encode("utf-8").split("ñ".encode())[0]) + 1)
+    assert csv_dt.detectar_formato(ruta)[0] == "utf-8"
+
+
+def test_normaliza_a_comas_en_utf8_sin_bom(tmp_path):
+    ruta = escribir(tmp_path / "a.csv", "ID;RUT;NOMBRE\n1;12345678-5;Muñoz\n\n2;11111111-1;Peña\n",
+                    encoding="cp1252")
+
+    destino, filas = csv_dt.normalizar_csv(ruta, encoding_salida="utf-8")
+
+    assert destino == ruta
+    assert filas == 2
+    assert leer(ruta) == ["ID,RUT,NOMBRE", "1,12345678-5,Muñoz", "2,11111111-1,Peña"]
+
+
+def test_encabezado_con_bom_cuenta_las_columnas(tmp_path):
+    ruta = escribir(tmp_path / "a.csv", "ID,RUT\n1,12345678-5\n", bom=True)
+    assert csv_dt.normalizar_csv(ruta, encoding_salida="utf-8")[1] == 1
+    assert leer(ruta)[0] == "ID,RUT"
+
+
+@pytest.mark.parametrize("texto", [
+    "",
+    "ID,NOMBRE\n1,Juan\n",
+    "ID,RUT\n1,12345678-5,extra\n",
+])
+def test_error_deja_el_original_intacto(tmp_path, texto):
+    ruta = escribir(tmp_path / "a.csv", texto)
+
+    with pytest.raises(csv_dt.ErrorFormatoCSV):
+        csv_dt.normalizar_csv(ruta)
+
+    with open(ruta, encoding="utf-8", newline="") as f:
+        assert f.read() == texto
+    assert os.listdir(tmp_path) == ["a.csv"]
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+import pytest
+
+import descargas
+
+
+def escribir_en_partes(ruta, partes, pausa):
+    """Imita a Chrome: escribe en '.crdownload' y renombra al final."""
+    parcial = ruta + ".crdownload"
+    with open(parcial, "wb") as f:
+        for parte in partes:
+            f.write(parte)
+            f.flush()
+            time.sleep(pausa)
+    os.replace(parcial, ruta)
+
+
+def test_espera_a_que_termine_y_el_tamano_se_estabilice(tmp_path):
+    ruta = str(tmp_path / "Informe DT.csv")
+    hilo = threading.Thread(target=escribir_en_partes, args=(ruta, [b"ID,RUT\n"] * 5, 0.05))
+    hilo.start()
+
+    inicio = time.monotonic()
+    assert descargas.esperar_descarga(str(tmp_path), timeout=5, estabilidad=0.2) == ruta
+    hilo.join()
+
+    assert time.monotonic() - inicio >= 0.2 + 0.05 * 5
+    assert os.path.getsize(ruta) == len(b"ID,RUT\n") * 5
+
+
+def test_archivo_que_sigue_creciendo_no_se_da_por_terminado(tmp_path):
+    ruta = tmp_path / "a.csv"
+    detener = threading.Event()
+
+    def crecer():
+        with open(ruta, "ab") as f:
+            while not detener.is_set():
+                f.write(b"x")
+                f.flush()
+                time.sleep(0.02)
+
+    hilo = threading.Thread(target=crecer)
+    hilo.start()
+    try:
+        with pytest.raises(descargas.ErrorDescarga):
+            descargas.esperar_descarga(str(tmp_path), timeout=0.5, estabilidad=0.2)
+    finally:
+        detener.set()
+        hilo.join()
+
+
+def test_parciales_y_ocultos_no_cuentan(tmp_path):
+    (tmp_path / "a.csv.crdownload").write_bytes(b"ID")
+    (tmp_path / ".oculto").write_bytes(b"x")
+
+    with pytest.raises(descargas.ErrorDescarga, match="0 terminados, 1 en curso"):
+        descargas.esperar_descarga(str(tmp_path), timeout=0.3, estabilidad=0.05)
+
+
+def test_mover_a_no_pisa_y_borra_el_temporal(tmp_path):
+    carpeta = descargas.preparar_directorio(str(tmp_path))
+    (tmp_path / "Informe DT.csv").write_bytes(b"viejo")
+    origen = os.path.join(carpeta, "descarga.csv")
+    with open(origen, "wb") as f:
+        f.write(b"nuevo")
+
+    destino = descargas.mover_a(origen, str(tmp_path), "Informe DT.csv")
+
+    assert destino == str(tmp_path / "Informe DT (1).csv")
+    assert (tmp_path / "Informe DT.csv").read_bytes() == b"viejo"
+    assert not os.path.exists(carpeta)
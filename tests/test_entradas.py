@@ -0,0 +1,57 @@
+import io
+
+import pytest
+
+import entradas
+
+
+def escribir(ruta, texto, encoding="utf-8"):
+    with open(ruta, "w", encoding=encoding, newline="") as f:
+        f.write(texto)
+    return str(ruta)
+
+
+def test_columna_por_nombre_sin_distinguir_mayusculas(tmp_path):
+    ruta = escribir(tmp_path / "ruts.csv", "\ufeffNombre;Rut\nAna;12345678-5\nLuis;\nEva;11111111-1\n")
+    assert list(entradas.leer(ruta, columna="RUT")) == ["12345678-5", "11111111-1"]
+
+
+def test_columna_inexistente(tmp_path):
+    ruta = escribir(tmp_path / "ruts.csv", "ID,RUT\n1,12345678-5\n")
+    with pytest.raises(ValueError, match="No existe la columna 'MONTO'"):
+        list(entradas.leer(ruta, columna="MONTO"))
+
+
+def test_primera_fila_es_encabezado_solo_sin_digitos(tmp_path):
+    con_encabezado = escribir(tmp_path / "a.csv", "ID,RUT\n10,12345678-5\n11,11111111-1\n")
+    sin_encabezado = escribir(tmp_path / "b.csv", "10,12345678-5\n11,11111111-1\n")
+
+    assert list(entradas.leer(con_encabezado)) == ["10", "11"]
+    assert list(entradas.leer(sin_encabezado)) == ["10", "11"]
+    assert list(entradas.leer(sin_encabezado, columna="2")) == ["12345678-5", "11111111-1"]
+
+
+def test_filas_cortas_se_omiten(tmp_path):
+    ruta = escribir(tmp_path / "a.csv", "ID,RUT,NOMBRE\n1,12345678-5,Ana\n2\n3,11111111-1\n")
+    assert list(entradas.leer(ruta, columna=2)) == ["12345678-5", "11111111-1"]
+
+
+def test_texto_por_linea_con_comentarios(tmp_path):
+    ruta = escribir(tmp_path / "ids.txt", "\ufeff# ids de hoy\n101\n\n  102 \n")
+    assert list(entradas.leer(ruta)) == ["101", "102"]
+
+
+def test_stdin(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO("12345678-5\n# fin\n"))
+    assert list(entradas.leer("-")) == ["12345678-5"]
+
+
+def test_ids_numericos_de_excel():
+    filas = iter([("ID",), (1234.0,), (None,), ("  5678 ",)])
+    assert list(entradas._valores(filas, "id")) == ["1234", "5678"]
+
+
+def test_sin_repetidos_y_omitir_finalizados():
+    ruts = ["1-9", "2-7", "1-9", "3-5"]
+    assert list(entradas.sin_repetidos(ruts)) == ["1-9", "2-7", "3-5"]
+    assert list(entradas.omitir_finalizados(entradas.sin_repetidos(ruts), {"2-7"})) == ["1-9", "3-5"]
@@ -0,0 +1,181 @@
+import pytest
+
+import esperas
+import paginacion
+import tabla
+
+
+class DriverPaginado:
+    """
+    Imita table.highlight de SIGO con su paginación: responde a los scripts de
+    paginacion, tabla y esperas sin navegador.
+
+    'saltar': los enlaces traen onclick="solicitudes.Listar(n)" y el objeto
+    expone 'paginas' y 'porPagina'. 'enlaces': False = SELECTOR_ENLACES no
+    encuentra los enlaces; 'contenedor': False = no hay ul.pagination;
+    'numerada': False = con una sola página la paginación queda sin números.
+    """
+
+    def __init__(self, ids, por_pagina=10, saltar=True, enlaces=True, ventana=5, acepta_tamano=True,
+                 contenedor=True, numerada=True):
+        self.ids = ids
+        self.por_pagina = por_pagina
+        self.saltar = saltar
+        self.enlaces = enlaces
+        self.ventana = ventana
+        self.acepta_tamano = acepta_tamano
+        self.contenedor = contenedor
+        self.numerada = numerada
+        self.pagina = 1
+        self.version = 0
+        self.selectores = set()
+        self.saltos = []
+        self.clics = []
+
+    @property
+    def paginas(self):
+        return max(1, -(-len(self.ids) // self.por_pagina))
+
+    def filas(self):
+        inicio = (self.pagina - 1) * self.por_pagina
+        return self.ids[inicio:inicio + self.por_pagina]
+
+    def numeros(self):
+        if self.paginas == 1 and not self.numerada:
+            return []
+        desde = max(1, self.pagina - self.ventana // 2)
+        return list(range(desde, min(self.paginas, desde + self.ventana - 1) + 1))
+
+    def listar(self, pagina):
+        if 1 <= pagina <= self.paginas:
+            self.pagina = pagina
+        self.version += 1
+
+    def execute_script(self, script, *args):
+        if script == esperas.JS_ESTADO_PAGINA:
+            return {"version": self.version, "quieto": 10000, "pendientes": 0}
+        if script == tabla.JS_SNAPSHOT:
+            return {
+                "encabezados": ["ID", "RUT"],
+                "filas": [
+                    {"indice": i, "id": str(id_), "onclick": f"solicitudes.Busca({id_})",
+                     "celdas": [str(id_), "12345678-5"], "tiene_check": True, "seleccionado": False}
+                    for i, id_ in enumerate(self.filas())
+                ],
+            }
+        if script == paginacion.JS_PAGINACION:
+            self.selectores.add(args[2])
+            numeros = self.numeros() if self.contenedor else []
+            visibles = numeros if self.enlaces else []
+            return {
+                "contenedor": self.contenedor,
+                "numeros": len(numeros),
+                "actual": self.pagina if visibles else None,
+                "visibles": visibles,
+                "llamada": "solicitudes.Listar" if self.saltar and visibles else None,
+                "total": self.paginas if self.saltar and visibles else None,
+                "propiedad": "porPagina" if self.saltar and visibles else None,
+                "tamano": self.por_pagina if self.saltar and visibles else None,
+            }
+        if script == paginacion.JS_SALTAR:
+            llamada, numero, fijar = args
+            assert llamada == "solicitudes.Listar"
+            if fijar and self.acepta_tamano:
+                self.por_pagina = fijar[1]
+            self.saltos.append(numero)
+            self.listar(numero)
+            return None
+        if script == paginacion.JS_CLIC:
+            self.selectores.add(args[1])
+            self.clics.append(args[0])
+            self.listar(args[0])
+            return True
+        raise AssertionError(f"Script inesperado: {script[:60]}")
+
+
+def recorrer(paginador):
+    paginas = [paginador.ids_pagina()]
+    while paginador.siguiente():
+        paginas.append(paginador.ids_pagina())
+    return paginas
+
+
+def test_salta_por_la_funcion_de_la_pagina():
+    driver = DriverPaginado(list(range(1, 26)))
+    paginador = paginacion.Paginador(driver, filas_por_pagina=0)
+
+    paginas = recorrer(paginador)
+
+    assert paginas == [[str(i) for i in range(1, 11)], [str(i) for i in range(11, 21)],
+                       [str(i) for i in range(21, 26)]]
+    assert driver.saltos == [2, 3]
+    assert paginador.actual == 3
+    assert driver.selectores == {paginacion.SELECTOR_ENLACES}
+
+
+def test_ir_a_una_pagina_no_visible():
+    driver = DriverPaginado(list(range(1, 201)))
+    paginador = paginacion.Paginador(driver, filas_por_pagina=0)
+
+    assert paginador.ir_a(17)
+    assert paginador.ids_pagina()[0] == "161"
+    assert not paginador.ir_a(21)
+
+
+def test_amplia_el_tamano_de_pagina():
+    driver = DriverPaginado(list(range(1, 26)))
+    paginador = paginacion.Paginador(driver, filas_por_pagina=100)
+
+    assert paginador.tamano == 100
+    assert paginador.total == 1
+    assert len(paginador.ids_pagina()) == 25
+    assert not paginador.siguiente()
+
+
+def test_vuelve_al_tamano_original_si_el_servidor_no_acepta():
+    driver = DriverPaginado(list(range(1, 26)), acepta_tamano=False)
+    paginador = paginacion.Paginador(driver, filas_por_pagina=100)
+
+    assert paginador.tamano == 10
+    assert len(recorrer(paginador)) == 3
+
+
+def test_sin_funcion_de_salto_hace_clic_en_los_enlaces():
+    driver = DriverPaginado(list(range(1, 96)), saltar=False)
+    paginador = paginacion.Paginador(driver)
+
+    paginas = recorrer(paginador)
+
+    assert len(paginas) == 10
+    assert paginas[-1] == [str(i) for i in range(91, 96)]
+    assert driver.clics == list(range(2, 11))
+
+
+def test_pagina_llena_sin_paginacion_es_error():
+    driver = DriverPaginado(list(range(1, 26)), enlaces=False, contenedor=False)
+
+    with pytest.raises(paginacion.ErrorPaginacion):
+        paginacion.Paginador(driver)
+
+
+def test_una_sola_pagina_llena_sin_enlaces():
+    driver = DriverPaginado(list(range(1, 11)), numerada=False)
+    paginador = paginacion.Paginador(driver)
+
+    assert paginador.ids_pagina() == [str(i) for i in range(1, 11)]
+    assert not paginador.siguiente()
+
+
+def test_selector_que_no_encuentra_los_numeros_es_error():
+    driver = DriverPaginado(list(range(1, 26)), enlaces=False)
+
+    with pytest.raises(paginacion.ErrorPaginacion, match="no las encuentra"):
+        paginacion.Paginador(driver)
+
+
+def test_pagina_incompleta_sin_paginacion_es_la_unica():
+    driver = DriverPaginado(list(range(1, 8)), enlaces=False, contenedor=False)
+    paginador = paginacion.Paginador(driver)
+
+    assert paginador.ids_pagina() == [str(i) for i in range(1, 8)]
+    assert not paginador.siguiente()
@@ -0,0 +1,60 @@
+import reintentos
+
+
+def test_espera_dentro_del_tope_exponencial():
+    politica = reintentos.PoliticaReintentos(base=1.0, maximo=8.0)
+
+    for _ in range(200):
+        assert 0.5 <= politica.espera(1) <= 1.0
+        assert 0 <= politica.espera(3) <= 4.0
+        assert 0 <= politica.espera(10) <= 8.0
+
+
+def test_espera_escala_con_la_latencia():
+    latencia = reintentos.EstimadorLatencia(inicial=4.0)
+    politica = reintentos.PoliticaReintentos(base=0.5, maximo=20.0, latencia=latencia)
+
+    for _ in range(200):
+        assert 2.0 <= politica.espera(1) <= 4.0
+
+
+def test_timeout_acotado():
+    latencia = reintentos.EstimadorLatencia()
+    assert latencia.timeout(2, 30) == 2
+
+    latencia.observar(10)
+    assert latencia.timeout(2, 30) == 30
+    assert latencia.timeout(2, 100) == 10 + 4 * 5
+
+
+def test_circuito_abre_con_la_tasa_de_errores():
+    circuito = reintentos.Cortacircuitos(ventana=10, umbral=0.5, minimo_muestras=4)
+
+    circuito.exito()
+    circuito.exito()
+    circuito.fallo()
+    assert circuito.estado == circuito.CERRADO
+    circuito.fallo()
+    assert circuito.estado == circuito.ABIERTO
+
+
+def test_circuito_semiabierto_cierra_o_duplica_la_pausa():
+    circuito = reintentos.Cortacircuitos(ventana=10, umbral=0.5, pausa=0, pausa_maxima=10,
+                                         minimo_muestras=2)
+    circuito.fallo()
+    circuito.fallo()
+    assert circuito.estado == circuito.ABIERTO
+
+    # Pausa vencida: la siguiente llamada pasa como prueba
+    circuito.esperar()
+    assert circuito.estado == circuito.SEMIABIERTO
+    circuito.pausa = 1
+    circuito.fallo()
+    assert circuito.estado == circuito.ABIERTO
+    assert circuito.pausa == 2
+
+    circuito.estado = circuito.SEMIABIERTO
+    circuito.exito()
+    assert circuito.estado == circuito.CERRADO
+    assert circuito.pausa == 0
+    assert not circuito.resultados
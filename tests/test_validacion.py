@@ -0,0 +1,107 @@
+import csv
+import os
+
+import validacion
+
+
+def escribir_csv(ruta, filas, delimitador=";"):
+    with open(ruta, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f, delimiter=delimitador).writerows(filas)
+
+
+def leer_csv(ruta, delimitador=";"):
+    with open(ruta, encoding="utf-8", newline="") as f:
+        return list(csv.reader(f, delimiter=delimitador))
+
+
+def test_digito_verificador():
+    assert validacion.digito_verificador("12345678") == "5"
+    assert validacion.digito_verificador("11111111") == "1"
+    assert validacion.digito_verificador("6") == "K"
+    assert validacion.digito_verificador("14") == "0"
+
+
+def test_normalizar_rut():
+    assert validacion.normalizar_rut("12.345.678-5") == "12345678-5"
+    assert validacion.normalizar_rut(" 12345678 5") == "12345678-5"
+    assert validacion.normalizar_rut("6-k") == "6-K"
+    assert validacion.normalizar_rut("012345678-5") == "12345678-5"
+    assert validacion.normalizar_rut("12345678-X") is None
+    assert validacion.normalizar_rut("") is None
+
+
+def test_revisar_rut():
+    assert validacion.revisar_rut("12.345.678-5") == ("12345678-5", None)
+    assert validacion.revisar_rut("12345678-4") == ("12345678-4", validacion.DV_INCORRECTO)
+    assert validacion.revisar_rut("abc") == (None, validacion.RUT_INVALIDO)
+
+
+def test_validar_ruts_descarta_invalidos_y_repetidos():
+    rechazados_esperados = [
+        ("12345678-4", validacion.DV_INCORRECTO),
+        ("12345678-5", validacion.RUT_DUPLICADO),
+        ("x", validacion.RUT_INVALIDO),
+    ]
+    validos, rechazados = validacion.validar_ruts(["12.345.678-5", "12345678-4", "12345678-5", "x", "11111111-1"])
+    assert validos == ["12345678-5", "11111111-1"]
+    assert rechazados == rechazados_esperados
+
+
+def test_validar_filas_rut_repetido_solo_avisa():
+    encabezado = ["ID", "RUT"]
+    filas = [["1", "12345678-5"], ["2", "12.345.678-5"], ["3", "11111111-1"]]
+    buenas, rechazos, avisos = validacion.validar_filas(encabezado, filas)
+    assert buenas == filas
+    assert rechazos == []
+    assert avisos == [{"fila": 3, "id": "2", "rut": "12345678-5", "motivo": validacion.RUT_DUPLICADO}]
+
+
+def test_validar_filas_descarta_id_repetido_invalidos_y_vacios():
+    encabezado = ["ID", "RUT"]
+    filas = [
+        ["1", "12345678-5"],
+        ["1", "12345678-5"],
+        ["", "11111111-1"],
+        ["4", "12345678-4"],
+        ["5", "no es rut"],
+        ["", ""],
+    ]
+    buenas, rechazos, avisos = validacion.validar_filas(encabezado, filas)
+    assert buenas == [["1", "12345678-5"]]
+    assert [(r["fila"], r["motivo"]) for r in rechazos] == [
+        (3, validacion.ID_DUPLICADO),
+        (4, validacion.ID_VACIO),
+        (5, validacion.DV_INCORRECTO),
+        (6, validacion.RUT_INVALIDO),
+    ]
+    assert avisos == []
+
+
+def test_validar_filas_comparte_vistos_entre_archivos():
+    vistos = {"ids": set(), "ruts": set()}
+    validacion.validar_filas(["ID", "RUT"], [["1", "12345678-5"]], vistos)
+    buenas, rechazos, avisos = validacion.validar_filas(["ID", "RUT"], [["1", "11111111-1"], ["2", "12345678-5"]], vistos)
+    assert buenas == [["2", "12345678-5"]]
+    assert [r["motivo"] for r in rechazos] == [validacion.ID_DUPLICADO]
+    assert [a["motivo"] for a in avisos] == [validacion.RUT_DUPLICADO]
+
+
+def test_depurar_csv_escribe_copia_y_conserva_original(tmp_path):
+    ruta = str(tmp_path / "Informe DT #1.csv")
+    filas = [["ID", "RUT"], ["1", "12345678-5"], ["1", "12345678-5"], ["2", "12345678-5"]]
+    escribir_csv(ruta, filas)
+
+    depurado, rechazos = validacion.depurar_csv(ruta)
+
+    assert leer_csv(ruta) == filas
+    assert depurado == os.path.join(str(tmp_path), validacion.CARPETA_DEPURADOS, "Informe DT #1.csv")
+    assert leer_csv(depurado) == [["ID", "RUT"], ["1", "12345678-5"], ["2", "12345678-5"]]
+    assert [r["motivo"] for r in rechazos] == [validacion.ID_DUPLICADO]
+
+
+def test_depurar_csv_sin_rechazos_sube_el_original(tmp_path):
+    ruta = str(tmp_path / "Informe DT #2.csv")
+    escribir_csv(ruta, [["ID", "RUT"], ["1", "12345678-5"], ["2", "11111111-1"]])
+
+    assert validacion.depurar_csv(ruta) == (ruta, [])
+    assert not os.path.exists(tmp_path / validacion.CARPETA_DEPURADOS)
@@ -0,0 +1,106 @@
+import logging
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+logger = logging.getLogger(__name__)
+
+# Selector del toast rojo de error (p.ej. finiquito duplicado)
+CLASES_ERROR = ("red", "darken-2")
+
+INTERVALO_SONDEO = 0.05
+
+# Instala (una vez por página) un MutationObserver que guarda cada toast de
+# Materialize en un buffer JS con su texto, clases, instante y n° de secuencia.
+JS_INSTALAR = """
+if (!window.__botdtToasts) {
+    var buffer = {seq: 0, items: []};
+    window.__botdtToasts = buffer;
+    var registrar = function (nodo) {
+        if (!nodo || nodo.nodeType !== 1) { return; }
+        var toasts = nodo.classList.contains('toast') ? [nodo] : nodo.querySelectorAll('.toast');
+        for (var i = 0; i < toasts.length; i++) {
+            buffer.seq += 1;
+            buffer.items.push({
+                seq: buffer.seq,
+                texto: (toasts[i].innerText || toasts[i].textContent || '').trim(),
+                clases: toasts[i].className,
+                t: performance.now()
+            });
+        }
+        if (buffer.items.length > 500) { buffer.items.splice(0, buffer.items.length - 500); }
+    };
+    new MutationObserver(function (registros) {
+        for (var i = 0; i < registros.length; i++) {
+            for (var j = 0; j < registros[i].addedNodes.length; j++) {
+                registrar(registros[i].addedNodes[j]);
+            }
+        }
+    }).observe(document.body, {childList: true, subtree: true});
+}
+"""
+
+JS_MARCA = JS_INSTALAR + "return window.__botdtToasts.seq;"
+
+JS_DESDE = JS_INSTALAR + """
+var desde = arguments[0];
+var b = window.__botdtToasts;
+return {seq: b.seq, ahora: performance.now(), items: b.items.filter(function (x) { return x.seq > desde; })};
+"""
+
+
+def es_error(toast):
+    clases = toast["clases"].split()
+    return all(c in clases for c in CLASES_ERROR)
+
+
+def marca(driver):
+    """
+    Instala el observador si hace falta y devuelve el n° de secuencia actual.
+    Llamar ANTES de la acción cuyos toasts se quieren leer.
+    """
+    return driver.execute_script(JS_MARCA)
+
+
+def drenar(driver, desde):
+    """
+    Devuelve los toasts registrados después de 'desde' (lista de dicts
+    con seq, texto, clases y t en ms de performance.now()).
+    """
+    return driver.execute_script(JS_DESDE, desde)["items"]
+
+
+def esperar_toast(driver, desde, timeout=5):
+    """
+    Espera el primer toast posterior a 'desde'. Devuelve el dict o None.
+    """
+    try:
+        items = WebDriverWait(driver, timeout, poll_frequency=INTERVALO_SONDEO).until(
+            lambda d: drenar(d, desde)
+        )
+        return items[0]
+    except TimeoutException:
+        return None
+
+
+def esperar_quietud(driver, desde, quietud=0.3, timeout=2):
+    """
+    Espera hasta que pasen 'quietud' segundos sin toasts nuevos (o 'timeout')
+    y devuelve todos los toasts posteriores a 'desde'.
+    """
+    def _quieto(d):
+        estado = d.execute_script(JS_DESDE, desde)
+        ultimo = estado["items"][-1]["t"] if estado["items"] else None
+        if ultimo is None or estado["ahora"] - ultimo >= quietud * 1000:
+            return estado
+        return False
+
+    # La primera ventana de quietud cuenta desde ahora, no desde el último toast
+    inicio = driver.execute_script(JS_DESDE, desde)
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=INTERVALO_SONDEO).until(
+            lambda d: (d.execute_script("return performance.now();") - inicio["ahora"] >= quietud * 1000)
+            and _quieto(d)
+        )
+    except TimeoutException:
+        pass
+    return drenar(driver, desde)
@@ -0,0 +1,305 @@
+"""
+Medición de la duración de cada paso de los flujos.
+
+Cada paso medido deja una línea en la traza JSONL y alimenta un histograma que
+se vuelca en formato Prometheus (textfile collector de node_exporter):
+
+    @trazas.paso(item=1)
+    def filtrar_por_id(driver, finiquito_id): ...
+
+    with trazas.span("avance_pagina", item=pagina):
+        ...
+
+    python trazas.py traza.jsonl            # histograma por paso de la última corrida
+"""
+import argparse
+import atexit
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Vacío desactiva la salida correspondiente
+TRAZA_ENV = "BOT_DT_TRAZA"
+PROM_ENV = "BOT_DT_PROM_DIR"
+
+# Los procesos hijos (sigo2 --sesiones) heredan la corrida por el entorno
+CORRIDA_ENV = "BOT_DT_CORRIDA"
+
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Segundos mínimos entre volcados del archivo .prom
+INTERVALO_PROM = 5
+
+_lock = threading.Lock()
+_duraciones = defaultdict(list)   # (flujo, paso, resultado) -> [segundos]
+_archivo = None
+_nombre_prom = None
+_ultimo_volcado = 0.0
+
+
+def corrida():
+    if not os.getenv(CORRIDA_ENV):
+        os.environ[CORRIDA_ENV] = datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+    return os.environ[CORRIDA_ENV]
+
+
+def configurar(nombre, worker=None):
+    """
+    Nombre del archivo .prom de este proceso ('bot_dt_<nombre>[_w<worker>].prom').
+    Cada worker usa el suyo: el textfile collector lee todos los .prom del directorio.
+    """
+    global _nombre_prom
+    _nombre_prom = f"bot_dt_{nombre}" + (f"_w{worker}" if worker is not None else "")
+    corrida()
+
+
+def _flujo(modulo):
+    if modulo == "__main__":
+        return os.path.splitext(os.path.basename(sys.argv[0]))[0] or "bot_dt"
+    return modulo
+
+
+def _resultado(valor):
+    # Los pasos devuelven códigos ("SKIP", "DATOS_GUARDADOS"...), bools o (código, intentos).
+    # Los que atrapan su propio error devuelven False: si no, quedarían como "ok".
+    if isinstance(valor, tuple) and valor and isinstance(valor[0], str):
+        valor = valor[0]
+    if isinstance(valor, str):
+        return valor
+    return "fallo" if valor is False else "ok"
+
+
+def ruta_traza():
+    # Se leen en cada uso, no al importar: benchmark.py redirige la salida después
+    return os.getenv(TRAZA_ENV, "traza.jsonl")
+
+
+def directorio_prom():
+    return os.getenv(PROM_ENV, os.getcwd())
+
+
+def registrar(flujo, paso, segundos, resultado="ok", item=None):
+    global _archivo
+    linea = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "corrida": corrida(),
+        "flujo": flujo,
+        "paso": paso,
+        "item": None if item is None else str(item),
+        "segundos": round(segundos, 4),
+        "resultado": resultado,
+        "pid": os.getpid(),
+    }
+    with _lock:
+        _duraciones[(flujo, paso, resultado)].append(segundos)
+        ruta = ruta_traza()
+        if ruta:
+            try:
+                if _archivo is None:
+                    _archivo = open(ruta, "a", encoding="utf-8", buffering=1)
+                _archivo.write(json.dumps(linea, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning(f"⚠ No se pudo escribir la traza: {e}")
+    _volcar_si_toca()
+
+
+@contextmanager
+def span(paso, item=None, flujo=None):
+    """
+    Mide el bloque. El resultado es "ok", el nombre de la excepción si falla,
+    o lo que se asigne a 'medicion["resultado"]' dentro del bloque.
+    """
+    if flujo is None:
+        # Frames: este generador <- __enter__ de contextlib <- quien abrió el span
+        flujo = _flujo(sys._getframe(2).f_globals.get("__name__", ""))
+    medicion = {"resultado": "ok"}
+    inicio = time.perf_counter()
+    try:
+        yield medicion
+    except BaseException as e:
+        medicion["resultado"] = type(e).__name__
+        raise
+    finally:
+        registrar(flujo, paso, time.perf_counter() - inicio, medicion["resultado"], item)
+
+
+def paso(nombre=None, item=None):
+    """
+    Decorador: mide cada llamada a la función. 'item' es el índice del
+    argumento posicional que identifica el elemento (ID, RUT, archivo).
+    """
+    def decorador(funcion):
+        flujo = _flujo(funcion.__module__)
+        nombre_paso = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            valor_item = args[item] if item is not None and item < len(args) else None
+            inicio = time.perf_counter()
+            try:
+                valor = funcion(*args, **kwargs)
+            except BaseException as e:
+                registrar(flujo, nombre_paso, time.perf_counter() - inicio, type(e).__name__, valor_item)
+                raise
+            registrar(flujo, nombre_paso, time.perf_counter() - inicio, _resultado(valor), valor_item)
+            return valor
+        return medida
+    return decorador
+
+
+###############################
+# PROMETHEUS
+###############################
+def _etiquetas(flujo, paso, resultado, le=None):
+    etiquetas = f'flujo="{flujo}",paso="{paso}",resultado="{resultado}"'
+    return etiquetas if le is None else etiquetas + f',le="{le}"'
+
+
+def texto_prometheus():
+    lineas = [
+        "# HELP bot_dt_paso_segundos Duración de cada paso de los flujos del bot.",
+        "# TYPE bot_dt_paso_segundos histogram",
+    ]
+    with _lock:
+        series = {clave: list(valores) for clave, valores in _duraciones.items()}
+    for (flujo, paso_, resultado), valores in sorted(series.items()):
+        for limite in BUCKETS:
+            cuenta = sum(1 for v in valores if v <= limite)
+            lineas.append(f"bot_dt_paso_segundos_bucket{{{_etiquetas(flujo, paso_, resultado, limite)}}} {cuenta}")
+        lineas.append(f"bot_dt_paso_segundos_bucket{{{_etiquetas(flujo, paso_, resultado, '+Inf')}}} {len(valores)}")
+        lineas.append(f"bot_dt_paso_segundos_sum{{{_etiquetas(flujo, paso_, resultado)}}} {sum(valores):.6f}")
+        lineas.append(f"bot_dt_paso_segundos_count{{{_etiquetas(flujo, paso_, resultado)}}} {len(valores)}")
+    lineas.append("# HELP bot_dt_ultima_actualizacion_segundos Momento del último volcado (epoch).")
+    lineas.append("# TYPE bot_dt_ultima_actualizacion_segundos gauge")
+    lineas.append(f"bot_dt_ultima_actualizacion_segundos {time.time():.0f}")
+    return "\n".join(lineas) + "\n"
+
+
+def volcar_prometheus():
+    """
+    Escribe el .prom de este proceso de forma atómica (el collector nunca lee uno a medias).
+    """
+    global _ultimo_volcado
+    carpeta = directorio_prom()
+    if not carpeta:
+        return
+    nombre = _nombre_prom or f"bot_dt_{_flujo('__main__')}"
+    destino = os.path.join(carpeta, nombre + ".prom")
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        with open(destino + ".tmp", "w", encoding="utf-8") as f:
+            f.write(texto_prometheus())
+        os.replace(destino + ".tmp", destino)
+        _ultimo_volcado = time.monotonic()
+    except OSError as e:
+        logger.warning(f"⚠ No se pudo escribir {destino}: {e}")
+
+
+def _volcar_si_toca():
+    if time.monotonic() - _ultimo_volcado >= INTERVALO_PROM:
+        volcar_prometheus()
+
+
+def cerrar():
+    global _archivo
+    if _duraciones:
+        volcar_prometheus()
+    with _lock:
+        if _archivo is not None:
+            _archivo.close()
+            _archivo = None
+
+
+atexit.register(cerrar)
+
+
+###############################
+# RESUMEN
+###############################
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[max(0, -(-len(ordenados) * p // 100) - 1)]
+
+
+def resumen(duraciones=None):
+    """
+    Texto con el histograma de latencias por paso. Sin argumentos usa los
+    pasos medidos en este proceso; si no, {(flujo, paso): [segundos]}.
+    """
+    if duraciones is None:
+        duraciones = defaultdict(list)
+        with _lock:
+            for (flujo, paso_, _), valores in _duraciones.items():
+                duraciones[(flujo, paso_)].extend(valores)
+    if not duraciones:
+        return "Sin pasos medidos."
+
+    etiquetas = [f"≤{b}s" for b in BUCKETS] + [f">{BUCKETS[-1]}s"]
+    lineas = []
+    for (flujo, paso_), valores in sorted(duraciones.items()):
+        lineas.append(f"{flujo}.{paso_}: n={len(valores)} p50={percentil(valores, 50):.3f}s "
+                      f"p95={percentil(valores, 95):.3f}s max={max(valores):.3f}s")
+        cuentas = [0] * (len(BUCKETS) + 1)
+        for v in valores:
+            cuentas[next((i for i, b in enumerate(BUCKETS) if v <= b), len(BUCKETS))] += 1
+        for etiqueta, cuenta in zip(etiquetas, cuentas):
+            if cuenta:
+                barra = "█" * max(1, round(cuenta / len(valores) * 40))
+                lineas.append(f"    {etiqueta:>7} {cuenta:>6} {barra}")
+    return "\n".join(lineas)
+
+
+def leer_traza(ruta=None, corrida_id=None):
+    """
+    {(flujo, paso): [segundos]} de la traza. Sin 'corrida_id' toma la última corrida.
+    """
+    ruta = ruta or ruta_traza()
+    lineas = []
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                lineas.append(json.loads(linea))
+            except ValueError:
+                continue  # línea cortada por un proceso que murió escribiendo
+    if corrida_id is None and lineas:
+        corrida_id = lineas[-1]["corrida"]
+    duraciones = defaultdict(list)
+    for span_ in lineas:
+        if span_["corrida"] == corrida_id:
+            duraciones[(span_["flujo"], span_["paso"])].append(span_["segundos"])
+    return duraciones
+
+
+def imprimir_resumen(desde_traza=False):
+    """
+    Al final de una corrida. Con 'desde_traza' incluye los pasos de los
+    procesos hijos (leídos de la traza JSONL de esta corrida).
+    """
+    ruta = ruta_traza()
+    if desde_traza and ruta and os.path.exists(ruta):
+        texto = resumen(leer_traza(ruta, corrida()))
+    else:
+        texto = resumen()
+    print(f"\n⏱ Latencia por paso (corrida {corrida()}):\n{texto}")
+    logger.info(f"⏱ Latencia por paso:\n{texto}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Histograma de latencia por paso a partir de la traza JSONL.")
+    parser.add_argument("traza", nargs="?", default=ruta_traza())
+    parser.add_argument("--corrida", help="Corrida a resumir (por defecto la última).")
+    args = parser.parse_args()
+    print(resumen(leer_traza(args.traza, args.corrida)))
@@ -0,0 +1,183 @@
+"""
+Validación local de RUTs y de las filas de la CARGA MASIVA DT, antes de
+gastar un ciclo de filtros en SIGO o una carga en MiDT:
+
+- RUT con puntos, espacios, 'k' minúscula o sin guion -> '12345678-K'
+- dígito verificador módulo 11
+- IDs de finiquito repetidos (también entre varios CSV de una exportación); un
+  RUT repetido solo se avisa: un trabajador puede tener varios finiquitos
+"""
+import csv
+import logging
+import os
+import re
+import tempfile
+
+from csv_dt import detectar_formato
+
+logger = logging.getLogger(__name__)
+
+# Subcarpeta (junto al CSV original) donde depurar_csv deja la copia depurada
+CARPETA_DEPURADOS = "depurados"
+
+# Motivos de rechazo local
+RUT_INVALIDO = "RUT_INVALIDO"
+DV_INCORRECTO = "DV_INCORRECTO"
+RUT_DUPLICADO = "RUT_DUPLICADO"
+ID_DUPLICADO = "ID_DUPLICADO"
+ID_VACIO = "ID_VACIO"
+
+PATRON_RUT = re.compile(r"^(\d{1,9})-?([\dK])$")
+
+# Pesos 2..7 repetidos, del último dígito del cuerpo hacia el primero
+PESOS = (2, 3, 4, 5, 6, 7, 2, 3, 4)
+
+
+def digito_verificador(cuerpo):
+    suma = sum(int(d) * p for d, p in zip(reversed(cuerpo), PESOS))
+    resto = 11 - suma % 11
+    return "0" if resto == 11 else "K" if resto == 10 else str(resto)
+
+
+def normalizar_rut(rut):
+    """
+    '12.345.678-k', ' 12345678K ' -> '12345678-K'. None si no tiene forma de RUT.
+    """
+    texto = str(rut).replace(".", "").replace(" ", "").strip().upper()
+    m = PATRON_RUT.match(texto)
+    if not m:
+        return None
+    return f"{int(m.group(1))}-{m.group(2)}"
+
+
+def revisar_rut(rut):
+    """
+    (rut_normalizado, motivo): motivo None si el RUT es válido.
+    """
+    normalizado = normalizar_rut(rut)
+    if normalizado is None:
+        return None, RUT_INVALIDO
+    cuerpo, dv = normalizado.split("-")
+    if digito_verificador(cuerpo) != dv:
+        return normalizado, DV_INCORRECTO
+    return normalizado, None
+
+
+def filtrar_ruts(ruts, al_rechazar=None):
+    """
+    Generador: deja pasar los RUTs válidos, normalizados y sin repetidos, en
+    el orden de entrada. Por cada descarte llama a al_rechazar(rut, motivo).
+    """
+    vistos = set()
+    for rut in ruts:
+        normalizado, motivo = revisar_rut(rut)
+        if motivo is None and normalizado in vistos:
+            motivo = RUT_DUPLICADO
+        if motivo:
+            if al_rechazar:
+                al_rechazar(rut, motivo)
+            continue
+        vistos.add(normalizado)
+        yield normalizado
+
+
+def validar_ruts(ruts):
+    """
+    Valida una lista completa de RUTs en una pasada. Devuelve (validos,
+    rechazados): los válidos normalizados, sin repetidos y en el orden de
+    entrada; los rechazados como [(rut_original, motivo)].
+    """
+    rechazados = []
+    validos = list(filtrar_ruts(ruts, lambda rut, motivo: rechazados.append((rut, motivo))))
+
+    if rechazados:
+        malos = sum(1 for _, m in rechazados if m != RUT_DUPLICADO)
+        logger.warning(f"⚠ {malos} RUTs inválidos y {len(rechazados) - malos} repetidos descartados "
+                       f"de {len(validos) + len(rechazados)}.")
+    return validos, rechazados
+
+
+###############################
+# CSV DE LA CARGA MASIVA DT
+###############################
+def _columna(encabezado, nombre, defecto=None):
+    return next((i for i, c in enumerate(encabezado) if c.strip().upper().lstrip("\ufeff") == nombre), defecto)
+
+
+def validar_filas(encabezado, filas, vistos=None):
+    """
+    Separa las filas del CSV en (buenas, rechazos, avisos). Cada rechazo o
+    aviso es {"fila", "id", "rut", "motivo"}; 'fila' cuenta el encabezado
+    como 1. Un RUT repetido con otro ID queda en avisos y la fila se conserva.
+
+    'vistos' ({"ids": set, "ruts": set}) se comparte entre los CSV de una
+    misma exportación para detectar repetidos entre archivos.
+    """
+    vistos = vistos if vistos is not None else {"ids": set(), "ruts": set()}
+    col_id = _columna(encabezado, "ID", 0)
+    col_rut = _columna(encabezado, "RUT")
+
+    buenas, rechazos, avisos = [], [], []
+    for numero, fila in enumerate(filas, start=2):
+        if not any(c.strip() for c in fila):
+            continue
+        finiquito_id = fila[col_id].strip() if col_id < len(fila) else ""
+        rut = fila[col_rut].strip() if col_rut is not None and col_rut < len(fila) else ""
+
+        motivo = None
+        if not finiquito_id:
+            motivo = ID_VACIO
+        elif finiquito_id in vistos["ids"]:
+            motivo = ID_DUPLICADO
+        elif col_rut is not None:
+            rut, motivo = revisar_rut(rut)
+            rut = rut or fila[col_rut].strip()
+            if motivo is None and rut in vistos["ruts"]:
+                avisos.append({"fila": numero, "id": finiquito_id, "rut": rut, "motivo": RUT_DUPLICADO})
+
+        if motivo:
+            rechazos.append({"fila": numero, "id": finiquito_id, "rut": rut, "motivo": motivo})
+            continue
+        vistos["ids"].add(finiquito_id)
+        if col_rut is not None:
+            vistos["ruts"].add(rut)
+        buenas.append(fila)
+    return buenas, rechazos, avisos
+
+
+def depurar_csv(ruta, vistos=None):
+    """
+    Escribe las filas válidas de 'ruta' (mismo nombre, encoding y delimitador)
+    en la subcarpeta CARPETA_DEPURADOS y devuelve (ruta_a_subir, rechazos).
+    El original no se modifica; si no hay nada que quitar se sube tal cual.
+    """
+    encoding, delimitador = detectar_formato(ruta)
+    with open(ruta, encoding=encoding, newline="") as f:
+        lector = csv.reader(f, delimiter=delimitador)
+        encabezado = next(lector, [])
+        buenas, rechazos, avisos = validar_filas(encabezado, lector, vistos)
+
+    for a in avisos:
+        logger.warning(f"⚠ {os.path.basename(ruta)} fila {a['fila']}: RUT {a['rut']} repetido (ID {a['id']}), se mantiene.")
+    if not rechazos:
+        return ruta, []
+
+    carpeta = os.path.join(os.path.dirname(os.path.abspath(ruta)), CARPETA_DEPURADOS)
+    os.makedirs(carpeta, exist_ok=True)
+    depurado = os.path.join(carpeta, os.path.basename(ruta))
+    fd, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+            escritor = csv.writer(f, delimiter=delimitador)
+            escritor.writerow(encabezado)
+            escritor.writerows(buenas)
+        os.replace(temporal, depurado)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+    logger.warning(f"⚠ {os.path.basename(ruta)}: {len(rechazos)} filas descartadas antes de subir a MiDT "
+                   f"(copia depurada en {depurado}).")
+    for r in rechazos:
+        logger.warning(f"⚠ Fila {r['fila']} (ID {r['id']}, RUT {r['rut']}): {r['motivo']}")
+    return depurado, rechazos